@@ -2,7 +2,6 @@
 """
 RAG 채팅 처리 핸들러 - 로깅 기능 포함
 """
-import asyncio
 import time
 import uuid
 from fastapi import HTTPException
@@ -15,6 +14,8 @@ class ChatHandler:
     
     def __init__(self, rag_chain, retriever, rag_model_name: str, llm_server_url: str, 
                  llm_model=None, initial_system_prompt=None):
+        # rag_chain: {"context", "question"}을 받는 생성 체인 (prompt | llm | parser)
+        # 검색은 retriever로 한 번만 수행하고 그 결과를 체인에 넘긴다.
         self.original_rag_chain = rag_chain
         self.rag_chain = rag_chain
         self.retriever = retriever
@@ -61,17 +62,11 @@ Style: Professional, friendly, address as "고객님"."""
                 Question: {question}''')
             ])
             
-            # RAG 체인 재구성
-            from langchain.schema.runnable import RunnablePassthrough
-            from langchain_core.runnables import RunnableParallel
+            # RAG 체인 재구성 (검색은 process_with_rag에서 한 번만 수행)
             from langchain_core.output_parsers import StrOutputParser
             
             self.rag_chain = (
-                RunnableParallel(
-                    context=self.retriever, 
-                    question=RunnablePassthrough()
-                )
-                | new_rag_prompt_template
+                new_rag_prompt_template
                 | self.llm_model
                 | StrOutputParser()
             )
@@ -97,30 +92,28 @@ Style: Professional, friendly, address as "고객님"."""
             return request_info["session_id"]
         return f"session_{uuid.uuid4().hex[:12]}"
     
-    def _extract_contexts_from_retrieval(self, question: str) -> list:
-        """질문에서 컨텍스트 추출 (리트리버 사용)"""
+    async def _extract_contexts_from_retrieval(self, question: str, retrieval_options: dict = None) -> list:
+        """질문에서 컨텍스트 추출 (리트리버 사용, 이벤트 루프를 막지 않는 비동기 검색)"""
         try:
-            # 리트리버를 사용해 컨텍스트 검색
-            contexts = self.retriever.get_relevant_documents(question)
+            # 리트리버를 사용해 컨텍스트 검색 (요청별 k/ef/nprobe 등은 검색 옵션으로 전달)
+            contexts = await self.retriever.ainvoke(question, **(retrieval_options or {}))
             return contexts
         except Exception as e:
             print(f"❌ 컨텍스트 검색 실패: {str(e)}")
             return []
     
-    async def process_with_rag(self, question: str, request_info: dict = None) -> str:
-        """RAG 파이프라인으로 질문 처리 + 로깅"""
+    async def process_with_rag(self, question: str, request_info: dict = None, retrieval_options: dict = None) -> str:
+        """RAG 파이프라인으로 질문 처리 + 로깅 (retrieval_options: 요청별 검색 튜닝 값)"""
         start_time = time.time()
         session_id = self._generate_session_id(request_info)
         
         try:
             # 1. 컨텍스트 검색
-            contexts = self._extract_contexts_from_retrieval(question)
+            contexts = await self._extract_contexts_from_retrieval(question, retrieval_options)
             print(f"🔍 검색된 컨텍스트: {len(contexts)}개")
             
-            # 2. RAG 체인 실행
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, self.rag_chain.invoke, question
-            )
+            # 2. RAG 체인 실행 (검색된 컨텍스트를 그대로 사용 - 재검색 없음)
+            response = await self.rag_chain.ainvoke({"context": contexts, "question": question})
             
             # 3. 응답 시간 계산
             response_time_ms = int((time.time() - start_time) * 1000)
@@ -8,16 +8,44 @@ from typing import Dict, Any
 from fastapi import HTTPException
 from fastapi.responses import StreamingResponse
 
-from .models import OllamaChatRequest, OllamaGenerateRequest
+from .models import OllamaChatRequest, OllamaGenerateRequest, RetrieveBatchRequest
 from .responses import (
     create_chat_response, create_generate_response,
     create_chat_error_response, create_generate_error_response
 )
 from .streaming import rag_chat_stream, rag_generate_stream
+from .readiness import readiness, RETRY_AFTER_SECONDS
 
 # 전역 채팅 핸들러
 chat_handler = None
 
+def _filter_option(value):
+    """필터 옵션: 표현식 문자열(필드 연산자 JSON값, and로 연결 - 벡터 스토어가 허용 필드 검증) 또는 조건 dict ({"space_name": "X", "date_from": "2026-09-01"})"""
+    if not isinstance(value, (str, dict)):
+        raise ValueError(value)
+    return value
+
+def _partitions_option(value):
+    """파티션 옵션: 문서 종류(md/csv/doc), source 파일 이름 또는 파티션 이름 (하나 또는 목록)"""
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(value)
+    return value
+
+# 요청 options 중 검색 튜닝 키 → 검색 옵션 (나머지 키는 LLM 샘플링 옵션, Ollama의 top_k와 겹치지 않도록 retrieval_k 사용)
+RETRIEVAL_OPTIONS = {
+    "retrieval_k": ("k", int),
+    "fetch_k": ("fetch_k", int),
+    "ef": ("ef", int),
+    "nprobe": ("nprobe", int),
+    "score_threshold": ("score_threshold", float),
+    "score_gap": ("score_gap", float),
+    "lambda_mult": ("lambda_mult", float),
+    "filter": ("expr", _filter_option),
+    "partitions": ("partitions", _partitions_option),
+}
+
 def set_chat_handler(handler):
     """채팅 핸들러 설정"""
     global chat_handler
@@ -27,9 +55,34 @@ def set_chat_handler(handler):
 def get_chat_handler():
     """채팅 핸들러 가져오기"""
     if not chat_handler:
-        raise HTTPException(status_code=503, detail="Chat handler not initialized")
+        # 백그라운드 초기화 중에는 빠르게 503 + Retry-After 응답
+        raise HTTPException(
+            status_code=503,
+            detail="RAG server is warming up, retrieval not ready",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
     return chat_handler
 
+def get_retrieval_options(options, vector_store=None) -> Dict[str, Any]:
+    """요청 options에서 검색 튜닝 값/필터 추출 (잘못된 값이면 400, 조건 dict 필터는 표현식으로 변환)"""
+    retrieval_options = {}
+    for key, (name, cast) in RETRIEVAL_OPTIONS.items():
+        if not options or options.get(key) is None:
+            continue
+        try:
+            value = cast(options[key])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail=f"Invalid option '{key}': {options[key]!r}")
+        if cast is int and value < 1:
+            raise HTTPException(status_code=400, detail=f"Option '{key}' must be >= 1")
+        retrieval_options[name] = value
+    if vector_store is not None and retrieval_options.get("expr"):
+        try:
+            retrieval_options["expr"] = vector_store.filter_expr(retrieval_options)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid filter: {e}")
+    return retrieval_options
+
 async def handle_chat_request(request: OllamaChatRequest):
     """채팅 요청 처리 - RAG 모델만 지원하고 로깅"""
     handler = get_chat_handler()
@@ -40,18 +93,19 @@ async def handle_chat_request(request: OllamaChatRequest):
         raise HTTPException(status_code=400, detail="No user message found")
     
     question = user_message.content
+    retrieval_options = get_retrieval_options(request.options, handler.retriever.vectorstore)
     
     try:
         # RAG 모델인 경우만 RAG 처리 + 로깅
         if request.model == handler.rag_model_name:
             if request.stream:
                 return StreamingResponse(
-                    rag_chat_stream(handler, question, request.model),
+                    rag_chat_stream(handler, question, request.model, retrieval_options),
                     media_type="application/x-ndjson"
                 )
             else:
                 # RAG 처리 (로깅 포함)
-                response_content = await handler.process_with_rag(question)
+                response_content = await handler.process_with_rag(question, retrieval_options=retrieval_options)
                 return create_chat_response(request.model, response_content)
         else:
             # 일반 LLM 모델인 경우: 프록시만 하고 로깅 안함
@@ -86,17 +140,18 @@ async def handle_chat_request(request: OllamaChatRequest):
 async def handle_generate_request(request: OllamaGenerateRequest):
     """생성 요청 처리 - RAG 모델만 지원"""
     handler = get_chat_handler()
+    retrieval_options = get_retrieval_options(request.options, handler.retriever.vectorstore)
     
     try:
         # RAG 모델만 지원
         if request.model == handler.rag_model_name:
             if request.stream:
                 return StreamingResponse(
-                    rag_generate_stream(handler, request.prompt, request.model),
+                    rag_generate_stream(handler, request.prompt, request.model, retrieval_options),
                     media_type="application/x-ndjson"
                 )
             else:
-                response_content = await handler.process_with_rag(request.prompt)
+                response_content = await handler.process_with_rag(request.prompt, retrieval_options=retrieval_options)
                 return create_generate_response(request.model, response_content)
         else:
             # RAG 모델이 아닌 경우 오류 응답
@@ -135,18 +190,83 @@ def get_model_list() -> Dict[str, Any]:
     return {"models": models}
 
 def get_health_status() -> Dict[str, Any]:
-    """헬스체크 상태 생성"""
+    """헬스체크 상태 생성 (liveness - 프로세스가 살아 있으면 healthy)"""
     handler_status = "initialized" if chat_handler else "not_initialized"
     rag_model = os.environ.get("RAG_MODEL_NAME", "unknown")
     
     return {
-        "status": "healthy" if chat_handler else "degraded",
+        "status": "healthy",
         "service": "cheeseade-rag-server",
         "timestamp": int(time.time()),
+        "ready": readiness.ready,
         "chat_handler": handler_status,
         "models": {
             "rag_model": rag_model,
             "supported_models": [rag_model],
             "total_models": 1
         }
-    }
\ No newline at end of file
+    }
+
+def get_ready_status() -> Dict[str, Any]:
+    """readiness 상태 생성 (초기화 단계별 진행 상황)"""
+    return {
+        "service": "cheeseade-rag-server",
+        "timestamp": int(time.time()),
+        **readiness.snapshot()
+    }
+
+def get_cache_stats() -> Dict[str, Any]:
+    """임베딩 캐시 통계 (쿼리 임베딩 LRU/TTL 캐시 + 문서 임베딩 캐시) 및 리랭커 점수 캐시/지연 통계"""
+    handler = get_chat_handler()
+    vector_store = handler.retriever.vectorstore
+    reranker = getattr(handler.retriever, "reranker", None)
+    return {
+        "service": "cheeseade-rag-server",
+        "timestamp": int(time.time()),
+        **vector_store.cache_stats(),
+        "reranker": reranker.stats() if reranker else None
+    }
+
+async def handle_retrieve_batch(request: RetrieveBatchRequest) -> Dict[str, Any]:
+    """여러 질문을 한 번에 검색하여 문서/점수 반환 (LLM 호출 없음 - 평가/사전 예열용)"""
+    handler = get_chat_handler()
+    vector_store = handler.retriever.vectorstore
+
+    if not request.queries:
+        raise HTTPException(status_code=400, detail="No queries provided")
+    if request.k is None or request.k < 1:
+        raise HTTPException(status_code=400, detail="k must be >= 1")
+
+    try:
+        expr = vector_store.filter_expr({"expr": request.filter})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid filter: {e}")
+
+    started = time.time()
+    try:
+        batch_docs = await vector_store.asimilarity_search_batch(request.queries, k=request.k, expr=expr,
+                                                               partitions=request.partitions)
+    except Exception as e:
+        print(f"❌ 배치 검색 오류: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"배치 검색 실패: {str(e)}")
+
+    return {
+        "service": "cheeseade-rag-server",
+        "timestamp": int(time.time()),
+        "took_ms": int((time.time() - started) * 1000),
+        "results": [
+            {
+                "query": query,
+                "documents": [
+                    {
+                        "id": doc.metadata.get("id"),
+                        "score": doc.metadata.get("score"),
+                        "content": doc.page_content,
+                        "metadata": {key: value for key, value in doc.metadata.items() if key not in ("id", "score")}
+                    }
+                    for doc in docs
+                ]
+            }
+            for query, docs in zip(request.queries, batch_docs)
+        ]
+    }
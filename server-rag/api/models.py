@@ -2,7 +2,7 @@
 """
 Ollama API 호환 데이터 모델
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from pydantic import BaseModel
 
 class OllamaMessage(BaseModel):
@@ -23,6 +23,12 @@ class OllamaGenerateRequest(BaseModel):
     options: Optional[Dict[str, Any]] = None
     system: Optional[str] = None
 
+class RetrieveBatchRequest(BaseModel):
+    queries: List[str]
+    k: Optional[int] = 4
+    filter: Optional[Union[str, Dict[str, Any]]] = None  # 필터 표현식(허용 필드, and로만 연결) 또는 {"space_name": ..., "date_from": ...}
+    partitions: Optional[List[str]] = None  # 문서 종류(md/csv/doc) 또는 source 파일 이름 - 해당 파티션만 검색
+
 class OllamaModel(BaseModel):
     name: str
     model: str
@@ -0,0 +1,79 @@
+# server-rag/api/readiness.py
+"""
+서버 초기화 단계별 진행 상태 (백그라운드 워밍업 / readiness)
+"""
+import time
+import threading
+from typing import Dict, Any
+
+
+class ReadinessState:
+    """초기화 단계별 상태 관리 (pending → running → done / failed)"""
+
+    STAGES = [
+        "llm",              # LLM 서버 연결
+        "embedding_model",  # 임베딩 모델 로드
+        "chunking",         # 문서 청킹
+        "embedding",        # 청크 임베딩 및 벡터 DB 저장
+        "index",            # 벡터 인덱스 빌드 및 로드
+        "retriever",        # 리트리버 / RAG 체인 구성
+    ]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.stages = {name: {"status": "pending"} for name in self.STAGES}
+        self.error = None
+
+    def start(self, stage: str, **detail):
+        """단계 시작"""
+        with self._lock:
+            self.stages[stage] = {"status": "running", "started_at": time.time(), **detail}
+
+    def update(self, stage: str, **detail):
+        """단계 진행 상황 갱신 (예: done/total)"""
+        with self._lock:
+            self.stages[stage].update(detail)
+
+    def complete(self, stage: str, **detail):
+        """단계 완료"""
+        with self._lock:
+            info = self.stages[stage]
+            started_at = info.get("started_at", time.time())
+            info.update(detail)
+            info["status"] = "done"
+            info["elapsed_sec"] = round(time.time() - started_at, 2)
+
+    def fail(self, stage: str, error: str):
+        """단계 실패"""
+        with self._lock:
+            self.stages[stage]["status"] = "failed"
+            self.stages[stage]["error"] = error
+            self.error = f"{stage}: {error}"
+
+    @property
+    def ready(self) -> bool:
+        """모든 단계 완료 시 True (검색/채팅 가능)"""
+        with self._lock:
+            return all(info["status"] == "done" for info in self.stages.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 상태 (JSON 응답용)"""
+        with self._lock:
+            stages = {name: dict(info) for name, info in self.stages.items()}
+        for info in stages.values():
+            info.pop("started_at", None)
+
+        return {
+            "ready": all(info["status"] == "done" for info in stages.values()),
+            "uptime_sec": round(time.time() - self.started_at, 2),
+            "error": self.error,
+            "stages": stages
+        }
+
+
+# 전역 readiness 상태
+readiness = ReadinessState()
+
+# 초기화 중 재시도 권장 시간 (초)
+RETRY_AFTER_SECONDS = 10
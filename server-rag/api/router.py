@@ -5,11 +5,14 @@ FastAPI 라우터 정의 - OpenWebUI 호환성 개선
 import os
 import time
 from fastapi import APIRouter
-from .models import OllamaChatRequest, OllamaGenerateRequest
+from fastapi.responses import JSONResponse
+from .models import OllamaChatRequest, OllamaGenerateRequest, RetrieveBatchRequest
 from .endpoints import (
     handle_chat_request, handle_generate_request,
-    get_model_list, get_health_status, get_chat_handler
+    get_model_list, get_health_status, get_ready_status, get_chat_handler,
+    get_cache_stats, handle_retrieve_batch
 )
+from .readiness import RETRY_AFTER_SECONDS
 
 router = APIRouter()
 
@@ -27,6 +30,11 @@ async def generate_ollama(request: OllamaGenerateRequest):
     """Ollama 생성 API"""
     return await handle_generate_request(request)
 
+@router.post("/api/retrieve/batch")
+async def retrieve_batch(request: RetrieveBatchRequest):
+    """배치 검색 API - 여러 질문의 검색 결과(문서/점수)만 반환 (LLM 호출 없음)"""
+    return await handle_retrieve_batch(request)
+
 # ================================
 # 모델 관리 API (OpenWebUI 필수)
 # ================================
@@ -189,6 +197,23 @@ async def health_check():
             "error": str(e)
         }
 
+@router.get("/ready")
+async def ready_check():
+    """readiness 체크 - 초기화 단계별 진행 상황 (준비 전에는 503)"""
+    status = get_ready_status()
+    if status["ready"]:
+        return status
+    return JSONResponse(
+        status_code=503,
+        content=status,
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
+
+@router.get("/api/cache/stats")
+async def cache_stats():
+    """임베딩 캐시 적중/미스/제거 및 쿼리 마이크로배칭(배치 크기, 대기 지연) 통계"""
+    return get_cache_stats()
+
 @router.get("/api")
 async def api_info():
     """API 정보"""
@@ -203,7 +228,7 @@ async def api_info():
         "endpoints": [
             "/api/tags", "/api/models", "/api/ps", "/api/version",
             "/api/show", "/api/chat", "/api/generate",
-            "/api/system-prompt", "/health"
+            "/api/retrieve/batch", "/api/system-prompt", "/api/cache/stats", "/health", "/ready"
         ]
     }
 
@@ -7,10 +7,11 @@ import time
 import asyncio
 from typing import AsyncGenerator
 
-async def rag_chat_stream(chat_handler, question: str, model: str) -> AsyncGenerator[str, None]:
+async def rag_chat_stream(chat_handler, question: str, model: str,
+                          retrieval_options: dict = None) -> AsyncGenerator[str, None]:
     """RAG 채팅 스트리밍"""
     try:
-        response_content = await chat_handler.process_with_rag(question)
+        response_content = await chat_handler.process_with_rag(question, retrieval_options=retrieval_options)
         
         # 단어별 분할 스트리밍
         words = response_content.split()
@@ -67,10 +68,11 @@ async def rag_chat_stream(chat_handler, question: str, model: str) -> AsyncGener
         }
         yield json.dumps(error_response) + "\n"
 
-async def rag_generate_stream(chat_handler, prompt: str, model: str) -> AsyncGenerator[str, None]:
+async def rag_generate_stream(chat_handler, prompt: str, model: str,
+                              retrieval_options: dict = None) -> AsyncGenerator[str, None]:
     """RAG 생성 스트리밍"""
     try:
-        response_content = await chat_handler.process_with_rag(prompt)
+        response_content = await chat_handler.process_with_rag(prompt, retrieval_options=retrieval_options)
         
         words = response_content.split()
         chunk_size = 2
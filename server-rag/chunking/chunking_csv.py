@@ -1,10 +1,14 @@
+import io
 import csv
 import os
 import glob
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Iterator
 
 class CSVChunk:
     """CSV 청크 객체 (LangChain Document와 유사한 구조)"""
+    __slots__ = ('page_content', 'metadata')
+    
     def __init__(self, page_content: str, metadata: dict):
         self.page_content = page_content
         self.metadata = metadata
@@ -17,7 +21,7 @@ def load_csv_from_docs():
         print("❌ docs 폴더가 없습니다.")
         return None
     
-    csv_files = glob.glob(os.path.join(docs_path, "*.csv"))
+    csv_files = sorted(glob.glob(os.path.join(docs_path, "*.csv")))
     
     if len(csv_files) == 0:
         print("❌ CSV 파일이 없습니다.")
@@ -39,13 +43,7 @@ def load_csv_from_docs():
                 continue
             
             for row in reader:
-                # 키 이름의 BOM 및 공백 제거
-                cleaned_row = {}
-                for key, value in row.items():
-                    cleaned_key = key.replace('\ufeff', '').strip() if key else key
-                    cleaned_row[cleaned_key] = value
-                
-                data.append(cleaned_row)
+                data.append(clean_csv_row(row))
         
         if len(data) > 0:
             all_data.append({
@@ -61,6 +59,249 @@ def load_csv_from_docs():
     
     return all_data
 
+SKIP_SPACE_NAMES = ['내 업무 리스트', '이사회']
+
+def clean_csv_row(row: dict) -> dict:
+    """키 이름의 BOM 및 공백 제거"""
+    cleaned_row = {}
+    for key, value in row.items():
+        cleaned_key = key.replace('\ufeff', '').strip() if key else key
+        cleaned_row[cleaned_key] = value
+    return cleaned_row
+
+# 'Date Created Text' 파싱에 시도할 형식 (ClickUp 내보내기 등)
+DATE_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d",
+    "%m/%d/%Y, %I:%M:%S %p",
+    "%m/%d/%Y",
+    "%Y. %m. %d.",
+]
+
+def parse_date_created(row: dict) -> int:
+    """
+    생성일 → epoch 초 (필터 검색용, 알 수 없으면 0)
+    'Date Created'가 epoch(밀리초/초)면 그대로, 아니면 'Date Created Text'를 알려진 형식으로 파싱
+    """
+    raw = str(row.get('Date Created') or '').strip()
+    if raw.isdigit():
+        value = int(raw)
+        return value // 1000 if value > 10**11 else value
+
+    text = str(row.get('Date Created Text') or '').strip()
+    if not text:
+        return 0
+    try:
+        return int(datetime.fromisoformat(text).timestamp())
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return int(datetime.strptime(text, date_format).timestamp())
+        except ValueError:
+            continue
+    return 0
+
+def build_csv_header(row: dict, filename: str) -> str:
+    """CSV 행의 헤더 문자열 (Source, TaskID, ... 요약)"""
+    header_parts = []
+    header_parts.append(f"Source: {filename}")
+    
+    task_id = row.get('Task ID', '')
+    if task_id and str(task_id).strip():
+        header_parts.append(f"TaskID: {task_id}")
+    
+    if row.get('Parent ID'):
+        header_parts.append(f"ParentID: {row['Parent ID']}")
+    if row.get('Tags'):
+        header_parts.append(f"Tags: {row['Tags']}")
+    if row.get('List Name'):
+        header_parts.append(f"ListName: {row['List Name']}")
+    if row.get('Folder Name'):
+        header_parts.append(f"FolderName: {row['Folder Name']}")
+    if row.get('Space Name'):
+        header_parts.append(f"SpaceName: {row['Space Name']}")
+    if row.get('Comments'):
+        header_parts.append(f"Comments: {row['Comments']}")
+    if row.get('Date Created Text'):
+        header_parts.append(f"DateCreated: {row['Date Created Text']}")
+    
+    return ", ".join(header_parts)
+
+def build_csv_chunk(row: dict, filename: str, row_number: int, chunk_number: int,
+                    include_header: bool = True) -> Optional[CSVChunk]:
+    """
+    CSV 한 행을 청크로 변환 (스킵 대상이면 None)
+    행을 헤더(메타데이터)와 page_content(주요 내용)로 분리
+    include_header=False면 page_content와 중복되는 header 문자열을 만들지 않음 (스트리밍용)
+    """
+    # Space Name이 '내 업무 리스트' 또는 '이사회'인 경우 스킵
+    space_name = row.get('Space Name', '')
+    if space_name in SKIP_SPACE_NAMES:
+        return None
+    
+    # 헤더 (메타데이터) 구성
+    if include_header:
+        header = build_csv_header(row, filename)
+    
+    # Page Content (주요 내용) 구성 - 헤더 정보도 포함하여 검색 가능하게 함
+    task_id = row.get('Task ID', '')
+    content_parts = []
+    
+    # 1. 헤더 정보 (검색 가능하도록 page_content에 포함)
+    content_parts.append("=== 작업 정보 ===")
+    
+    if task_id and str(task_id).strip():
+        content_parts.append(f"작업ID: {task_id}")
+    
+    task_name = row.get('Task Name', '')
+    if task_name and str(task_name).strip():
+        content_parts.append(f"작업명: {task_name.strip()}")
+    
+    parent_id = row.get('Parent ID', '')
+    if parent_id and str(parent_id).strip() and parent_id != 'null':
+        content_parts.append(f"상위작업ID: {parent_id}")
+    
+    list_name = row.get('List Name', '')
+    if list_name:
+        content_parts.append(f"리스트: {list_name}")
+    
+    folder_name = row.get('Folder Name', '')
+    if folder_name:
+        content_parts.append(f"폴더: {folder_name}")
+    
+    space_name = row.get('Space Name', '')
+    if space_name:
+        content_parts.append(f"스페이스: {space_name}")
+    
+    tags = row.get('Tags', '')
+    if tags and tags != '[]':
+        content_parts.append(f"태그: {tags}")
+    
+    assignees = row.get('Assignees', '')
+    if assignees and assignees != '[]':
+        content_parts.append(f"담당자: {assignees}")
+    
+    date_created = row.get('Date Created Text', '')
+    if date_created and str(date_created).strip():
+        content_parts.append(f"생성일: {date_created}")
+    
+    # 2. 작업 내용
+    if row.get('Task Content'):
+        content_parts.append("")
+        content_parts.append("=== 작업 내용 ===")
+        content_parts.append(row['Task Content'])
+    
+    # 3. 댓글 정보
+    comments = row.get('Comments', '')
+    if comments and comments != '[]':
+        content_parts.append("")
+        content_parts.append("=== 댓글 ===")
+        content_parts.append(f"댓글: {comments}")
+    
+    page_content = "\n".join(content_parts)
+    
+    # 메타데이터 구성
+    metadata = {
+        'source': filename,
+        'chunk_id': f"{filename}_{chunk_number}",
+        'row_number': row_number,
+        'task_id': task_id,
+        'task_name': task_name.strip() if task_name else '',
+        'list_name': row.get('List Name', ''),
+        'folder_name': row.get('Folder Name', ''),
+        'space_name': row.get('Space Name', ''),
+        'date_created': row.get('Date Created Text', ''),
+        'date_created_ts': parse_date_created(row),
+    }
+    if include_header:
+        metadata['header'] = header
+    
+    return CSVChunk(page_content=page_content, metadata=metadata)
+
+def read_csv_header(file_path: str):
+    """
+    CSV 헤더(필드 이름)와 헤더가 끝나는 바이트 위치 반환
+    헤더에 줄바꿈이 포함된 경우는 고려하지 않는다.
+    """
+    with open(file_path, 'rb') as f:
+        header_line = f.readline()
+    fieldnames = next(csv.reader([header_line.decode('utf-8-sig')]), [])
+    return fieldnames, len(header_line)
+
+def chunk_csv_byte_range(file_path: str, start: int, end: int, fieldnames: List[str]):
+    """
+    CSV 파일의 [start, end) 바이트 구간(행 경계로 나뉜 구간)을 청킹
+    
+    Returns:
+        (청크 목록, 구간의 행 수) - row_number/chunk_id는 구간 내 번호이므로 병합 시 보정
+    """
+    filename = os.path.basename(file_path)
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    
+    reader = csv.DictReader(io.StringIO(text, newline=''), fieldnames=fieldnames)
+    
+    chunks = []
+    row_count = 0
+    for idx, row in enumerate(reader):
+        row_count += 1
+        chunk = build_csv_chunk(clean_csv_row(row), filename, idx + 1, len(chunks) + 1)
+        if chunk is not None:
+            chunks.append(chunk)
+    
+    return chunks, row_count
+
+def iter_csv_rows(file_path: str) -> Iterator[dict]:
+    """CSV 파일의 행을 하나씩 읽어 반환 (파일 전체를 메모리에 올리지 않음)"""
+    # UTF-8 BOM 제거를 위해 utf-8-sig 사용
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as file:
+        reader = csv.DictReader(file)
+        
+        if not reader.fieldnames:
+            print(f"⚠️ 경고: {file_path}에 헤더가 없습니다.")
+            return
+        
+        for row in reader:
+            yield clean_csv_row(row)
+
+def iter_csv_chunks(docs_path: str = "./docs") -> Iterator[CSVChunk]:
+    """
+    docs 폴더의 CSV 파일을 행 → 청크 순으로 스트리밍
+    chunk_csv_files와 같은 스킵 규칙/메타데이터를 사용하되 header 문자열은 만들지 않는다.
+    """
+    csv_files = sorted(glob.glob(os.path.join(docs_path, "*.csv")))
+    
+    if len(csv_files) == 0:
+        print("❌ CSV 파일이 없습니다.")
+        return
+    
+    print(f"📁 발견된 CSV 파일 (스트리밍): {[os.path.basename(f) for f in csv_files]}")
+    
+    for file_path in csv_files:
+        yield from iter_csv_file_chunks(file_path)
+
+def iter_csv_file_chunks(file_path: str) -> Iterator[CSVChunk]:
+    """CSV 파일 하나를 행 → 청크 순으로 스트리밍"""
+    filename = os.path.basename(file_path)
+    row_count = 0
+    processed_count = 0
+    
+    for idx, row in enumerate(iter_csv_rows(file_path)):
+        row_count += 1
+        chunk = build_csv_chunk(row, filename, idx + 1, processed_count + 1, include_header=False)
+        if chunk is None:
+            continue
+        
+        processed_count += 1
+        yield chunk
+    
+    print(f"📊 {filename}: {processed_count}개 청크 생성 (총 {row_count}행 중 {row_count - processed_count}행 필터링됨)")
+
 def chunk_csv_files(csv_data_list: List) -> List[CSVChunk]:
     """
     CSV 데이터를 행 기준으로 청킹
@@ -82,108 +323,10 @@ def chunk_csv_files(csv_data_list: List) -> List[CSVChunk]:
         processed_count = 0
         
         for idx, row in enumerate(data):
-            # Space Name이 '내 업무 리스트' 또는 '이사회'인 경우 스킵
-            space_name = row.get('Space Name', '')
-            if space_name in ['내 업무 리스트', '이사회']:
+            chunk = build_csv_chunk(row, filename, idx + 1, processed_count + 1)
+            if chunk is None:
                 continue
             
-            # 헤더 (메타데이터) 구성
-            header_parts = []
-            header_parts.append(f"Source: {filename}")
-            
-            task_id = row.get('Task ID', '')
-            if task_id and str(task_id).strip():
-                header_parts.append(f"TaskID: {task_id}")
-            
-            if row.get('Parent ID'):
-                header_parts.append(f"ParentID: {row['Parent ID']}")
-            if row.get('Tags'):
-                header_parts.append(f"Tags: {row['Tags']}")
-            if row.get('List Name'):
-                header_parts.append(f"ListName: {row['List Name']}")
-            if row.get('Folder Name'):
-                header_parts.append(f"FolderName: {row['Folder Name']}")
-            if row.get('Space Name'):
-                header_parts.append(f"SpaceName: {row['Space Name']}")
-            if row.get('Comments'):
-                header_parts.append(f"Comments: {row['Comments']}")
-            if row.get('Date Created Text'):
-                header_parts.append(f"DateCreated: {row['Date Created Text']}")
-            
-            header = ", ".join(header_parts)
-            
-            # Page Content (주요 내용) 구성 - 헤더 정보도 포함하여 검색 가능하게 함
-            content_parts = []
-            
-            # 1. 헤더 정보 (검색 가능하도록 page_content에 포함)
-            content_parts.append("=== 작업 정보 ===")
-            
-            if task_id and str(task_id).strip():
-                content_parts.append(f"작업ID: {task_id}")
-            
-            task_name = row.get('Task Name', '')
-            if task_name and str(task_name).strip():
-                content_parts.append(f"작업명: {task_name.strip()}")
-            
-            parent_id = row.get('Parent ID', '')
-            if parent_id and str(parent_id).strip() and parent_id != 'null':
-                content_parts.append(f"상위작업ID: {parent_id}")
-            
-            list_name = row.get('List Name', '')
-            if list_name:
-                content_parts.append(f"리스트: {list_name}")
-            
-            folder_name = row.get('Folder Name', '')
-            if folder_name:
-                content_parts.append(f"폴더: {folder_name}")
-            
-            space_name = row.get('Space Name', '')
-            if space_name:
-                content_parts.append(f"스페이스: {space_name}")
-            
-            tags = row.get('Tags', '')
-            if tags and tags != '[]':
-                content_parts.append(f"태그: {tags}")
-            
-            assignees = row.get('Assignees', '')
-            if assignees and assignees != '[]':
-                content_parts.append(f"담당자: {assignees}")
-            
-            date_created = row.get('Date Created Text', '')
-            if date_created and str(date_created).strip():
-                content_parts.append(f"생성일: {date_created}")
-            
-            # 2. 작업 내용
-            if row.get('Task Content'):
-                content_parts.append("")
-                content_parts.append("=== 작업 내용 ===")
-                content_parts.append(row['Task Content'])
-            
-            # 3. 댓글 정보
-            comments = row.get('Comments', '')
-            if comments and comments != '[]':
-                content_parts.append("")
-                content_parts.append("=== 댓글 ===")
-                content_parts.append(f"댓글: {comments}")
-            
-            page_content = "\n".join(content_parts)
-            
-            # 메타데이터 구성
-            metadata = {
-                'source': filename,
-                'chunk_id': f"{filename}_{processed_count+1}",
-                'row_number': idx + 1,
-                'task_id': task_id,
-                'task_name': task_name.strip() if task_name else '',
-                'list_name': row.get('List Name', ''),
-                'folder_name': row.get('Folder Name', ''),
-                'space_name': row.get('Space Name', ''),
-                'date_created': row.get('Date Created Text', ''),
-                'header': header
-            }
-            
-            # CSVChunk 객체 생성
-            chunk = CSVChunk(page_content=page_content, metadata=metadata)
             chunks.append(chunk)
             processed_count += 1
         
@@ -213,8 +356,9 @@ def save_csv_chunks_to_file(chunks: List[CSVChunk], output_file: str = "./chunki
                 f.write(f"Space Name: {chunk.metadata['space_name']}\n")
                 f.write(f"Date Created: {chunk.metadata['date_created']}\n\n")
                 
-                f.write("HEADER:\n")
-                f.write(f"{chunk.metadata['header']}\n\n")
+                if chunk.metadata.get('header'):
+                    f.write("HEADER:\n")
+                    f.write(f"{chunk.metadata['header']}\n\n")
                 
                 f.write("PAGE_CONTENT:\n")
                 f.write(f"{chunk.page_content}\n")
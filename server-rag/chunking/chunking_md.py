@@ -3,6 +3,25 @@ from typing import List
 import os
 import glob
 
+# 분할 기준이 될 헤더를 정의
+HEADERS_TO_SPLIT_ON = [
+    ("#", "Header 1"),
+    ("##", "Header 2"),
+]
+
+# 프로세스당 하나의 splitter를 재사용 (파일마다 새로 만들지 않음)
+_markdown_splitter = None
+
+def get_markdown_splitter() -> MarkdownHeaderTextSplitter:
+    """MarkdownHeaderTextSplitter 싱글턴"""
+    global _markdown_splitter
+    if _markdown_splitter is None:
+        _markdown_splitter = MarkdownHeaderTextSplitter(
+            headers_to_split_on=HEADERS_TO_SPLIT_ON, 
+            return_each_line=False
+        )
+    return _markdown_splitter
+
 def load_md_from_docs():
     """docs 폴더에서 마크다운 파일들을 찾기"""
     docs_path = "./docs"
@@ -11,7 +30,7 @@ def load_md_from_docs():
         print("❌ docs 폴더가 없습니다.")
         return []
     
-    md_files = glob.glob(os.path.join(docs_path, "*.md"))
+    md_files = sorted(glob.glob(os.path.join(docs_path, "*.md")))
     
     if len(md_files) == 0:
         print("❌ 마크다운 파일이 없습니다.")
@@ -68,17 +87,7 @@ def process_single_markdown_file(file_path: str) -> List:
         print(f"❌ 파일 읽기 오류: {e}")
         return []
 
-    # 분할 기준이 될 헤더를 정의
-    headers_to_split_on = [
-        ("#", "Header 1"),
-        ("##", "Header 2"),
-    ]
-
-    # MarkdownHeaderTextSplitter 초기화
-    markdown_splitter = MarkdownHeaderTextSplitter(
-        headers_to_split_on=headers_to_split_on, 
-        return_each_line=False
-    )
+    markdown_splitter = get_markdown_splitter()
 
     # 텍스트 분할 실행
     print(f"✂️ 마크다운 헤더 기준으로 분할 중...")
@@ -0,0 +1,181 @@
+"""
+docs 폴더 병렬 청킹
+마크다운 파일과 (큰 파일은 행 구간으로 나눈) CSV 파일을 프로세스 풀에서 청킹하고,
+작업 순서대로 결정적으로 병합하여 청크 ID가 순차 처리와 같게 유지되도록 한다.
+"""
+import os
+import glob
+import mmap
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from .chunking_md import process_single_markdown_file, save_markdown_chunks_to_file
+from .chunking_csv import read_csv_header, chunk_csv_byte_range, save_csv_chunks_to_file
+
+
+def find_csv_row_boundaries(file_path: str, start: int, split_bytes: int) -> List[int]:
+    """
+    CSV 파일을 약 split_bytes 크기의 구간으로 나누는 행 경계 바이트 위치 목록
+    따옴표 안의 줄바꿈은 행 경계가 아니므로 따옴표 개수의 홀짝으로 판별한다.
+    (UTF-8 멀티바이트 문자에는 '"'와 '\\n' 바이트가 나타나지 않음)
+
+    Returns:
+        [start, b1, b2, ..., 파일 크기]
+    """
+    size = os.path.getsize(file_path)
+    boundaries = [start]
+    if size <= start:
+        return [start, start]
+
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        while True:
+            target = boundaries[-1] + split_bytes
+            if target >= size:
+                break
+
+            # target 위치의 따옴표 상태 (직전 경계는 항상 따옴표 밖)
+            in_quotes = mm[boundaries[-1]:target].count(b'"') % 2 == 1
+            pos = target
+            end = size
+            while True:
+                newline = mm.find(b'\n', pos)
+                if newline == -1:
+                    break
+                if mm[pos:newline].count(b'"') % 2 == 1:
+                    in_quotes = not in_quotes
+                if not in_quotes:
+                    end = newline + 1
+                    break
+                pos = newline + 1
+
+            if end >= size:
+                break
+            boundaries.append(end)
+
+    boundaries.append(size)
+    return boundaries
+
+
+def _run_markdown_task(file_path: str):
+    """워커: 마크다운 파일 하나 청킹"""
+    started = time.time()
+    chunks = process_single_markdown_file(file_path)
+    return chunks, 0, time.time() - started
+
+
+def _run_csv_task(file_path: str, start: int, end: int, fieldnames: List[str]):
+    """워커: CSV 행 구간 하나 청킹"""
+    started = time.time()
+    chunks, row_count = chunk_csv_byte_range(file_path, start, end, fieldnames)
+    return chunks, row_count, time.time() - started
+
+
+def plan_chunking_tasks(docs_path: str = "./docs", csv_split_bytes: int = 32 * 1024 * 1024) -> List[Tuple]:
+    """
+    청킹 작업 목록 (파일 이름 순 → 구간 순, 병합 순서를 결정)
+
+    Returns:
+        [("md", 파일 경로), ("csv", 파일 경로, 시작, 끝, 필드 이름), ...]
+    """
+    tasks = []
+
+    for file_path in sorted(glob.glob(os.path.join(docs_path, "*.md"))):
+        tasks.append(("md", file_path))
+
+    for file_path in sorted(glob.glob(os.path.join(docs_path, "*.csv"))):
+        fieldnames, header_end = read_csv_header(file_path)
+        if not fieldnames:
+            print(f"⚠️ 경고: {file_path}에 헤더가 없습니다.")
+            continue
+        boundaries = find_csv_row_boundaries(file_path, header_end, csv_split_bytes)
+        for start, end in zip(boundaries, boundaries[1:]):
+            if end > start:
+                tasks.append(("csv", file_path, start, end, fieldnames))
+
+    return tasks
+
+
+def chunk_docs_parallel(docs_path: str = "./docs",
+                        max_workers: int = None,
+                        csv_split_bytes: int = 32 * 1024 * 1024,
+                        save_chunks: bool = True) -> Tuple[List, List]:
+    """
+    docs 폴더의 마크다운/CSV를 프로세스 풀에서 청킹
+
+    Args:
+        docs_path: 문서 폴더
+        max_workers: 워커 프로세스 수 (None이면 CPU 수)
+        csv_split_bytes: CSV를 나누는 구간 크기 (바이트)
+        save_chunks: 청킹 결과를 chunking/chunks/*.txt로 저장할지
+
+    Returns:
+        (마크다운 청크 목록, CSV 청크 목록)
+    """
+    print(f"\n📁 병렬 청킹 시작... (워커: {max_workers or os.cpu_count()}개)")
+    started = time.time()
+
+    if not os.path.exists(docs_path):
+        print("❌ docs 폴더가 없습니다.")
+        return [], []
+
+    tasks = plan_chunking_tasks(docs_path, csv_split_bytes)
+    if not tasks:
+        print("❌ 처리할 문서가 없습니다.")
+        return [], []
+
+    # fork는 CUDA/스레드가 초기화된 프로세스에서 안전하지 않으므로 spawn 사용
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = []
+        for task in tasks:
+            if task[0] == "md":
+                futures.append(executor.submit(_run_markdown_task, task[1]))
+            else:
+                futures.append(executor.submit(_run_csv_task, *task[1:]))
+
+        # 작업 순서대로 병합 (완료 순서와 무관하게 결정적)
+        md_chunks = []
+        csv_chunks = []
+        file_stats = {}
+        csv_row_offsets = {}
+        csv_chunk_counts = {}
+        for task, future in zip(tasks, futures):
+            chunks, row_count, elapsed = future.result()
+            file_path = task[1]
+            filename = os.path.basename(file_path)
+            stat = file_stats.setdefault(filename, {"chunks": 0, "rows": 0, "tasks": 0, "elapsed": 0.0})
+            stat["chunks"] += len(chunks)
+            stat["rows"] += row_count
+            stat["tasks"] += 1
+            stat["elapsed"] += elapsed
+
+            if task[0] == "md":
+                md_chunks.extend(chunks)
+                continue
+
+            # 구간 내 번호 → 파일 전체 기준 번호로 보정
+            row_offset = csv_row_offsets.get(filename, 0)
+            chunk_offset = csv_chunk_counts.get(filename, 0)
+            for i, chunk in enumerate(chunks):
+                chunk.metadata['row_number'] += row_offset
+                chunk.metadata['chunk_id'] = f"{filename}_{chunk_offset + i + 1}"
+            csv_row_offsets[filename] = row_offset + row_count
+            csv_chunk_counts[filename] = chunk_offset + len(chunks)
+            csv_chunks.extend(chunks)
+
+    print(f"\n⏱️ 파일별 청킹 시간:")
+    for filename, stat in file_stats.items():
+        rows = f", {stat['rows']}행" if stat['rows'] else ""
+        print(f"   {filename}: {stat['chunks']}개 청크{rows}, {stat['tasks']}개 작업, {stat['elapsed']:.2f}초")
+
+    print(f"✅ 병렬 청킹 완료: 마크다운 {len(md_chunks)}개, CSV {len(csv_chunks)}개 ({time.time() - started:.2f}초)")
+
+    if save_chunks:
+        if md_chunks:
+            save_markdown_chunks_to_file(md_chunks)
+        if csv_chunks:
+            save_csv_chunks_to_file(csv_chunks)
+
+    return md_chunks, csv_chunks
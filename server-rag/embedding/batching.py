@@ -0,0 +1,137 @@
+"""
+길이 버킷 기반 적응형 배치 임베딩
+- 청크를 토큰 길이 순으로 정렬하여 비슷한 길이끼리 배치 → 패딩 낭비 감소
+- 배치 크기를 행 수가 아닌 토큰 예산(배치 내 최대 길이 × 행 수)으로 결정
+- OOM 발생 시 토큰 예산을 줄이고, 연속 성공 시 다시 늘림 (CPU/CUDA 공통)
+- 결과는 입력 순서대로 복원
+"""
+from typing import List, Optional
+
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+
+def is_out_of_memory_error(error: Exception) -> bool:
+    """CUDA/CPU 메모리 부족 오류 여부"""
+    if isinstance(error, MemoryError):
+        return True
+    if TORCH_AVAILABLE and isinstance(error, getattr(torch.cuda, 'OutOfMemoryError', ())):
+        return True
+    message = str(error).lower()
+    return isinstance(error, RuntimeError) and (
+        "out of memory" in message or "can't allocate memory" in message
+    )
+
+
+class AdaptiveBatchEmbedder:
+    """토큰 예산 기반 적응형 배치 임베딩"""
+
+    def __init__(self,
+                 embedding_model,
+                 token_budget: int = 16384,
+                 max_batch_size: int = 32,
+                 grow_after: int = 4,
+                 grow_factor: float = 1.25,
+                 encode_fn=None):
+        """
+        Args:
+            embedding_model: embed_documents를 제공하는 임베딩 모델
+            token_budget: 한 배치의 최대 토큰 수 (배치 내 최대 길이 × 행 수)
+            max_batch_size: 한 배치의 최대 행 수
+            grow_after: OOM 이후 연속 성공 몇 번마다 예산을 늘릴지
+            grow_factor: 예산 증가 배율 (최대 token_budget까지)
+            encode_fn: 배치 인코딩 함수 (기본 embedding_model.embed_documents,
+                       하이브리드 검색이면 (dense, sparse) 튜플을 반환하는 인코더)
+        """
+        self.embedding_model = embedding_model
+        self.encode_fn = encode_fn or (embedding_model.embed_documents if embedding_model is not None else None)
+        self.max_token_budget = token_budget
+        self.token_budget = token_budget
+        self.max_batch_size = max_batch_size
+        self.grow_after = grow_after
+        self.grow_factor = grow_factor
+        self._success_streak = 0
+
+        # SentenceTransformer 토크나이저 (HuggingFaceEmbeddings._client)
+        client = getattr(embedding_model, '_client', None)
+        self.tokenizer = getattr(client, 'tokenizer', None)
+        self.max_seq_length = getattr(client, 'max_seq_length', None) or 8192
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """텍스트별 토큰 수 (토크나이저가 없으면 글자 수로 근사)"""
+        if self.tokenizer is None:
+            return [min(len(text), self.max_seq_length) for text in texts]
+        encoded = self.tokenizer(texts, add_special_tokens=True, truncation=False)['input_ids']
+        return [min(len(ids), self.max_seq_length) for ids in encoded]
+
+    def _next_batch(self, order: List[int], lengths: List[int], start: int) -> List[int]:
+        """start부터 토큰 예산 안에 들어가는 배치 구성 (order는 길이 내림차순)"""
+        longest = max(lengths[order[start]], 1)
+        rows = max(1, min(self.max_batch_size, self.token_budget // longest))
+        return order[start:start + rows]
+
+    def _on_success(self):
+        self._success_streak += 1
+        if self.token_budget < self.max_token_budget and self._success_streak >= self.grow_after:
+            self.token_budget = min(self.max_token_budget, int(self.token_budget * self.grow_factor))
+            self._success_streak = 0
+            print(f"   📈 토큰 예산 증가: {self.token_budget}")
+
+    def _on_oom(self, batch_size: int, longest: int):
+        self._success_streak = 0
+        if TORCH_AVAILABLE and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        # 현재 배치가 확실히 절반이 되도록 예산 축소
+        self.token_budget = max(longest, min(self.token_budget, batch_size * longest) // 2)
+        print(f"   ⚠️ 메모리 부족 - 토큰 예산 축소: {self.token_budget} (배치 {batch_size}개, 최대 길이 {longest})")
+
+    def embed_documents(self, texts: List[str], progress_callback=None) -> List[List[float]]:
+        """
+        길이 버킷 배치로 임베딩 후 원래 순서로 반환
+
+        Args:
+            texts: 임베딩할 텍스트 목록
+            progress_callback: 진행 상황 콜백 (완료 수, 전체 수)
+        """
+        if not texts:
+            return []
+
+        lengths = self.count_tokens(texts)
+        # 긴 것부터 처리 (OOM을 초반에 발견)
+        order = sorted(range(len(texts)), key=lambda i: lengths[i], reverse=True)
+        results: List[Optional[List[float]]] = [None] * len(texts)
+
+        done = 0
+        batch_count = 0
+        padded_tokens = 0
+        while done < len(order):
+            batch = self._next_batch(order, lengths, done)
+            longest = lengths[batch[0]]
+            try:
+                vectors = self.encode_fn([texts[i] for i in batch])
+            except Exception as e:
+                if not is_out_of_memory_error(e):
+                    raise
+                if len(batch) == 1:
+                    print(f"   ❌ 단일 문서({longest} 토큰)도 메모리 부족")
+                    raise
+                self._on_oom(len(batch), longest)
+                continue
+
+            for i, vector in zip(batch, vectors):
+                results[i] = vector
+            done += len(batch)
+            batch_count += 1
+            padded_tokens += longest * len(batch)
+            self._on_success()
+
+            if progress_callback:
+                progress_callback(done, len(texts))
+
+        real_tokens = sum(lengths)
+        print(f"   ✅ {len(texts)}개 임베딩 ({batch_count}개 배치, 토큰 {real_tokens}/{padded_tokens} "
+              f"= 패딩 효율 {real_tokens / max(padded_tokens, 1):.0%}, 예산 {self.token_budget})")
+        return results
@@ -0,0 +1,113 @@
+"""
+BGE-M3 CPU 백엔드 비교 (PyTorch fp32 / ONNX fp32 / ONNX int8)
+- 벡터 일치도: PyTorch 벡터와의 코사인 유사도
+- 지연 시간: 단일 쿼리 embed_query p50/p95
+- 처리량: embed_documents 초당 문서 수
+
+사용법:
+    python -m embedding.benchmark_onnx --model /app/embedding/models/bge-m3 --docs ./docs
+"""
+import os
+import glob
+import json
+import time
+import argparse
+
+import numpy as np
+
+from .bge_m3_onnx import BGEM3OnnxEmbeddings, check_parity
+
+SAMPLE_QUERIES = [
+    "갤럭시 S24 울트라 배터리 용량은?",
+    "비스포크 냉장고 에너지 등급 알려줘",
+    "갤럭시 버즈 노이즈 캔슬링 기능",
+    "QLED TV와 OLED TV 차이",
+    "What is the screen size of Galaxy Tab S9?",
+]
+
+
+def load_sample_texts(docs_path: str, limit: int) -> list:
+    """docs 폴더 마크다운에서 문단 단위 샘플 텍스트 (없으면 샘플 쿼리)"""
+    texts = []
+    for file_path in sorted(glob.glob(os.path.join(docs_path, "*.md"))):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            texts.extend(p.strip() for p in f.read().split("\n\n") if len(p.strip()) > 20)
+        if len(texts) >= limit:
+            break
+    return texts[:limit] or SAMPLE_QUERIES
+
+
+def measure(name: str, model, queries: list, texts: list, repeats: int) -> dict:
+    """단일 쿼리 지연 시간과 배치 처리량 측정"""
+    model.embed_query("warmup")
+
+    latencies = []
+    for _ in range(repeats):
+        for query in queries:
+            started = time.perf_counter()
+            model.embed_query(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    model.embed_documents(texts)
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "backend": name,
+        "query_p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "query_p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "docs_per_sec": round(len(texts) / elapsed, 2),
+    }
+    print(f"   {name:<14} p50 {result['query_p50_ms']:>8}ms  p95 {result['query_p95_ms']:>8}ms  "
+          f"{result['docs_per_sec']:>8} docs/s")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BGE-M3 CPU 백엔드 비교")
+    parser.add_argument("--model", default="/app/embedding/models/bge-m3", help="PyTorch 모델 경로")
+    parser.add_argument("--onnx-dir", default="/app/embedding/models/bge-m3-onnx", help="ONNX 저장 폴더")
+    parser.add_argument("--docs", default="./docs", help="처리량 측정용 문서 폴더")
+    parser.add_argument("--samples", type=int, default=256, help="처리량 측정 문서 수")
+    parser.add_argument("--repeats", type=int, default=10, help="쿼리 지연 측정 반복 횟수")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX intra-op 스레드 수 (0이면 CPU 코어 수)")
+    parser.add_argument("--report", default="./logs/onnx_benchmark.json", help="결과 저장 경로")
+    args = parser.parse_args(argv)
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    texts = load_sample_texts(args.docs, args.samples)
+    print(f"📊 BGE-M3 CPU 백엔드 비교 (문서 {len(texts)}개, 쿼리 {len(SAMPLE_QUERIES)}개 × {args.repeats}회)")
+
+    reference = HuggingFaceEmbeddings(
+        model_name=args.model,
+        model_kwargs={'device': 'cpu'},
+        encode_kwargs={'normalize_embeddings': True}
+    )
+    backends = {
+        "torch-fp32": reference,
+        "onnx-fp32": BGEM3OnnxEmbeddings(args.model, args.onnx_dir, quantize=False,
+                                         intra_op_threads=args.threads or None),
+        "onnx-int8": BGEM3OnnxEmbeddings(args.model, args.onnx_dir, quantize=True,
+                                         intra_op_threads=args.threads or None),
+    }
+
+    print(f"\n🧪 벡터 일치도 (PyTorch 기준)")
+    parity = {}
+    for name in ["onnx-fp32", "onnx-int8"]:
+        print(f"   {name}:", end=" ")
+        parity[name] = check_parity(backends[name], reference, texts[:64],
+                                    min_cosine=0.999 if name == "onnx-fp32" else 0.99)
+
+    print(f"\n⏱️ 지연 시간 / 처리량")
+    results = [measure(name, model, SAMPLE_QUERIES, texts, args.repeats) for name, model in backends.items()]
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump({"cpu_count": os.cpu_count(), "parity": parity, "results": results}, f,
+                  ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
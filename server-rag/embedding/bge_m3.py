@@ -115,6 +115,16 @@ def get_bge_m3_model() -> HuggingFaceEmbeddings:
             print(f"🌐 모델 소스: {huggingface_model_name}")
             model_name = huggingface_model_name
     
+    # ONNX Runtime 백엔드 (CPU 전용 장비용, EMBEDDING_BACKEND=onnx)
+    if os.getenv('EMBEDDING_BACKEND', 'torch').lower() == 'onnx':
+        from .bge_m3_onnx import get_bge_m3_onnx_model
+
+        print(f"🔧 임베딩 백엔드: ONNX Runtime (CPU)")
+        embeddings = get_bge_m3_onnx_model(model_name)
+        print(f"🧪 모델 테스트 중...")
+        print(f"✅ 임베딩 모델 로딩 완료! (📏 임베딩 차원: {len(embeddings.embed_query('test'))})")
+        return embeddings
+
     # USE_CUDA가 false면 CUDA_VISIBLE_DEVICES를 빈 문자열로 설정하여 GPU 비활성화
     if not use_cuda:
         os.environ['CUDA_VISIBLE_DEVICES'] = ''
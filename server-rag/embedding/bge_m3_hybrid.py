@@ -0,0 +1,124 @@
+"""
+BGE-M3 dense + sparse(lexical weight) 동시 인코딩
+한 번의 forward에서 CLS hidden state로 dense 벡터를, 토큰 hidden state에 sparse_linear를 적용해
+토큰별 가중치(sparse 벡터)를 함께 계산한다. (FlagEmbedding BGEM3의 lexical_weights와 같은 방식)
+모델 번호/제품 코드(예: "SM-S928")처럼 dense 검색이 놓치는 정확 일치 토큰을 sparse 검색이 보완한다.
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+SPARSE_LINEAR_FILENAME = "sparse_linear.pt"
+
+SparseVector = Dict[int, float]
+
+
+def _to_numpy(value) -> np.ndarray:
+    """torch 텐서/리스트 → numpy"""
+    if hasattr(value, "detach"):
+        return value.detach().float().cpu().numpy()
+    return np.asarray(value)
+
+
+def resolve_sparse_linear(model_name: str) -> str:
+    """모델 폴더(또는 HuggingFace Hub)에서 sparse_linear.pt 경로"""
+    local_path = os.path.join(model_name, SPARSE_LINEAR_FILENAME)
+    if os.path.exists(local_path):
+        return local_path
+
+    from huggingface_hub import hf_hub_download
+    return hf_hub_download(repo_id=model_name, filename=SPARSE_LINEAR_FILENAME)
+
+
+class BGEM3HybridEncoder:
+    """dense 벡터와 sparse lexical weight를 한 번의 forward로 계산"""
+
+    def __init__(self, embedding_model, sparse_linear_path: str):
+        """
+        Args:
+            embedding_model: HuggingFaceEmbeddings(PyTorch) 또는 BGEM3OnnxEmbeddings
+            sparse_linear_path: BGE-M3 sparse_linear.pt (hidden → 1 선형층) 경로
+        """
+        import torch
+
+        state = torch.load(sparse_linear_path, map_location="cpu")
+        self.sparse_weight = _to_numpy(state["weight"]).reshape(-1).astype(np.float32)  # (hidden,)
+        self.sparse_bias = float(_to_numpy(state["bias"]).reshape(-1)[0])
+
+        self.embedding_model = embedding_model
+        client = getattr(embedding_model, '_client', None)
+        tokenizer = getattr(client, 'tokenizer', None)
+        self.special_token_ids = {
+            token_id for token_id in (
+                getattr(tokenizer, 'cls_token_id', None),
+                getattr(tokenizer, 'eos_token_id', None),
+                getattr(tokenizer, 'pad_token_id', None),
+                getattr(tokenizer, 'unk_token_id', None),
+            ) if token_id is not None
+        }
+
+    def _forward(self, texts: List[str]) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """텍스트별 (dense 벡터, 토큰 hidden states, 토큰 ID) - 패딩 제외"""
+        # ONNX 백엔드는 hidden state를 직접 제공
+        if hasattr(self.embedding_model, 'encode_hidden'):
+            return self.embedding_model.encode_hidden(texts)
+
+        # SentenceTransformer: output_value=None이면 한 번의 forward 결과(모든 출력)를 반환
+        client = self.embedding_model._client
+        outputs = client.encode(
+            texts,
+            output_value=None,
+            batch_size=len(texts),
+            show_progress_bar=False,
+        )
+        results = []
+        for output in outputs:
+            length = int(_to_numpy(output["attention_mask"]).sum())
+            dense = _to_numpy(output["sentence_embedding"]).astype(np.float32)
+            hidden = _to_numpy(output["token_embeddings"])[:length].astype(np.float32)
+            input_ids = _to_numpy(output["input_ids"])[:length]
+            results.append((dense, hidden, input_ids))
+        return results
+
+    def lexical_weights(self, hidden: np.ndarray, input_ids: np.ndarray) -> SparseVector:
+        """토큰 hidden states → {토큰 ID: 가중치} (ReLU, 같은 토큰은 최댓값)"""
+        weights = np.maximum(hidden @ self.sparse_weight + self.sparse_bias, 0.0)
+        sparse: SparseVector = {}
+        for token_id, weight in zip(input_ids.tolist(), weights.tolist()):
+            if token_id in self.special_token_ids or weight <= 0:
+                continue
+            if weight > sparse.get(token_id, 0.0):
+                sparse[token_id] = weight
+        return sparse
+
+    def encode_documents(self, texts: List[str]) -> List[Tuple[List[float], SparseVector]]:
+        """텍스트 목록 → [(정규화된 dense 벡터, sparse 벡터), ...]"""
+        if not texts:
+            return []
+        encoded = []
+        for dense, hidden, input_ids in self._forward(texts):
+            dense = dense / max(float(np.linalg.norm(dense)), 1e-12)
+            encoded.append((dense.tolist(), self.lexical_weights(hidden, input_ids)))
+        return encoded
+
+    def encode_query(self, text: str) -> Tuple[List[float], SparseVector]:
+        return self.encode_documents([text])[0]
+
+
+def get_hybrid_encoder(embedding_model) -> Optional[BGEM3HybridEncoder]:
+    """
+    환경변수 설정에 따라 dense + sparse 인코더 생성
+    HYBRID_SEARCH=true일 때만 생성 (기본값 false), 아니거나 모델이 없으면 None 반환 (dense 검색만 사용)
+    """
+    if embedding_model is None or os.getenv('HYBRID_SEARCH', 'false').lower() != 'true':
+        return None
+
+    model_name = getattr(embedding_model, 'source_model_name', None) or embedding_model.model_name
+    try:
+        encoder = BGEM3HybridEncoder(embedding_model, resolve_sparse_linear(model_name))
+    except Exception as e:
+        print(f"⚠️ sparse 인코더 로드 실패 - dense 검색만 사용: {e}")
+        return None
+    print(f"✅ BGE-M3 sparse 인코더 로드 완료 (하이브리드 검색)")
+    return encoder
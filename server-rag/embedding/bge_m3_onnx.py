@@ -0,0 +1,215 @@
+"""
+BGE-M3 ONNX Runtime 임베딩 백엔드 (CPU 전용 엣지 장비용)
+- PyTorch 모델을 한 번 ONNX로 내보내고, 선택적으로 동적 int8 양자화
+- ONNX Runtime 세션의 intra/inter-op 스레드 수를 조정하여 실행
+- HuggingFaceEmbeddings와 같은 embed_query/embed_documents 인터페이스
+  (dense 벡터 = CLS 토큰 hidden state + L2 정규화, BGE-M3 공식 방식과 동일)
+"""
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+ONNX_FILENAME = "model.onnx"
+ONNX_INT8_FILENAME = "model_int8.onnx"
+
+
+def export_onnx(model_name: str, onnx_dir: str) -> str:
+    """
+    BGE-M3(XLM-RoBERTa) 인코더를 ONNX로 내보냄 (이미 있으면 건너뜀)
+    fp32 가중치가 2GB를 넘으므로 외부 데이터 파일로 저장한다.
+
+    Returns:
+        ONNX 파일 경로
+    """
+    onnx_path = os.path.join(onnx_dir, ONNX_FILENAME)
+    if os.path.exists(onnx_path):
+        return onnx_path
+
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    print(f"📦 ONNX 내보내기: {model_name} → {onnx_path}")
+    started = time.time()
+    Path(onnx_dir).mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    dummy = tokenizer(["ONNX export"], return_tensors="pt")
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy["input_ids"], dummy["attention_mask"]),
+            onnx_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=17,
+        )
+    tokenizer.save_pretrained(onnx_dir)
+    print(f"✅ ONNX 내보내기 완료 ({time.time() - started:.1f}초)")
+    return onnx_path
+
+
+def quantize_int8(onnx_path: str) -> str:
+    """
+    동적 int8 양자화 (가중치 int8, 활성값은 실행 시 양자화) - 이미 있으면 건너뜀
+
+    Returns:
+        양자화된 ONNX 파일 경로
+    """
+    int8_path = os.path.join(os.path.dirname(onnx_path), ONNX_INT8_FILENAME)
+    if os.path.exists(int8_path):
+        return int8_path
+
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    print(f"🗜️ 동적 int8 양자화: {int8_path}")
+    started = time.time()
+    quantize_dynamic(
+        model_input=onnx_path,
+        model_output=int8_path,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        use_external_data_format=True,
+    )
+    print(f"✅ int8 양자화 완료 ({time.time() - started:.1f}초)")
+    return int8_path
+
+
+class BGEM3OnnxEmbeddings(Embeddings):
+    """ONNX Runtime 기반 BGE-M3 dense 임베딩"""
+
+    def __init__(self,
+                 model_name: str,
+                 onnx_dir: str,
+                 quantize: bool = True,
+                 intra_op_threads: Optional[int] = None,
+                 inter_op_threads: int = 1,
+                 batch_size: int = 32,
+                 max_seq_length: int = 8192):
+        """
+        Args:
+            model_name: PyTorch 모델 경로 또는 HuggingFace 이름 (ONNX 내보내기 원본)
+            onnx_dir: ONNX 파일/토크나이저 저장 폴더
+            quantize: True면 동적 int8 양자화 모델 사용
+            intra_op_threads: 연산자 내부 스레드 수 (None이면 CPU 코어 수)
+            inter_op_threads: 연산자 간 병렬 스레드 수 (순차 실행이므로 보통 1)
+            batch_size: embed_documents 한 번의 forward에 넣는 최대 문서 수
+            max_seq_length: 최대 토큰 길이
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        onnx_path = export_onnx(model_name, onnx_dir)
+        if quantize:
+            onnx_path = quantize_int8(onnx_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = intra_op_threads or os.cpu_count() or 1
+        options.inter_op_num_threads = inter_op_threads
+
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(onnx_dir)
+        self.max_seq_length = max_seq_length
+        self.batch_size = batch_size
+        self.quantize = quantize
+        self.onnx_path = onnx_path
+
+        # 캐시 네임스페이스(get_model_identity)가 PyTorch 벡터와 섞이지 않도록 백엔드를 이름에 포함
+        self.source_model_name = model_name
+        self.model_name = f"{model_name}#onnx{'-int8' if quantize else ''}"
+        self.encode_kwargs = {'normalize_embeddings': True}
+        # AdaptiveBatchEmbedder가 HuggingFaceEmbeddings._client에서 토크나이저/최대 길이를 읽는 경로와 호환
+        self._client = self
+
+        print(f"✅ ONNX Runtime 세션 준비: {onnx_path}")
+        print(f"   🧵 스레드: intra {options.intra_op_num_threads}, inter {options.inter_op_num_threads}")
+
+    def _run(self, texts: List[str]):
+        """토크나이즈 + forward → (last_hidden_state, input_ids, attention_mask)"""
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        input_ids = encoded["input_ids"].astype(np.int64)
+        attention_mask = encoded["attention_mask"].astype(np.int64)
+        hidden = self.session.run(
+            ["last_hidden_state"],
+            {"input_ids": input_ids, "attention_mask": attention_mask},
+        )[0]
+        return hidden, input_ids, attention_mask
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        hidden, _, _ = self._run(texts)
+        vectors = hidden[:, 0]
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    def encode_hidden(self, texts: List[str]) -> list:
+        """텍스트별 (dense 벡터, 토큰 hidden states, 토큰 ID) - sparse 가중치 계산용 (패딩 제외)"""
+        hidden, input_ids, attention_mask = self._run(texts)
+        results = []
+        for i, length in enumerate(attention_mask.sum(axis=1).tolist()):
+            results.append((hidden[i, 0], hidden[i, :length], input_ids[i, :length]))
+        return results
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for i in range(0, len(texts), self.batch_size):
+            vectors.extend(self._encode(texts[i:i + self.batch_size]).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
+
+
+def check_parity(candidate: Embeddings, reference: Embeddings, texts: List[str],
+                 min_cosine: float = 0.99) -> dict:
+    """
+    두 임베딩 백엔드의 벡터 일치도 확인 (정규화 벡터의 코사인 유사도)
+
+    Returns:
+        {"min_cosine", "mean_cosine", "passed", "count"}
+    """
+    a = np.asarray(candidate.embed_documents(texts), dtype=np.float32)
+    b = np.asarray(reference.embed_documents(texts), dtype=np.float32)
+    a /= np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b /= np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    cosines = np.sum(a * b, axis=1)
+    result = {
+        "count": len(texts),
+        "min_cosine": round(float(cosines.min()), 5),
+        "mean_cosine": round(float(cosines.mean()), 5),
+        "passed": bool(cosines.min() >= min_cosine),
+    }
+    status = "✅" if result["passed"] else "❌"
+    print(f"{status} 벡터 일치도: 최소 {result['min_cosine']}, 평균 {result['mean_cosine']} (기준 {min_cosine})")
+    return result
+
+
+def get_bge_m3_onnx_model(model_name: str) -> BGEM3OnnxEmbeddings:
+    """환경변수 설정으로 ONNX 백엔드 생성 (EMBEDDING_BACKEND=onnx)"""
+    quantize = os.getenv('ONNX_QUANTIZE', 'int8').lower() == 'int8'
+    intra = int(os.getenv('ONNX_INTRA_OP_THREADS', '0')) or None
+
+    return BGEM3OnnxEmbeddings(
+        model_name=model_name,
+        onnx_dir=os.getenv('ONNX_MODEL_DIR', '/app/embedding/models/bge-m3-onnx'),
+        quantize=quantize,
+        intra_op_threads=intra,
+        inter_op_threads=int(os.getenv('ONNX_INTER_OP_THREADS', '1')),
+        batch_size=int(os.getenv('EMBEDDING_BATCH_SIZE', '32')),
+    )
@@ -0,0 +1,310 @@
+"""
+문서 청크 임베딩 영구 캐시
+- 벡터: 메모리 맵(np.memmap) float16/float32 행렬 파일
+- 인덱스: SQLite 파일 (텍스트 해시 → 행 번호, 마지막 사용 시각)
+- 키: (모델 이름/리비전, 정규화 여부) 네임스페이스 + 텍스트 sha256
+- 쓰기: 서버/DocsWatcher/python -m indexing이 같은 디렉토리를 공유하므로 행 할당과 벡터 쓰기는 파일 잠금(fcntl) 안에서
+- 읽기: 키 → 행 조회와 행 읽기는 공유 잠금 안에서 (그 사이 다른 프로세스가 행을 교체하지 못하도록),
+        마지막 사용 시각은 모아 두었다가 쓰기/주기적으로 한 번에 반영
+"""
+import os
+import json
+import time
+import fcntl
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def get_model_identity(embedding_model) -> str:
+    """임베딩 모델 식별자 (모델 이름 + 리비전)"""
+    model_name = getattr(embedding_model, 'model_name', type(embedding_model).__name__)
+    revision = os.getenv('EMBEDDING_MODEL_REVISION', 'main')
+    return f"{model_name}@{revision}"
+
+
+def get_normalize_flag(embedding_model) -> bool:
+    """임베딩 정규화 여부"""
+    encode_kwargs = getattr(embedding_model, 'encode_kwargs', None) or {}
+    return bool(encode_kwargs.get('normalize_embeddings', False))
+
+
+class EmbeddingCache:
+    """메모리 맵 기반 임베딩 캐시 (LRU 방식의 크기 제한)"""
+
+    GROW_ROWS = 4096  # 행렬 파일을 늘리는 단위
+    TOUCH_FLUSH_ROWS = 4096  # 모아 둔 마지막 사용 시각이 이만큼 쌓이면 반영
+    TOUCH_FLUSH_SEC = 60.0  # 또는 마지막 반영 후 이 시간(초)이 지나면 반영
+
+    def __init__(self,
+                 cache_dir: str,
+                 model_id: str,
+                 normalize: bool,
+                 dim: int = 1024,
+                 dtype: str = 'float16',
+                 max_entries: int = 500000):
+        self.model_id = model_id
+        self.normalize = normalize
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.max_entries = max_entries
+
+        # 모델/정규화/차원/정밀도별로 디렉토리 분리
+        namespace_key = f"{model_id}|normalize={normalize}|dim={dim}|{self.dtype.name}"
+        namespace = hashlib.sha1(namespace_key.encode('utf-8')).hexdigest()[:16]
+        self.path = Path(cache_dir) / namespace
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "model_id": model_id,
+                    "normalize": normalize,
+                    "dim": dim,
+                    "dtype": self.dtype.name
+                }, f, ensure_ascii=False, indent=2)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path / "index.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, row INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON entries(last_used)")
+        # 하이브리드 검색용 sparse 가중치 (같은 키, JSON {토큰 ID: 가중치})
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sparse_entries (key TEXT PRIMARY KEY, weights TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+        self._vectors_path = self.path / "vectors.bin"
+        self._write_lock_path = self.path / "write.lock"
+        self._vectors = None
+        self._capacity = 0
+        self._open_vectors()
+
+        # 읽기마다 SQLite에 쓰지 않도록 모아 둔 마지막 사용 시각 {키: 시각}
+        self._pending_touches: Dict[str, float] = {}
+        self._last_touch_flush = time.time()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        print(f"🗃️ 임베딩 캐시: {self.path} ({len(self)}개 항목, 최대 {max_entries}개, {self.dtype.name})")
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _open_vectors(self):
+        """행렬 파일을 메모리 맵으로 열기"""
+        row_bytes = self.dim * self.dtype.itemsize
+        file_size = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+        self._capacity = file_size // row_bytes
+        if self._capacity == 0:
+            self._vectors = None
+            return
+        self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode='r+',
+                                  shape=(self._capacity, self.dim))
+
+    @contextmanager
+    def _process_lock(self, shared: bool = False):
+        """
+        프로세스 간 잠금 (쓰기: 행 할당 → 벡터 쓰기 → SQLite 커밋을 한 프로세스씩 /
+        shared=True 읽기: 키 → 행 조회와 행 읽기 사이에 다른 프로세스가 행을 교체하지 못하게)
+        """
+        with open(self._write_lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _ensure_capacity(self, rows: int):
+        """행렬 파일 크기를 최소 rows 행까지 확장 (다른 프로세스가 이미 늘렸으면 다시 매핑만)"""
+        if rows <= self._capacity:
+            return
+        self._open_vectors()
+        if rows <= self._capacity:
+            return
+        new_capacity = min(self.max_entries, max(rows, self._capacity + self.GROW_ROWS))
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, 'ab') as f:
+            f.truncate(new_capacity * self.dim * self.dtype.itemsize)
+        self._open_vectors()
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """텍스트 목록의 캐시된 벡터 조회 (없으면 None)"""
+        keys = [self._key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+
+        with self._lock:
+            with self._process_lock(shared=True):
+                rows = {}
+                for i in range(0, len(keys), 500):
+                    batch = keys[i:i+500]
+                    placeholders = ",".join("?" * len(batch))
+                    for key, row in self._db.execute(
+                            f"SELECT key, row FROM entries WHERE key IN ({placeholders})", batch):
+                        rows[key] = row
+
+                if rows and max(rows.values()) >= self._capacity:
+                    # 다른 프로세스가 행렬 파일을 늘린 뒤 쓴 행
+                    self._open_vectors()
+
+                for i, key in enumerate(keys):
+                    row = rows.get(key)
+                    if row is not None and row < self._capacity:
+                        results[i] = self._vectors[row].astype(np.float32).tolist()
+
+            now = time.time()
+            for key in rows:
+                self._pending_touches[key] = now
+            if (len(self._pending_touches) >= self.TOUCH_FLUSH_ROWS
+                    or now - self._last_touch_flush >= self.TOUCH_FLUSH_SEC):
+                self._flush_touches()
+
+            hit_count = len([r for r in results if r is not None])
+            self.hits += hit_count
+            self.misses += len(texts) - hit_count
+
+        return results
+
+    def _flush_touches(self):
+        """모아 둔 마지막 사용 시각을 한 번의 커밋으로 반영 (self._lock 안에서 호출)"""
+        if self._pending_touches:
+            self._db.executemany("UPDATE entries SET last_used = ? WHERE key = ?",
+                                 [(used, key) for key, used in self._pending_touches.items()])
+            self._db.commit()
+            self._pending_touches.clear()
+        self._last_touch_flush = time.time()
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]):
+        """벡터를 캐시에 저장 (용량 초과 시 가장 오래 사용되지 않은 항목부터 교체)"""
+        entries = {}
+        for text, vector in zip(texts, vectors):
+            entries[self._key(text)] = vector
+
+        with self._lock, self._process_lock():
+            # 이미 있는 키는 제외 (다른 프로세스가 잠금 전에 넣은 키 포함)
+            keys = list(entries.keys())
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i+500]
+                placeholders = ",".join("?" * len(batch))
+                for (key,) in self._db.execute(
+                        f"SELECT key FROM entries WHERE key IN ({placeholders})", batch):
+                    entries.pop(key, None)
+
+            if not entries:
+                return
+
+            # 교체 대상을 고르기 전에 최근 사용 시각 반영
+            self._flush_touches()
+
+            # 캐시보다 많으면 마지막 max_entries개만 저장
+            new_keys = list(entries.keys())[-self.max_entries:]
+
+            count = len(self)
+            free_rows = min(len(new_keys), self.max_entries - count)
+            rows = list(range(count, count + free_rows))
+
+            evict_count = len(new_keys) - free_rows
+            if evict_count > 0:
+                evicted = self._db.execute(
+                    "SELECT key, row FROM entries ORDER BY last_used ASC LIMIT ?",
+                    (evict_count,)
+                ).fetchall()
+                self._db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in evicted])
+                self._db.executemany("DELETE FROM sparse_entries WHERE key = ?", [(key,) for key, _ in evicted])
+                rows.extend(row for _, row in evicted)
+                self.evictions += len(evicted)
+
+            self._ensure_capacity(count + free_rows)
+
+            matrix = np.asarray([entries[key] for key in new_keys], dtype=self.dtype)
+            row_index = np.asarray(rows, dtype=np.int64)
+            self._vectors[row_index] = matrix
+            self._vectors.flush()
+
+            now = time.time()
+            self._db.executemany(
+                "INSERT INTO entries (key, row, last_used) VALUES (?, ?, ?)",
+                [(key, row, now) for key, row in zip(new_keys, rows)]
+            )
+            self._db.commit()
+
+    def get_sparse_many(self, texts: List[str]) -> List[Optional[Dict[int, float]]]:
+        """텍스트 목록의 캐시된 sparse 가중치 조회 (없으면 None)"""
+        keys = [self._key(text) for text in texts]
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i+500]
+                placeholders = ",".join("?" * len(batch))
+                for key, weights in self._db.execute(
+                        f"SELECT key, weights FROM sparse_entries WHERE key IN ({placeholders})", batch):
+                    found[key] = weights
+
+        return [
+            {int(token_id): weight for token_id, weight in json.loads(found[key]).items()}
+            if key in found else None
+            for key in keys
+        ]
+
+    def put_sparse_many(self, texts: List[str], sparse_vectors: List[Dict[int, float]]):
+        """sparse 가중치 저장 (dense 벡터와 같은 키, 교체 시 함께 삭제됨)"""
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sparse_entries (key, weights) VALUES (?, ?)",
+                [(self._key(text), json.dumps(sparse)) for text, sparse in zip(texts, sparse_vectors)]
+            )
+            self._db.commit()
+
+    def stats(self) -> dict:
+        """캐시 통계"""
+        total = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "model_id": self.model_id,
+            "normalize": self.normalize,
+            "dtype": self.dtype.name,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+def get_embedding_cache(embedding_model, dim: int = 1024) -> Optional[EmbeddingCache]:
+    """
+    환경변수 설정에 따라 임베딩 캐시 생성
+    EMBEDDING_CACHE=false면 None 반환
+    """
+    if os.getenv('EMBEDDING_CACHE', 'true').lower() != 'true':
+        print("⚠️ 임베딩 캐시 비활성화 (EMBEDDING_CACHE=false)")
+        return None
+
+    return EmbeddingCache(
+        cache_dir=os.getenv('EMBEDDING_CACHE_DIR', './embedding/cache'),
+        model_id=get_model_identity(embedding_model),
+        normalize=get_normalize_flag(embedding_model),
+        dim=dim,
+        dtype=os.getenv('EMBEDDING_CACHE_DTYPE', 'float16'),
+        max_entries=int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '500000'))
+    )
+
@@ -0,0 +1,165 @@
+"""
+쿼리 임베딩 마이크로배칭
+동시에 들어온 검색 쿼리를 짧은 대기 시간(window) 동안 모아 한 번의 배치 forward로 임베딩하고,
+각 호출자의 Future에 결과를 돌려준다. (배치 크기 1 forward N번 → 배치 forward 1번)
+"""
+import os
+import time
+import queue
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Callable, List
+
+
+class EmbeddingMicroBatcher:
+    """대기 시간/최대 배치 기반 쿼리 임베딩 마이크로배처"""
+
+    def __init__(self,
+                 embed_fn: Callable[[List[str]], List[List[float]]],
+                 window_ms: float = 5.0,
+                 max_batch_size: int = 32):
+        """
+        Args:
+            embed_fn: 텍스트 목록을 한 번에 임베딩하는 함수 (예: embedding_model.embed_documents)
+            window_ms: 첫 쿼리 도착 후 다른 쿼리를 기다리는 최대 시간 (밀리초)
+            max_batch_size: 한 번의 forward에 넣는 최대 쿼리 수 (차면 즉시 실행)
+        """
+        self.embed_fn = embed_fn
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+
+        # 계측
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.batch_size_histogram = {}
+        self.total_queue_delay_ms = 0.0
+        self.max_queue_delay_ms = 0.0
+        self.total_forward_ms = 0.0
+
+    def _ensure_started(self):
+        """첫 요청 시 워커 스레드 시작 (색인 CLI처럼 검색하지 않는 프로세스는 스레드를 만들지 않음)"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="query-micro-batcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """쿼리를 대기열에 넣고 결과 벡터를 받을 Future 반환"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def embed_query(self, text: str) -> List[float]:
+        """동기 호출 (배치 처리가 끝날 때까지 대기)"""
+        return self.submit(text).result()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """비동기 호출 (이벤트 루프를 막지 않고 대기)"""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _collect(self) -> List[tuple]:
+        """첫 항목을 기다린 뒤 window 안에 도착한 항목을 max_batch_size까지 모음"""
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        deadline = time.perf_counter() + self.window_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+
+            # 취소된 요청은 제외
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            try:
+                vectors = self.embed_fn([text for text, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finished = time.perf_counter()
+
+            for (_, future, _), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+            self._record(batch, started, finished)
+
+    def _record(self, batch: List[tuple], started: float, finished: float):
+        """배치 크기/대기 지연 계측"""
+        delays = [(started - enqueued) * 1000 for _, _, enqueued in batch]
+        with self._stats_lock:
+            self.requests += len(batch)
+            self.batches += 1
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            self.batch_size_histogram[len(batch)] = self.batch_size_histogram.get(len(batch), 0) + 1
+            self.total_queue_delay_ms += sum(delays)
+            self.max_queue_delay_ms = max(self.max_queue_delay_ms, max(delays))
+            self.total_forward_ms += (finished - started) * 1000
+
+    def stop(self):
+        """워커 스레드 중지"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self) -> dict:
+        """배치 크기/대기 지연 통계"""
+        with self._stats_lock:
+            return {
+                "window_ms": self.window_ms,
+                "max_batch_size": self.max_batch_size,
+                "requests": self.requests,
+                "batches": self.batches,
+                "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+                "max_batch_seen": self.max_batch_seen,
+                "batch_size_histogram": dict(sorted(self.batch_size_histogram.items())),
+                "avg_queue_delay_ms": round(self.total_queue_delay_ms / self.requests, 2) if self.requests else 0.0,
+                "max_queue_delay_ms": round(self.max_queue_delay_ms, 2),
+                "avg_forward_ms": round(self.total_forward_ms / self.batches, 2) if self.batches else 0.0
+            }
+
+
+def get_query_micro_batcher(embedding_model, embed_fn: Callable = None):
+    """
+    환경변수 설정에 따라 쿼리 임베딩 마이크로배처 생성
+    QUERY_MICRO_BATCHING=false거나 모델이 없으면(롤백 등 검색하지 않는 경우) None 반환
+
+    HuggingFaceEmbeddings.embed_query는 embed_documents([쿼리])[0]과 같으므로
+    (BGE-M3는 쿼리 instruction이 없음) 기본 배치 함수로 embed_documents를 사용한다.
+    하이브리드 검색이면 embed_fn으로 (dense, sparse) 인코더를 넘긴다.
+    """
+    if embedding_model is None or os.getenv('QUERY_MICRO_BATCHING', 'true').lower() != 'true':
+        return None
+
+    return EmbeddingMicroBatcher(
+        embed_fn=embed_fn or embedding_model.embed_documents,
+        window_ms=float(os.getenv('QUERY_BATCH_WINDOW_MS', '5')),
+        max_batch_size=int(os.getenv('QUERY_BATCH_MAX_SIZE', '32'))
+    )
@@ -0,0 +1,123 @@
+"""
+쿼리 임베딩 캐시 (메모리 LRU + TTL)
+매장에서 반복되는 질문은 BGE-M3 forward 없이 캐시된 벡터를 바로 사용한다.
+- 키: 모델 식별자 + 정규화된 쿼리 (NFKC, 앞뒤/연속 공백 정리)
+- 크기 제한을 넘으면 가장 오래 사용하지 않은 항목부터 제거, TTL이 지난 항목은 조회 시 제거
+"""
+import os
+import re
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from .cache import get_model_identity
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키용 쿼리 정규화 (대소문자는 토크나이저가 구분하므로 유지)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", query)).strip()
+
+
+class QueryEmbeddingCache:
+    """스레드 안전한 LRU + TTL 쿼리 임베딩 캐시"""
+
+    def __init__(self, model_id: str, max_entries: int = 1024, ttl_seconds: float = 3600.0):
+        """
+        Args:
+            model_id: 임베딩 모델 식별자 (모델이 바뀌면 키가 달라짐)
+            max_entries: 최대 항목 수
+            ttl_seconds: 항목 유효 시간 (초, 0 이하면 만료 없음)
+        """
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # 키 → (벡터, 저장 시각)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _key(self, query: str) -> str:
+        return f"{self.model_id}\x1f{normalize_query(query)}"
+
+    def get(self, query: str) -> Optional[List[float]]:
+        """캐시된 쿼리 벡터 (없거나 만료되면 None)"""
+        key = self._key(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            vector, stored_at = entry
+            if self.ttl_seconds > 0 and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, query: str, vector: List[float]):
+        """쿼리 벡터 저장 (크기 초과 시 LRU 항목 제거)"""
+        key = self._key(query)
+        with self._lock:
+            self._entries[key] = (vector, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, query: str, compute: Callable[[str], List[float]]) -> List[float]:
+        """캐시에 있으면 반환, 없으면 compute(query)로 임베딩 후 저장"""
+        vector = self.get(query)
+        if vector is None:
+            vector = compute(query)
+            self.put(query, vector)
+        return vector
+
+    def clear(self):
+        """전체 항목 삭제 (통계는 유지)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """캐시 통계"""
+        total = self.hits + self.misses
+        return {
+            "model_id": self.model_id,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+def get_query_embedding_cache(embedding_model) -> Optional[QueryEmbeddingCache]:
+    """
+    환경변수 설정에 따라 쿼리 임베딩 캐시 생성
+    QUERY_EMBEDDING_CACHE=false면 None 반환
+    """
+    if os.getenv('QUERY_EMBEDDING_CACHE', 'true').lower() != 'true':
+        print("⚠️ 쿼리 임베딩 캐시 비활성화 (QUERY_EMBEDDING_CACHE=false)")
+        return None
+
+    return QueryEmbeddingCache(
+        model_id=get_model_identity(embedding_model),
+        max_entries=int(os.getenv('QUERY_EMBEDDING_CACHE_SIZE', '1024')),
+        ttl_seconds=float(os.getenv('QUERY_EMBEDDING_CACHE_TTL', '3600'))
+    )
@@ -0,0 +1,102 @@
+"""
+오프라인 색인 빌드 CLI (서빙 프로세스와 분리)
+
+사용법:
+    python -m indexing                 # 증분 색인 (변경된 청크만 임베딩/삽입)
+    python -m indexing --rebuild       # 새 버전 컬렉션에 전체 재구축 후 별칭 전환
+    python -m indexing --rollback      # 별칭을 직전 버전으로 되돌림
+    python -m indexing --workers 8     # 병렬 청킹
+
+중단되더라도 다시 실행하면 이미 삽입된 청크(내용 해시 ID)는 건너뛰고 이어서 진행한다.
+색인이 끝나면 서빙 프로세스는 SERVE_MODE=attach로 기존 컬렉션에 연결만 한다.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+from embedding.bge_m3 import get_bge_m3_model
+from .build import build_index, create_vector_store
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m indexing", description="CHEESEADE RAG 오프라인 색인 빌드")
+    parser.add_argument("--docs", default="./docs", help="문서 폴더 (기본: ./docs)")
+    parser.add_argument("--rebuild", action="store_true", help="새 버전 컬렉션에 전체 재구축 후 별칭 전환")
+    parser.add_argument("--rollback", action="store_true", help="별칭을 직전 버전 컬렉션으로 되돌림")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("CHUNKING_WORKERS", "4")),
+                        help="청킹 프로세스 수 (기본 4, 1이면 순차 처리)")
+    parser.add_argument("--no-cache", action="store_true", help="임베딩 캐시 사용 안 함")
+    parser.add_argument("--report", default="./logs/index_build_report.json", help="요약 리포트 저장 경로")
+    args = parser.parse_args(argv)
+
+    if args.rollback:
+        try:
+            # 롤백은 임베딩이 필요 없으므로 모델을 로드하지 않음
+            create_vector_store(None, attach_only=True).rollback()
+        except Exception as e:
+            print(f"❌ 롤백 실패: {e}")
+            return 1
+        return 0
+
+    print(f"🏗️ 오프라인 색인 빌드 시작")
+    print(f"   문서 폴더: {args.docs}")
+    print(f"   모드: {'전체 재구축' if args.rebuild else '증분 (재개 가능)'}")
+
+    stage_times = {}
+
+    def on_stage(name, event, detail):
+        if event == "start":
+            stage_times[name] = time.time()
+            print(f"\n▶️ [{name}] 시작")
+        else:
+            elapsed = time.time() - stage_times.get(name, time.time())
+            print(f"✅ [{name}] 완료 ({elapsed:.1f}초) {detail}")
+
+    last_print = [0.0]
+
+    def on_progress(done, total):
+        now = time.time()
+        if now - last_print[0] >= 2 or done == total:
+            last_print[0] = now
+            print(f"   ⏳ 임베딩 진행: {done}/{total}")
+
+    embedding_model = get_bge_m3_model()
+
+    try:
+        _, report = build_index(
+            embedding_model,
+            docs_path=args.docs,
+            rebuild=args.rebuild,
+            workers=args.workers,
+            csv_streaming=os.getenv("CSV_STREAMING", "true").lower() == "true",
+            use_cache=not args.no_cache,
+            on_stage=on_stage,
+            progress_callback=on_progress
+        )
+    except Exception as e:
+        print(f"\n❌ 색인 빌드 실패: {e}")
+        print("   같은 명령으로 다시 실행하면 이미 삽입된 청크는 건너뛰고 이어서 진행합니다.")
+        return 1
+
+    report["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    print(f"\n📊 색인 빌드 요약")
+    for key in ["collection", "total_chunks", "added", "deleted", "unchanged",
+                "num_entities", "chunks_per_sec", "chunking_sec", "sync_sec", "elapsed_sec"]:
+        print(f"   {key}: {report.get(key)}")
+
+    try:
+        os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 리포트 저장: {args.report}")
+    except Exception as e:
+        print(f"⚠️ 리포트 저장 실패: {e}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
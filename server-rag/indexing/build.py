@@ -0,0 +1,235 @@
+"""
+색인 빌드 (청킹 → 임베딩 → 벡터 DB 삽입)
+서빙 프로세스(server.py)와 오프라인 CLI(python -m indexing)가 함께 사용한다.
+"""
+import os
+import time
+import itertools
+
+from embedding.cache import get_embedding_cache
+from embedding.query_cache import get_query_embedding_cache
+from embedding.micro_batcher import get_query_micro_batcher
+from embedding.bge_m3_hybrid import get_hybrid_encoder
+from vector_db.milvus import MilvusVectorStore
+from vector_db.tuning import load_tuning
+
+
+def get_collection_name() -> str:
+    """환경변수 기반 컬렉션 이름 (회사_메트릭_인덱스)"""
+    return os.environ["COMPANY_NAME"].lower()+'_'+os.environ["METRIC_TYPE"].lower()+'_'+os.environ["INDEX_TYPE"].lower()
+
+
+def get_index_tuning() -> dict:
+    """
+    인덱스 빌드/검색 파라미터와 기본 k (환경변수 기본값 위에 컬렉션별 튜닝 설정을 덮어씀)
+
+    Returns:
+        {"build_params": {...}, "search_params": {...}, "k": int}
+    """
+    tuning = load_tuning(get_collection_name())
+    return {
+        "build_params": {
+            "M": int(os.getenv("HNSW_M", "8")),
+            "efConstruction": int(os.getenv("HNSW_EF_CONSTRUCTION", "64")),
+            "nlist": int(os.getenv("IVF_NLIST", "128")),
+            **tuning.get("build_params", {})
+        },
+        "search_params": {
+            "ef": int(os.getenv("HNSW_EF", "64")),
+            "nprobe": int(os.getenv("IVF_NPROBE", "10")),
+            **tuning.get("search_params", {})
+        },
+        "k": int(tuning.get("k", os.getenv("RETRIEVAL_TOP_K", "8")))
+    }
+
+
+def get_vector_backend() -> str:
+    """벡터 DB 백엔드 (milvus: Milvus 서버 / local: 프로세스 내장 NumPy 전수 검색)"""
+    return os.getenv("VECTOR_BACKEND", "milvus").lower()
+
+
+def create_vector_store(embedding_model, embedding_cache=None, always_new: bool = False,
+                        attach_only: bool = False):
+    """환경변수 설정으로 벡터 스토어 생성 (VECTOR_BACKEND=local이면 LocalVectorStore)"""
+    hybrid_encoder = get_hybrid_encoder(embedding_model)
+    if get_vector_backend() == "local":
+        from vector_db.local import LocalVectorStore
+        return LocalVectorStore(
+            collection_name=get_collection_name(),
+            embedding_model=embedding_model,
+            metric_type=os.environ["METRIC_TYPE"],
+            data_dir=os.getenv("LOCAL_VECTOR_DIR", "./vector_db/local"),
+            always_new=always_new,
+            attach_only=attach_only,
+            embedding_cache=embedding_cache,
+            query_cache=get_query_embedding_cache(embedding_model),
+            query_batcher=get_query_micro_batcher(
+                embedding_model,
+                embed_fn=hybrid_encoder.encode_documents if hybrid_encoder else None
+            ),
+            hybrid_encoder=hybrid_encoder,
+            hybrid_ranker=os.getenv("HYBRID_RANKER", "rrf").lower(),
+            hybrid_rrf_k=int(os.getenv("HYBRID_RRF_K", "60")),
+            hybrid_weights=(float(os.getenv("HYBRID_DENSE_WEIGHT", "0.7")),
+                            float(os.getenv("HYBRID_SPARSE_WEIGHT", "0.3"))),
+            search_workers=int(os.getenv("SEARCH_WORKERS", "4")),
+            embed_window_size=int(os.getenv("EMBEDDING_WINDOW_SIZE", "256")),
+            embed_batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "32")),
+            embed_token_budget=int(os.getenv("EMBEDDING_TOKEN_BUDGET", "16384")),
+            insert_segment_size=int(os.getenv("INSERT_SEGMENT_SIZE", "1000"))
+        )
+
+    index_tuning = get_index_tuning()
+    vector_precision = os.getenv("VECTOR_PRECISION", "float32").lower()
+    return MilvusVectorStore(
+        collection_name=get_collection_name(),
+        embedding_model=embedding_model,
+        metric_type=os.environ["METRIC_TYPE"],
+        index_type=os.environ["INDEX_TYPE"],
+        milvus_host=os.environ["MILVUS_SERVER_IP"],
+        milvus_port=os.environ["MILVUS_PORT"],
+        always_new=always_new,
+        attach_only=attach_only,
+        keep_versions=int(os.getenv("COLLECTION_KEEP_VERSIONS", "2")),
+        embedding_cache=embedding_cache,
+        query_cache=get_query_embedding_cache(embedding_model),
+        query_batcher=get_query_micro_batcher(
+            embedding_model,
+            embed_fn=hybrid_encoder.encode_documents if hybrid_encoder else None
+        ),
+        hybrid_encoder=hybrid_encoder,
+        hybrid_ranker=os.getenv("HYBRID_RANKER", "rrf").lower(),
+        hybrid_rrf_k=int(os.getenv("HYBRID_RRF_K", "60")),
+        hybrid_weights=(float(os.getenv("HYBRID_DENSE_WEIGHT", "0.7")),
+                        float(os.getenv("HYBRID_SPARSE_WEIGHT", "0.3"))),
+        vector_precision=vector_precision,
+        rescore_factor=int(os.getenv("RESCORE_FACTOR", "4")),
+        # float16/binary 검색 후보의 재채점용 float32 원본 벡터 (색인할 때 버전 컬렉션별로 저장, 서빙에서는 읽기만)
+        original_vector_dir=os.getenv("ORIGINAL_VECTOR_DIR", "./vector_db/originals"),
+        build_params=index_tuning["build_params"],
+        search_params=index_tuning["search_params"],
+        state_refresh_sec=float(os.getenv("SEARCH_STATE_REFRESH_SEC", "300")),
+        partition_idle_sec=float(os.getenv("PARTITION_IDLE_RELEASE_SEC", "0")),
+        search_workers=int(os.getenv("SEARCH_WORKERS", "4")),
+        embed_window_size=int(os.getenv("EMBEDDING_WINDOW_SIZE", "256")),
+        embed_batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "32")),
+        embed_token_budget=int(os.getenv("EMBEDDING_TOKEN_BUDGET", "16384")),
+        insert_segment_size=int(os.getenv("INSERT_SEGMENT_SIZE", "1000"))
+    )
+
+
+def load_documents(docs_path: str = "./docs", workers: int = 1, csv_streaming: bool = True):
+    """
+    docs 폴더의 마크다운/CSV 문서 청킹
+
+    Returns:
+        (청크 이터러블, 청크 수) - CSV 스트리밍 모드면 청크 수는 None (임베딩 단계에서 소비하며 청킹)
+    """
+    # 청킹 모듈은 빌드할 때만 로드 (SERVE_MODE=attach 서빙 프로세스는 import하지 않음)
+    from chunking.chunking_md import chunk_markdown_files
+    from chunking.chunking_csv import chunk_csv_file, iter_csv_chunks
+    from chunking.parallel import chunk_docs_parallel
+
+    print(f"\n📝 문서 청킹 시작...")
+    chunks = []
+
+    if workers > 1:
+        # 파일(큰 CSV는 행 구간) 단위 병렬 청킹
+        md_chunks, csv_chunks = chunk_docs_parallel(docs_path, max_workers=workers)
+    else:
+        md_chunks = chunk_markdown_files()
+        csv_chunks = None if csv_streaming else chunk_csv_file()
+
+    # 마크다운 청크
+    if md_chunks:
+        chunks.extend(md_chunks)
+        print(f"✅ 마크다운 청킹 완료: {len(md_chunks)}개 청크 추가됨")
+    else:
+        print("⚠️ 마크다운 청크가 없습니다.")
+
+    # CSV 스트리밍: 행 → 청크 → 임베딩 배치로 흘려보내고 파일 전체를 메모리에 올리지 않음
+    if csv_chunks is None:
+        print("📡 CSV 청크는 스트리밍으로 임베딩 단계에 전달됩니다.")
+        return itertools.chain(chunks, iter_csv_chunks(docs_path)), None
+
+    # CSV 청크 추가
+    if csv_chunks:
+        chunks.extend(csv_chunks)
+        print(f"✅ CSV 청킹 완료: {len(csv_chunks)}개 청크 추가됨")
+    else:
+        print("⚠️ CSV 청크가 없습니다.")
+
+    if len(chunks) == 0:
+        print("❌ 문서 청킹 결과가 없습니다!")
+        raise ValueError("문서 청킹 실패 - 처리할 수 있는 내용이 없습니다")
+
+    print(f"✅ 청킹 완료: {len(chunks)}개 청크")
+    return chunks, len(chunks)
+
+
+def build_index(embedding_model,
+                docs_path: str = "./docs",
+                rebuild: bool = False,
+                workers: int = 1,
+                csv_streaming: bool = True,
+                use_cache: bool = True,
+                on_stage=None,
+                progress_callback=None):
+    """
+    청킹 → 임베딩 → 벡터 DB 삽입을 한 번 실행
+    청크 ID가 내용 해시이므로 중단 후 다시 실행하면 이미 삽입된 청크는 건너뛴다 (재개 가능).
+
+    Args:
+        embedding_model: 문서 임베딩 모델
+        docs_path: 문서 폴더
+        rebuild: True면 새 버전 컬렉션에 전체 재구축 후 별칭 전환 (재구축 중에도 기존 버전으로 서빙)
+        workers: 청킹 프로세스 수 (2 이상이면 병렬)
+        csv_streaming: 순차 청킹 시 CSV 스트리밍 여부
+        use_cache: 임베딩 캐시 사용 여부
+        on_stage: 단계 이벤트 콜백 on_stage(단계, "start"/"done", 상세 dict)
+        progress_callback: 임베딩 진행 콜백 (완료 수, 전체 수)
+
+    Returns:
+        (벡터 스토어, 요약 리포트 dict)
+    """
+    def stage(name: str, event: str, **detail):
+        if on_stage:
+            on_stage(name, event, detail)
+
+    started = time.time()
+    report = {"collection": get_collection_name(), "docs_path": docs_path, "rebuild": rebuild}
+
+    embedding_cache = get_embedding_cache(embedding_model) if use_cache else None
+
+    stage("chunking", "start")
+    chunk_started = time.time()
+    chunks, chunk_count = load_documents(docs_path, workers, csv_streaming)
+    stage("chunking", "done", total_chunks=chunk_count if chunk_count is not None else "streaming")
+    report["chunking_sec"] = round(time.time() - chunk_started, 2)
+
+    stage("embedding", "start", done=0, total=0)
+    print(f"\n🗄️ 벡터 스토어 초기화...")
+    vector_store = create_vector_store(embedding_model, embedding_cache, always_new=rebuild)
+
+    print(f"\n📤 문서를 벡터 DB와 동기화...")
+    sync_started = time.time()
+    sync_stats = vector_store.sync_documents(chunks, progress_callback=progress_callback)
+    print(f"✅ 벡터 DB 동기화 완료: 추가 {sync_stats['added']}개, 삭제 {sync_stats['deleted']}개, 유지 {sync_stats['unchanged']}개")
+    report.update(sync_stats)
+    report["total_chunks"] = sync_stats['added'] + sync_stats['unchanged']
+    report["sync_sec"] = round(time.time() - sync_started, 2)
+    if report["total_chunks"] == 0:
+        print("❌ 문서 청킹 결과가 없습니다!")
+        raise ValueError("문서 청킹 실패 - 처리할 수 있는 내용이 없습니다")
+    stage("embedding", "done", **sync_stats)
+
+    # 인덱스 빌드 완료 대기 및 컬렉션 로드
+    stage("index", "start")
+    report["num_entities"] = vector_store.wait_until_ready()
+    stage("index", "done", num_entities=report["num_entities"],
+          index_type=vector_store.index_type, metric_type=vector_store.metric_type)
+
+    if embedding_cache is not None:
+        report["embedding_cache"] = embedding_cache.stats()
+    report["elapsed_sec"] = round(time.time() - started, 2)
+    return vector_store, report
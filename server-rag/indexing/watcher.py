@@ -0,0 +1,162 @@
+"""
+docs 폴더 감시 및 실시간 증분 재색인
+추가/변경/삭제된 .md, .csv 파일만 다시 청킹하여 해당 source의 청크만 벡터 DB에 반영한다.
+기본은 주기적 폴링이며, watchdog(inotify)이 설치되어 있으면 파일 이벤트로 즉시 검사한다.
+"""
+import os
+import glob
+import time
+import threading
+from typing import Dict, Tuple, List
+
+from chunking.chunking_md import process_single_markdown_file
+from chunking.chunking_csv import iter_csv_file_chunks
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+WATCHED_EXTENSIONS = (".md", ".csv")
+
+
+class DocsWatcher:
+    """docs 폴더 변경 감지 → 변경된 파일만 재청킹/동기화"""
+
+    def __init__(self, vector_store, docs_path: str = "./docs", interval: float = 5.0, settle: float = 1.0):
+        """
+        Args:
+            vector_store: sync_documents(documents, sources=[...])를 제공하는 벡터 스토어
+            docs_path: 감시할 문서 폴더
+            interval: 폴링 주기 (초)
+            settle: 변경 감지 후 파일 쓰기가 끝났는지 확인하기 위한 대기 시간 (초)
+        """
+        self.vector_store = vector_store
+        self.docs_path = docs_path
+        self.interval = interval
+        self.settle = settle
+
+        self._snapshot = self._take_snapshot()
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._observer = None
+
+        self.reindex_count = 0
+        self.last_error = None
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """{파일 이름: (mtime_ns, 크기)}"""
+        snapshot = {}
+        for ext in WATCHED_EXTENSIONS:
+            for file_path in glob.glob(os.path.join(self.docs_path, f"*{ext}")):
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                snapshot[os.path.basename(file_path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _diff(self, old: Dict, new: Dict) -> Dict[str, List[str]]:
+        return {
+            "added": sorted(name for name in new if name not in old),
+            "modified": sorted(name for name in new if name in old and new[name] != old[name]),
+            "removed": sorted(name for name in old if name not in new),
+        }
+
+    def _chunk_file(self, filename: str):
+        """파일 종류에 맞는 청커로 해당 파일만 청킹"""
+        file_path = os.path.join(self.docs_path, filename)
+        if filename.endswith(".md"):
+            return process_single_markdown_file(file_path)
+        return iter_csv_file_chunks(file_path)
+
+    def scan_once(self) -> Dict[str, List[str]]:
+        """한 번 검사하고 변경된 파일을 재색인, 변경 내역 반환"""
+        current = self._take_snapshot()
+        changes = self._diff(self._snapshot, current)
+        if not any(changes.values()):
+            return changes
+
+        # 쓰기 중인 파일을 피하기 위해 잠시 후 다시 확인
+        time.sleep(self.settle)
+        settled = self._take_snapshot()
+        if settled != current:
+            return {"added": [], "modified": [], "removed": []}
+
+        print(f"\n👀 docs 변경 감지: 추가 {changes['added']}, 변경 {changes['modified']}, 삭제 {changes['removed']}")
+
+        for filename in changes["added"] + changes["modified"]:
+            try:
+                stats = self.vector_store.sync_documents(self._chunk_file(filename), sources=[filename])
+                print(f"🔄 {filename} 재색인: 추가 {stats['added']}개, 삭제 {stats['deleted']}개, 유지 {stats['unchanged']}개")
+                self._snapshot[filename] = settled[filename]
+                self.reindex_count += 1
+            except Exception as e:
+                # 스냅샷을 갱신하지 않아 다음 검사에서 재시도
+                self.last_error = f"{filename}: {e}"
+                print(f"❌ {filename} 재색인 실패: {e}")
+
+        for filename in changes["removed"]:
+            try:
+                stats = self.vector_store.sync_documents([], sources=[filename])
+                print(f"🗑️ {filename} 제거: {stats['deleted']}개 청크 삭제")
+                self._snapshot.pop(filename, None)
+                self.reindex_count += 1
+            except Exception as e:
+                self.last_error = f"{filename}: {e}"
+                print(f"❌ {filename} 청크 삭제 실패: {e}")
+
+        return changes
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.scan_once()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"❌ docs 감시 오류: {e}")
+
+    def start(self):
+        """백그라운드 감시 시작"""
+        if WATCHDOG_AVAILABLE:
+            watcher = self
+
+            class _Handler(FileSystemEventHandler):
+                def on_any_event(self, event):
+                    if str(event.src_path).endswith(WATCHED_EXTENSIONS):
+                        watcher._wakeup.set()
+
+            self._observer = Observer()
+            self._observer.schedule(_Handler(), self.docs_path, recursive=False)
+            self._observer.start()
+
+        self._thread = threading.Thread(target=self._run, name="docs-watcher", daemon=True)
+        self._thread.start()
+        mode = "inotify + 폴링" if WATCHDOG_AVAILABLE else "폴링"
+        print(f"👀 docs 감시 시작: {self.docs_path} ({mode}, {self.interval}초 주기)")
+
+    def stop(self):
+        """감시 중지"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._thread is not None:
+            self._thread.join()
+
+    def status(self) -> dict:
+        return {
+            "docs_path": self.docs_path,
+            "files": len(self._snapshot),
+            "mode": "inotify" if WATCHDOG_AVAILABLE else "polling",
+            "reindex_count": self.reindex_count,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,242 @@
+"""
+크로스 인코더 리랭킹
+Milvus에서 후보를 넉넉히(fetch_k) 가져온 뒤 (질문, 청크) 쌍을 로컬 크로스 인코더
+(BAAI/bge-reranker-v2-m3)로 배치 채점하여 상위 top_n개만 LLM 프롬프트에 넣는다.
+- 채점 결과는 (정규화된 질문, 청크 ID) 단위로 LRU 캐시
+- 검색/리랭크 지연 시간을 따로 기록
+"""
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.callbacks import CallbackManagerForRetrieverRun, AsyncCallbackManagerForRetrieverRun
+
+from embedding.query_cache import normalize_query
+
+LOCAL_RERANKER_PATH = "/app/embedding/models/bge-reranker-v2-m3"
+RERANKER_MODEL_NAME = "BAAI/bge-reranker-v2-m3"
+
+
+class CrossEncoderReranker:
+    """배치 채점 + 점수 캐시를 갖춘 크로스 인코더 리랭커"""
+
+    def __init__(self,
+                 model_name: str = RERANKER_MODEL_NAME,
+                 top_n: int = 4,
+                 batch_size: int = 16,
+                 max_length: int = 512,
+                 cache_size: int = 4096,
+                 device: Optional[str] = None):
+        """
+        Args:
+            model_name: 크로스 인코더 모델 경로 또는 HuggingFace 이름
+            top_n: 리랭크 후 남길 문서 수
+            batch_size: 한 번의 forward에 넣는 (질문, 청크) 쌍 수
+            max_length: 쌍의 최대 토큰 길이
+            cache_size: (질문, 청크 ID) 점수 캐시 최대 항목 수
+            device: 'cuda' / 'cpu' (None이면 자동)
+        """
+        from sentence_transformers import CrossEncoder
+
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name, max_length=max_length, device=device)
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+
+        self._cache: "OrderedDict[tuple, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 비동기 리랭크용 전용 스레드 (크로스 인코더 forward를 기본 executor와 공유하지 않고 한 번에 하나씩)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+
+        self.requests = 0
+        self.pairs_scored = 0
+        self.cache_hits = 0
+        self.total_rerank_ms = 0.0
+        self.total_retrieval_ms = 0.0
+        self.last_rerank_ms = 0.0
+        self.last_retrieval_ms = 0.0
+
+        print(f"✅ 리랭커 로드 완료: {model_name} (top_n={top_n}, batch={batch_size})")
+
+    @staticmethod
+    def _chunk_id(doc: Document) -> str:
+        return str(doc.metadata.get("id") or hash(doc.page_content))
+
+    def _cached_scores(self, query_key: str, docs: List[Document]) -> List[Optional[float]]:
+        with self._lock:
+            scores = []
+            for doc in docs:
+                key = (query_key, self._chunk_id(doc))
+                score = self._cache.get(key)
+                if score is not None:
+                    self._cache.move_to_end(key)
+                scores.append(score)
+            return scores
+
+    def _store_scores(self, query_key: str, docs: List[Document], scores: List[float]):
+        with self._lock:
+            for doc, score in zip(docs, scores):
+                self._cache[(query_key, self._chunk_id(doc))] = score
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def score(self, query: str, docs: List[Document]) -> List[float]:
+        """(질문, 청크) 쌍 점수 (캐시에 없는 쌍만 배치 채점)"""
+        query_key = normalize_query(query)
+        scores = self._cached_scores(query_key, docs)
+        miss = [i for i, score in enumerate(scores) if score is None]
+
+        if miss:
+            pairs = [(query, docs[i].page_content) for i in miss]
+            predicted = self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+            predicted = [float(score) for score in predicted]
+            self._store_scores(query_key, [docs[i] for i in miss], predicted)
+            for i, score in zip(miss, predicted):
+                scores[i] = score
+
+        self.pairs_scored += len(miss)
+        self.cache_hits += len(docs) - len(miss)
+        return scores
+
+    def rerank(self, query: str, docs: List[Document], top_n: Optional[int] = None) -> List[Document]:
+        """점수 순으로 정렬하여 상위 top_n개 반환 (metadata['rerank_score'] 추가, top_n 생략 시 기본값)"""
+        if not docs:
+            return []
+
+        started = time.perf_counter()
+        scores = self.score(query, docs)
+        ranked = sorted(zip(docs, scores), key=lambda pair: pair[1], reverse=True)[:top_n or self.top_n]
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.requests += 1
+        self.last_rerank_ms = elapsed_ms
+        self.total_rerank_ms += elapsed_ms
+
+        results = []
+        for doc, score in ranked:
+            doc.metadata["rerank_score"] = score
+            results.append(doc)
+        return results
+
+    async def arerank(self, query: str, docs: List[Document], top_n: Optional[int] = None) -> List[Document]:
+        """rerank의 비동기 버전 (전용 스레드에서 실행)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.rerank, query, docs, top_n)
+
+    def clear_cache(self, sources: Optional[List[str]] = None):
+        """색인 변경 리스너 - 바뀐 청크의 점수가 남지 않도록 점수 캐시 비움 (캐시 키에 source가 없어 전체)"""
+        with self._lock:
+            cleared = len(self._cache)
+            self._cache.clear()
+        if cleared:
+            print(f"🧹 리랭크 점수 캐시 {cleared}개 비움 (색인 변경: {', '.join(sources) if sources else '전체'})")
+
+    def record_retrieval(self, elapsed_ms: float):
+        """리랭크 전 후보 검색 시간 기록"""
+        self.last_retrieval_ms = elapsed_ms
+        self.total_retrieval_ms += elapsed_ms
+
+    def stats(self) -> dict:
+        """리랭크 통계 (검색/리랭크 지연 분리)"""
+        total_pairs = self.pairs_scored + self.cache_hits
+        return {
+            "model": self.model_name,
+            "top_n": self.top_n,
+            "requests": self.requests,
+            "pairs_scored": self.pairs_scored,
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": round(self.cache_hits / total_pairs, 4) if total_pairs else 0.0,
+            "cache_entries": len(self._cache),
+            "avg_retrieval_ms": round(self.total_retrieval_ms / self.requests, 2) if self.requests else 0.0,
+            "avg_rerank_ms": round(self.total_rerank_ms / self.requests, 2) if self.requests else 0.0,
+            "last_retrieval_ms": round(self.last_retrieval_ms, 2),
+            "last_rerank_ms": round(self.last_rerank_ms, 2)
+        }
+
+
+class RerankingRetriever(BaseRetriever):
+    """후보를 넉넉히 검색한 뒤 크로스 인코더로 리랭크하는 리트리버"""
+
+    base_retriever: BaseRetriever
+    reranker: CrossEncoderReranker
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def vectorstore(self):
+        """기반 리트리버의 벡터 스토어 (통계 조회 등)"""
+        return self.base_retriever.vectorstore
+
+    @staticmethod
+    def _split_kwargs(kwargs: dict) -> tuple:
+        """요청별 검색 옵션 → (기반 리트리버 검색 옵션, 리랭크 top_n) - k는 리랭크 후 개수, fetch_k는 후보 수"""
+        search_kwargs = dict(kwargs)
+        top_n = search_kwargs.pop("k", None)
+        fetch_k = search_kwargs.pop("fetch_k", None)
+        if fetch_k is not None:
+            search_kwargs["k"] = fetch_k
+        return search_kwargs, top_n
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun,
+                                **kwargs) -> List[Document]:
+        search_kwargs, top_n = self._split_kwargs(kwargs)
+        started = time.perf_counter()
+        candidates = self.base_retriever.invoke(query, **search_kwargs)
+        retrieval_ms = (time.perf_counter() - started) * 1000
+        self.reranker.record_retrieval(retrieval_ms)
+
+        docs = self.reranker.rerank(query, candidates, top_n)
+        print(f"⏱️ 후보 검색 {retrieval_ms:.1f}ms ({len(candidates)}개) / 리랭크 {self.reranker.last_rerank_ms:.1f}ms "
+              f"→ 상위 {len(docs)}개")
+        return docs
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun,
+                                       **kwargs) -> List[Document]:
+        search_kwargs, top_n = self._split_kwargs(kwargs)
+        started = time.perf_counter()
+        candidates = await self.base_retriever.ainvoke(query, **search_kwargs)
+        retrieval_ms = (time.perf_counter() - started) * 1000
+        self.reranker.record_retrieval(retrieval_ms)
+
+        # 크로스 인코더 forward는 이벤트 루프 밖(리랭커 전용 스레드)에서 실행
+        docs = await self.reranker.arerank(query, candidates, top_n)
+        print(f"⏱️ 후보 검색 {retrieval_ms:.1f}ms ({len(candidates)}개) / 리랭크 {self.reranker.last_rerank_ms:.1f}ms "
+              f"→ 상위 {len(docs)}개")
+        return docs
+
+
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """
+    환경변수 설정에 따라 리랭커 생성
+    RERANK=false면 None 반환 (HNSW 상위 k개를 그대로 사용)
+    """
+    if os.getenv('RERANK', 'false').lower() != 'true':
+        return None
+
+    model_name = RERANKER_MODEL_NAME
+    if (Path(LOCAL_RERANKER_PATH) / "config.json").exists():
+        model_name = LOCAL_RERANKER_PATH
+
+    device = None
+    if os.getenv('USE_CUDA', 'true').lower() != 'true':
+        device = 'cpu'
+
+    try:
+        return CrossEncoderReranker(
+            model_name=model_name,
+            top_n=int(os.getenv('RERANK_TOP_N', '4')),
+            batch_size=int(os.getenv('RERANK_BATCH_SIZE', '16')),
+            cache_size=int(os.getenv('RERANK_CACHE_SIZE', '4096')),
+            device=device
+        )
+    except Exception as e:
+        print(f"⚠️ 리랭커 로드 실패 - 리랭크 없이 진행: {e}")
+        return None
@@ -1,33 +1,57 @@
 from langchain_core.vectorstores import VectorStoreRetriever
 from langchain.vectorstores.base import VectorStore
-from typing import List
+from typing import List, Optional
+
+from .reranker import CrossEncoderReranker, RerankingRetriever
 
 def get_retriever(
     vertor_db: VectorStore,
-    retriever_type: str = 'top_k'
+    retriever_type: str = 'top_k',
+    reranker: Optional[CrossEncoderReranker] = None,
+    fetch_k: int = 30,
+    k: int = 4,
+    score_threshold: float = 0.2,
+    score_gap: Optional[float] = None
     ) -> VectorStoreRetriever:
+    """
+    리트리버 생성 (k는 기본 검색 결과 수 - 요청별로 retriever.invoke(질문, k=..., ef=...)로 덮어쓸 수 있다)
+    reranker가 있으면 top_k 검색으로 fetch_k개 후보를 가져와 리랭커가 상위 top_n개를 고른다.
+    threshold는 관련도 score_threshold 미만을 Milvus range search로 서버에서 잘라내고,
+    score_gap을 주면 인접 점수 차가 그보다 큰 지점에서 끊는다 (적응형 k).
+    """
+
+    if reranker is not None:
+        retriever = RerankingRetriever(
+            base_retriever=vertor_db.as_retriever(
+                search_type="similarity",
+                search_kwargs={"k": fetch_k}
+                ),
+            reranker=reranker
+            )
+        print(f"\n✅ 리랭크 retriever를 생성했습니다. (후보 {fetch_k}개 → 상위 {reranker.top_n}개)\n")
+        return retriever
 
     if retriever_type == 'top_k':
         retriever = vertor_db.as_retriever(
             search_type="similarity",
-            search_kwargs={"k": 4}
+            search_kwargs={"k": k}
             )
 
     elif retriever_type == 'threshold':
         retriever = vertor_db.as_retriever(
             search_type="similarity_score_threshold",
-            search_kwargs={"score_threshold": 0.2}
+            search_kwargs={'k': k, "score_threshold": score_threshold, "score_gap": score_gap}
             )
 
     elif retriever_type == 'mmr':
         retriever = vertor_db.as_retriever(
             search_type="mmr",
-            search_kwargs={'k': 4, 'fetch_k': 20}
+            search_kwargs={'k': k, 'fetch_k': max(20, k * 5)}
             )
 
     else:
-        retriever = vector_db.as_retriever(
-            search_kwargs={'k': 4}
+        retriever = vertor_db.as_retriever(
+            search_kwargs={'k': k}
             )
 
     print(f"\n✅ '{retriever_type}' 타입 retriever를 생성했습니다.\n")
@@ -1,8 +1,15 @@
 """
 CHEESEADE RAG Server - 메인 서버
 주요 기능: 환경설정, 모델 초기화, 청킹, 임베딩, 리트리버, RAG 구성, FastAPI 실행
+
+FastAPI 앱은 즉시 기동하고, 모델 로드/청킹/임베딩/색인은 lifespan 백그라운드 작업으로
+단계별로 수행한다. 진행 상황은 /ready 에서 확인할 수 있다.
 """
 import os
+import asyncio
+import traceback
+from contextlib import asynccontextmanager
+
 import uvicorn
 import requests
 import torch
@@ -13,17 +20,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from langchain_ollama import ChatOllama
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain.schema.runnable import RunnablePassthrough
-from langchain_core.runnables import RunnableParallel
 
-from chunking.chunking_md import chunk_markdown_file
 from embedding.bge_m3 import get_bge_m3_model
 from retriever.retriever import get_retriever
-from vector_db.milvus import MilvusVectorStore
+from retriever.reranker import get_reranker
+from indexing.build import get_collection_name
 
 from api.router import router as api_router
 from api.chat_handler import ChatHandler
 from api.endpoints import set_chat_handler
+from api.readiness import readiness
 
 # ================================
 # 환경변수 설정
@@ -32,125 +38,32 @@ from api.endpoints import set_chat_handler
 print("🔧 환경변수 로드 중...")
 LLM_SERVER_URL = os.environ["LLM_SERVER_URL"]
 RAG_MODEL_NAME = os.environ["RAG_MODEL_NAME"]
-MILVUS_SERVER_IP = os.environ["MILVUS_SERVER_IP"]
-MILVUS_PORT = os.environ["MILVUS_PORT"]
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "milvus").lower()  # milvus / local (프로세스 내장, Milvus 서버 불필요)
+MILVUS_SERVER_IP = os.getenv("MILVUS_SERVER_IP", "localhost")
+MILVUS_PORT = os.getenv("MILVUS_PORT", "19530")
 LLM_MODEL_NAME = os.environ["LLM_MODEL_NAME"]
-collection_name = os.environ["COMPANY_NAME"].lower()+'_'+os.environ["METRIC_TYPE"].lower()+'_'+os.environ["INDEX_TYPE"].lower()
+collection_name = get_collection_name()
 METRIC_TYPE = os.environ["METRIC_TYPE"]
 INDEX_TYPE = os.environ["INDEX_TYPE"]
+SERVE_MODE = os.getenv("SERVE_MODE", "build").lower()  # build / attach (오프라인 색인된 컬렉션에 연결만)
+INGEST_MODE = os.getenv("INGEST_MODE", "incremental").lower()  # incremental / rebuild
+CHUNKING_WORKERS = int(os.getenv("CHUNKING_WORKERS", "4"))  # 2 이상이면 프로세스 풀 병렬 청킹 (1이면 순차, 기본값은 .env와 같은 4)
+CSV_STREAMING = os.getenv("CSV_STREAMING", "true").lower() == "true"  # 순차 청킹 시 CSV를 스트리밍으로 처리
+DOCS_WATCH = os.getenv("DOCS_WATCH", "false").lower() == "true"  # docs 폴더 변경 시 실시간 재색인
+DOCS_WATCH_INTERVAL = float(os.getenv("DOCS_WATCH_INTERVAL", "5"))
+RERANK_FETCH_K = int(os.getenv("RERANK_FETCH_K", "30"))  # 리랭크 전 Milvus에서 가져올 후보 수
+RETRIEVER_TYPE = os.getenv("RETRIEVER_TYPE", "top_k").lower()  # top_k / threshold / mmr (리랭크 사용 시 무시)
+SCORE_THRESHOLD = float(os.getenv("SCORE_THRESHOLD", "0.2"))  # threshold: 관련도 하한 (range search radius)
+SCORE_GAP = float(os.getenv("SCORE_GAP", "0")) or None  # threshold: 인접 점수 차가 이보다 크면 끊음 (0이면 사용 안 함)
 
 print(f"✅ 환경변수 설정 완료")
 print(f"   LLM 서버: {LLM_SERVER_URL}")
 print(f"   RAG 모델: {RAG_MODEL_NAME}")
 print(f"   LLM 모델: {LLM_MODEL_NAME}")
-print(f"   Milvus: {MILVUS_SERVER_IP}:{MILVUS_PORT}")
+print(f"   벡터 DB: {'local (프로세스 내장)' if VECTOR_BACKEND == 'local' else f'Milvus {MILVUS_SERVER_IP}:{MILVUS_PORT}'}")
 print(f"   컬렉션: {collection_name}")
-
-# ================================
-# LLM 서버 연결 및 초기화
-# ================================
-
-print(f"\n🔗 LLM 서버 연결 시도...")
-try:
-    response = requests.get(f"{LLM_SERVER_URL}/api/tags", timeout=10)
-    if response.status_code == 200:
-        print(f"✅ LLM 서버 연결 성공: {LLM_SERVER_URL}")
-    else:
-        print(f"⚠️ LLM 서버 응답 오류: {response.status_code}")
-        
-    llm = ChatOllama(
-        model=LLM_MODEL_NAME,
-        base_url=LLM_SERVER_URL,
-        timeout=120
-    )
-    print(f"✅ LLM 초기화 완료: {LLM_MODEL_NAME}")
-    
-except requests.exceptions.ConnectionError:
-    print(f"❌ LLM 서버 연결 실패: {LLM_SERVER_URL}")
-    llm = None
-except Exception as e:
-    print(f"❌ LLM 서버 연결 중 오류: {e}")
-    llm = None
-
-# ================================
-# 임베딩 모델 로드
-# ================================
-
-print(f"\n🤖 임베딩 모델 로드 중...")
-if torch.cuda.is_available():
-    print(f"✅ CUDA 사용 가능: {torch.cuda.get_device_name(0)}")
-    print(f"📊 GPU 메모리: {torch.cuda.get_device_properties(0).total_memory / 1024**3:.1f}GB")
-    device = 'cuda'
-else:
-    print("⚠️ CUDA 사용 불가 - CPU 사용")
-    device = 'cpu'
-
-print(f"🔧 {device}를 사용하여 임베딩 모델 로드")
-embedding_model = get_bge_m3_model()
-print(f"✅ 임베딩 모델 로드 완료")
-
-# ================================
-# 문서 청킹
-# ================================
-
-print(f"\n📝 문서 청킹 시작...")
-chunks = []
-
-# 마크다운 청킹
-md_chunks = chunk_markdown_files()
-
-if md_chunks:
-    chunks.extend(md_chunks)
-    print(f"✅ 마크다운 청킹 완료: {len(md_chunks)}개 청크 추가됨")
-else:
-    print("⚠️ 마크다운 청크가 없습니다.")
-
-# CSV 청킹 추가
-csv_chunks = chunk_csv_file()
-
-if csv_chunks:
-    chunks.extend(csv_chunks)
-    print(f"✅ CSV 청킹 완료: {len(csv_chunks)}개 청크 추가됨")
-else:
-    print("⚠️ CSV 청크가 없습니다.")
-
-if len(chunks) == 0:
-    print("❌ 문서 청킹 결과가 없습니다!")
-    raise ValueError("문서 청킹 실패 - 처리할 수 있는 내용이 없습니다")
-
-print(f"✅ 청킹 완료: {len(chunks)}개 청크")
-
-# ================================
-# 벡터 스토어 초기화 및 문서 추가
-# ================================
-
-print(f"\n🗄️ 벡터 스토어 초기화...")
-vector_store = MilvusVectorStore(
-    collection_name=collection_name, 
-    embedding_model=embedding_model,
-    metric_type=METRIC_TYPE,
-    index_type=INDEX_TYPE,
-    milvus_host=MILVUS_SERVER_IP,  
-    milvus_port=MILVUS_PORT   
-)
-
-print(f"\n📤 문서를 벡터 DB에 추가...")
-inserted_ids = vector_store.add_documents(chunks)
-print(f"✅ 벡터 DB 추가 완료: {len(inserted_ids)}개 문서")
-
-# ================================
-# 리트리버 생성
-# ================================
-
-print(f"\n🔍 리트리버 생성...")
-retriever = get_retriever(vector_store, retriever_type='top_k')
-print(f"✅ 리트리버 생성 완료")
-
-# ================================
-# RAG 체인 구성
-# ================================
-
-print(f"\n🔗 RAG 체인 구성...")
+print(f"   서빙 모드: {SERVE_MODE}")
+print(f"   색인 모드: {INGEST_MODE}")
 
 # 시스템 프롬프트
 
@@ -222,36 +135,175 @@ RAG_prompt = ChatPromptTemplate([
     Question: {question}''')
 ])
 
-# RAG 체인 구성
-rag_chain = (
-    RunnableParallel(
-        context=retriever, 
-        question=RunnablePassthrough()
-    )
-    | RAG_prompt
-    | llm
-    | StrOutputParser()
-)
-
-print(f"✅ RAG 체인 구성 완료")
+# 초기화 결과 (백그라운드 작업에서 채워짐)
+device = None
+documents_loaded = 0
+docs_watcher = None
 
 # ================================
-# 채팅 핸들러 초기화
+# 단계별 초기화 (백그라운드)
 # ================================
 
-print(f"\n💬 채팅 핸들러 초기화...")
-chat_handler = ChatHandler(
-    rag_chain=rag_chain,
-    retriever=retriever,
-    rag_model_name=RAG_MODEL_NAME,
-    llm_server_url=LLM_SERVER_URL,
-    llm_model=llm,
-    initial_system_prompt=system_prompt
-)
+def connect_llm():
+    """LLM 서버 연결 및 초기화"""
+    print(f"\n🔗 LLM 서버 연결 시도...")
+    try:
+        response = requests.get(f"{LLM_SERVER_URL}/api/tags", timeout=10)
+        if response.status_code == 200:
+            print(f"✅ LLM 서버 연결 성공: {LLM_SERVER_URL}")
+        else:
+            print(f"⚠️ LLM 서버 응답 오류: {response.status_code}")
+            
+        llm = ChatOllama(
+            model=LLM_MODEL_NAME,
+            base_url=LLM_SERVER_URL,
+            timeout=120
+        )
+        print(f"✅ LLM 초기화 완료: {LLM_MODEL_NAME}")
+        
+    except requests.exceptions.ConnectionError:
+        print(f"❌ LLM 서버 연결 실패: {LLM_SERVER_URL}")
+        llm = None
+    except Exception as e:
+        print(f"❌ LLM 서버 연결 중 오류: {e}")
+        llm = None
+    
+    return llm
+
+def initialize_rag():
+    """
+    RAG 구성요소를 단계별로 초기화 (블로킹 작업, 워커 스레드에서 실행)
+    각 단계의 진행 상황은 readiness에 기록된다.
+    """
+    global device, documents_loaded, docs_watcher
+
+    # LLM 서버 연결
+    readiness.start("llm")
+    llm = connect_llm()
+    readiness.complete("llm", connected=llm is not None)
+
+    # 임베딩 모델 로드
+    readiness.start("embedding_model")
+    print(f"\n🤖 임베딩 모델 로드 중...")
+    if torch.cuda.is_available():
+        print(f"✅ CUDA 사용 가능: {torch.cuda.get_device_name(0)}")
+        print(f"📊 GPU 메모리: {torch.cuda.get_device_properties(0).total_memory / 1024**3:.1f}GB")
+        device = 'cuda'
+    else:
+        print("⚠️ CUDA 사용 불가 - CPU 사용")
+        device = 'cpu'
+
+    print(f"🔧 {device}를 사용하여 임베딩 모델 로드")
+    embedding_model = get_bge_m3_model()
+    print(f"✅ 임베딩 모델 로드 완료")
+    readiness.complete("embedding_model", device=device)
+
+    if SERVE_MODE == "attach":
+        # 오프라인 CLI(python -m indexing)로 만든 컬렉션에 연결만 (청킹/문서 임베딩 없음)
+        from indexing.build import create_vector_store
+
+        readiness.complete("chunking", skipped=True)
+        readiness.complete("embedding", skipped=True)
+        readiness.start("index")
+        print(f"\n🗄️ 기존 컬렉션에 연결...")
+        vector_store = create_vector_store(embedding_model, attach_only=True)
+        documents_loaded = vector_store.wait_until_ready()
+        readiness.complete("index", num_entities=documents_loaded, index_type=INDEX_TYPE, metric_type=METRIC_TYPE)
+    else:
+        # 청킹 → 임베딩 → 색인 (오프라인 CLI와 같은 코드)
+        from indexing.build import build_index
+        from indexing.watcher import DocsWatcher
+
+        # 감시 기준 스냅샷은 청킹 직전에 떠서 그 사이의 변경도 놓치지 않음
+        if DOCS_WATCH:
+            docs_watcher = DocsWatcher(None, "./docs", DOCS_WATCH_INTERVAL)
+
+        def on_stage(stage, event, detail):
+            if event == "start":
+                readiness.start(stage, **detail)
+            else:
+                readiness.complete(stage, **detail)
+
+        vector_store, report = build_index(
+            embedding_model,
+            docs_path="./docs",
+            rebuild=(INGEST_MODE == "rebuild"),
+            workers=CHUNKING_WORKERS,
+            csv_streaming=CSV_STREAMING,
+            on_stage=on_stage,
+            progress_callback=lambda done, total: readiness.update("embedding", done=done, total=total)
+        )
+        documents_loaded = report["total_chunks"]
+
+    # 리트리버 / RAG 체인 / 채팅 핸들러
+    readiness.start("retriever")
+    print(f"\n🔍 리트리버 생성...")
+    reranker = get_reranker()
+    # 기본 k는 RETRIEVAL_TOP_K (튜닝 설정 파일에 컬렉션별 값이 있으면 그 값)
+    from indexing.build import get_index_tuning
+    retrieval_k = get_index_tuning()["k"]
+    retriever = get_retriever(
+        vector_store,
+        retriever_type=RETRIEVER_TYPE,
+        reranker=reranker,
+        fetch_k=RERANK_FETCH_K,
+        k=retrieval_k,
+        score_threshold=SCORE_THRESHOLD,
+        score_gap=SCORE_GAP
+    )
+    if reranker is not None:
+        # 재색인/DocsWatcher 변경 시 리랭크 점수 캐시 무효화 (검색 상태는 벡터 스토어가 직접 갱신)
+        vector_store.add_change_listener(reranker.clear_cache)
+    print(f"✅ 리트리버 생성 완료")
+
+    print(f"\n🔗 RAG 체인 구성...")
+    # 검색은 ChatHandler가 비동기로 한 번 수행하고 {"context", "question"}으로 넘긴다
+    rag_chain = (
+        RAG_prompt
+        | llm
+        | StrOutputParser()
+    )
+    print(f"✅ RAG 체인 구성 완료")
+
+    print(f"\n💬 채팅 핸들러 초기화...")
+    chat_handler = ChatHandler(
+        rag_chain=rag_chain,
+        retriever=retriever,
+        rag_model_name=RAG_MODEL_NAME,
+        llm_server_url=LLM_SERVER_URL,
+        llm_model=llm,
+        initial_system_prompt=system_prompt
+    )
 
-# API 라우터에 채팅 핸들러 설정
-set_chat_handler(chat_handler)
-print(f"✅ 채팅 핸들러 설정 완료")
+    # API 라우터에 채팅 핸들러 설정
+    set_chat_handler(chat_handler)
+    readiness.complete("retriever", retriever_type=RETRIEVER_TYPE, k=retrieval_k)
+
+    # docs 폴더 감시 (변경된 파일만 재청킹 → 해당 source 청크만 upsert/delete)
+    if docs_watcher is not None:
+        docs_watcher.vector_store = vector_store
+        docs_watcher.start()
+    print(f"\n🎯 RAG 초기화 완료!")
+
+def run_initialization():
+    """initialize_rag 실행 + 실패 단계 기록"""
+    try:
+        initialize_rag()
+    except Exception as e:
+        failed = next((name for name, info in readiness.stages.items() if info["status"] == "running"), "llm")
+        readiness.fail(failed, str(e))
+        print(f"❌ RAG 초기화 실패 ({failed}): {e}")
+        traceback.print_exc()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 기동 직후 초기화를 백그라운드로 시작 (요청 수신은 즉시 가능)"""
+    init_task = asyncio.get_running_loop().run_in_executor(None, run_initialization)
+    yield
+    if not init_task.done():
+        print("⚠️ 초기화 진행 중 종료 요청")
+    if docs_watcher is not None:
+        docs_watcher.stop()
 
 # ================================
 # FastAPI 앱 생성 및 설정
@@ -261,7 +313,8 @@ print(f"\n🚀 FastAPI 앱 생성...")
 app = FastAPI(
     title="CHEESEADE RAG Server", 
     description="RAG API 서버 with OpenWebUI 호환", 
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS 미들웨어 추가
@@ -289,18 +342,22 @@ async def root():
         "message": "CHEESEADE RAG Server",
         "version": "1.0.0",
         "status": "running",
+        "ready": readiness.ready,
         "system": {
             "llm_model": LLM_MODEL_NAME,
             "rag_model": RAG_MODEL_NAME,
             "embedding_device": device,
-            "documents_loaded": len(chunks),
-            "vector_collection": collection_name
+            "documents_loaded": documents_loaded,
+            "vector_collection": collection_name,
+            "docs_watcher": docs_watcher.status() if docs_watcher else None
         },
         "endpoints": {
             "chat": "/api/chat/completions",
             "models": "/api/models", 
             "tags": "/api/tags",
             "health": "/health",
+            "ready": "/ready",
+            "cache_stats": "/api/cache/stats",
             "debug": "/debug/test-retrieval"
         },
         "features": [
@@ -321,9 +378,8 @@ if __name__ == "__main__":
     print(f"📊 시스템 요약:")
     print(f"   🤖 LLM 모델: {LLM_MODEL_NAME}")
     print(f"   🔍 RAG 모델: {RAG_MODEL_NAME}")
-    print(f"   📄 로드된 문서: {len(chunks)}개")
     print(f"   💾 벡터 컬렉션: {collection_name}")
-    print(f"   🖥️ 임베딩 디바이스: {device}")
+    print(f"   ⏳ 모델 로드/색인은 백그라운드에서 진행됩니다 (/ready 확인)")
     print(f"\n🌐 서버 주소: http://0.0.0.0:8000")
     print(f"📖 API 문서: http://0.0.0.0:8000/docs")
-    print
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
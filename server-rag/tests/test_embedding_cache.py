@@ -0,0 +1,64 @@
+"""
+EmbeddingCache: 행 할당/교체와 읽기 일관성
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from embedding.cache import EmbeddingCache
+
+
+def make_cache(tmp_path, max_entries=4, dtype="float32"):
+    return EmbeddingCache(str(tmp_path), "fake-model@main", normalize=True, dim=4,
+                          dtype=dtype, max_entries=max_entries)
+
+
+def vector_of(i):
+    return [float(i), float(i) + 0.5, -float(i), 1.0]
+
+
+def test_round_trip_and_miss(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_many(["a", "b"], [vector_of(1), vector_of(2)])
+
+    assert cache.get_many(["b", "x", "a"]) == [vector_of(2), None, vector_of(1)]
+    assert cache.hits == 2 and cache.misses == 1
+
+
+def test_reads_do_not_commit_last_used_until_flush(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_many(["a"], [vector_of(1)])
+    before = cache._db.execute("SELECT last_used FROM entries WHERE key = ?", (cache._key("a"),)).fetchone()[0]
+
+    cache.get_many(["a"])
+    stored = cache._db.execute("SELECT last_used FROM entries WHERE key = ?", (cache._key("a"),)).fetchone()[0]
+    assert stored == before
+    assert cache._key("a") in cache._pending_touches
+
+    cache._flush_touches()
+    stored = cache._db.execute("SELECT last_used FROM entries WHERE key = ?", (cache._key("a"),)).fetchone()[0]
+    assert stored >= before and not cache._pending_touches
+
+
+def test_eviction_uses_pending_reads(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put_many(["a"], [vector_of(1)])
+    cache.put_many(["b"], [vector_of(2)])
+    # a를 최근에 읽었으므로 c가 들어올 때 교체 대상은 b
+    cache.get_many(["a"])
+    cache.put_many(["c"], [vector_of(3)])
+
+    assert cache.get_many(["a", "b", "c"]) == [vector_of(1), None, vector_of(3)]
+    assert cache.evictions == 1
+
+
+def test_second_instance_sees_rows_written_by_first(tmp_path):
+    writer = make_cache(tmp_path, max_entries=10000)
+    reader = make_cache(tmp_path, max_entries=10000)
+    assert reader.get_many(["a"]) == [None]
+
+    # 행렬 파일을 늘리는 쓰기 뒤에도 다른 인스턴스(프로세스)가 다시 매핑해 읽음
+    texts = [f"t{i}" for i in range(EmbeddingCache.GROW_ROWS + 10)]
+    writer.put_many(texts, [vector_of(i) for i in range(len(texts))])
+
+    assert reader.get_many([texts[-1], texts[0]]) == [vector_of(len(texts) - 1), vector_of(0)]
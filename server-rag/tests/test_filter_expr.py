@@ -0,0 +1,77 @@
+"""
+필터 표현식: 파싱, 검증(허용 필드/값 타입), dict 조건 → 표현식
+"""
+import pytest
+
+from vector_db.utils import build_filter_expr, parse_filter_expr, validate_filter_expr, _to_epoch
+
+FIELDS = ["header1", "header2", "source", "task_id", "space_name", "list_name", "folder_name",
+          "date_created", "date_created_ts", "doc_type"]
+
+
+def test_parse_clauses():
+    expr = 'space_name == "X" and list_name in ["A", "B"] and date_created_ts >= 1756652400 and doc_type != "md"'
+    assert parse_filter_expr(expr) == [
+        ("space_name", "==", "X"),
+        ("list_name", "in", ["A", "B"]),
+        ("date_created_ts", ">=", 1756652400),
+        ("doc_type", "!=", "md"),
+    ]
+
+
+@pytest.mark.parametrize("expr", [
+    'space_name = "X"',
+    'space_name == X',
+    'space_name in "X"',
+    'space_name == "X" or list_name == "A"',
+    'space_name == "X" and',
+])
+def test_parse_rejects_unsupported(expr):
+    with pytest.raises(ValueError):
+        parse_filter_expr(expr)
+
+
+def test_validate_accepts_typed_values():
+    expr = 'date_created_ts >= 100 and date_created_ts < 200 and space_name in ["A", "B"]'
+    assert validate_filter_expr(expr, FIELDS) == expr
+
+
+@pytest.mark.parametrize("expr", [
+    'date_created_ts >= "x"',
+    'date_created_ts >= "2026-09-01"',
+    'date_created_ts == 1.5',
+    'date_created_ts == true',
+    'date_created_ts in [1, "2"]',
+    'space_name == 1',
+    'list_name in ["A", 2]',
+    'content == "x"',
+])
+def test_validate_rejects_wrong_field_or_type(expr):
+    with pytest.raises(ValueError):
+        validate_filter_expr(expr, FIELDS)
+
+
+def test_build_from_conditions():
+    expr = build_filter_expr({"space_name": "X", "list_name": ["A", "B"],
+                              "date_from": "2026-09-01", "date_to": 1759276800}, FIELDS)
+    assert expr == (f'space_name == "X" and list_name in ["A", "B"] and '
+                    f'date_created_ts >= {_to_epoch("2026-09-01")} and date_created_ts < 1759276800')
+    # 만든 표현식은 그대로 검증을 통과
+    assert validate_filter_expr(expr, FIELDS) == expr
+
+
+def test_build_converts_dates_for_int_field():
+    assert build_filter_expr({"date_created_ts": "2026-09-01"}, FIELDS) == \
+        f"date_created_ts == {_to_epoch('2026-09-01')}"
+
+
+@pytest.mark.parametrize("conditions", [
+    {"content": "x"},
+    {"space_name": 1},
+    {"list_name": ["A", None]},
+    {"date_created_ts": "not a date"},
+    {"date_from": "not a date"},
+])
+def test_build_rejects_wrong_field_or_type(conditions):
+    with pytest.raises(ValueError):
+        build_filter_expr(conditions, FIELDS)
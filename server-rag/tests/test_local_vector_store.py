@@ -0,0 +1,161 @@
+"""
+LocalVectorStore: 색인/동기화/삭제, 디스크에서 다시 열기, 필터/파티션, MMR, 거리 척도별 정렬
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from langchain_core.documents import Document
+
+from vector_db.local import LocalVectorStore
+from vector_db.utils import make_chunk_id
+
+DIM = 1024
+
+# 텍스트 → {축: 값} (나머지 축은 0)
+VECTORS = {
+    "apple": {0: 1.0},
+    "apple pie": {0: 0.95, 1: 0.31},
+    "banana": {1: 1.0},
+    "cherry": {0: 0.6, 2: 0.8},
+    "long": {0: 10.0},
+    "short": {0: 0.8, 1: 0.6},
+    "q_apple": {0: 1.0},
+}
+
+DOCS = [
+    Document(page_content="apple", metadata={"source": "notes/fruit.md"}),
+    Document(page_content="apple pie", metadata={"source": "notes/fruit.md"}),
+    Document(page_content="banana", metadata={"source": "tasks/list.csv", "space_name": "S1",
+                                              "date_created_ts": 200}),
+    Document(page_content="cherry", metadata={"source": "tasks/list.csv", "space_name": "S2",
+                                              "date_created_ts": 100}),
+]
+
+
+class FakeEmbeddings:
+    """고정 벡터를 돌려주는 임베딩 모델 (호출 수 기록)"""
+
+    model_name = "fake-embeddings"
+
+    def __init__(self):
+        self.calls = 0
+
+    def _vector(self, text):
+        vector = [0.0] * DIM
+        for axis, value in VECTORS[text].items():
+            vector[axis] = value
+        return vector
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        return self._vector(text)
+
+
+def make_store(tmp_path, metric_type="IP", **kwargs):
+    return LocalVectorStore("test", FakeEmbeddings(), metric_type=metric_type, data_dir=str(tmp_path), **kwargs)
+
+
+def contents(docs):
+    return [doc.page_content for doc in docs]
+
+
+def test_add_search_and_reopen(tmp_path):
+    store = make_store(tmp_path)
+    ids = store.add_documents(DOCS)
+    assert store.num_entities == 4 and ids[0] == make_chunk_id("apple", DOCS[0].metadata)
+
+    docs = store.similarity_search("q_apple", k=2)
+    assert contents(docs) == ["apple", "apple pie"]
+    assert docs[0].metadata["score"] == pytest.approx(1.0)
+
+    reopened = make_store(tmp_path, attach_only=True)
+    assert reopened.num_entities == 4
+    assert contents(reopened.similarity_search("q_apple", k=2)) == ["apple", "apple pie"]
+    assert reopened.similarity_search("q_apple", k=4)[2].metadata["space_name"] == "S2"
+
+
+def test_attach_only_requires_existing_store(tmp_path):
+    with pytest.raises(RuntimeError):
+        make_store(tmp_path, attach_only=True)
+
+
+def test_sync_adds_and_removes_only_changed_chunks(tmp_path):
+    store = make_store(tmp_path)
+    assert store.sync_documents(DOCS[:3])["added"] == 3
+    embedded = store.embedding_model.calls
+
+    result = store.sync_documents([DOCS[0], DOCS[1], DOCS[3]])
+    assert (result["added"], result["deleted"], result["unchanged"]) == (1, 1, 2)
+    assert store.embedding_model.calls == embedded + 1
+    assert sorted(contents(store.similarity_search("q_apple", k=10))) == ["apple", "apple pie", "cherry"]
+
+
+def test_delete_reuses_rows(tmp_path):
+    store = make_store(tmp_path)
+    ids = store.add_documents(DOCS)
+    row = store._pk_rows[ids[1]]
+    store.delete([ids[1]])
+
+    assert store.num_entities == 3
+    assert "apple pie" not in contents(store.similarity_search("q_apple", k=10))
+    store.add_documents([DOCS[1]])
+    assert store._pk_rows[ids[1]] == row and store._size == 4
+    assert make_store(tmp_path).num_entities == 4
+
+
+def test_filter_expr(tmp_path):
+    store = make_store(tmp_path)
+    store.add_documents(DOCS)
+
+    assert contents(store.similarity_search("q_apple", k=10, expr={"space_name": "S1"})) == ["banana"]
+    assert contents(store.similarity_search("q_apple", k=10, expr='date_created_ts >= 150')) == ["banana"]
+    assert contents(store.similarity_search("q_apple", k=10,
+                                            expr='space_name in ["S1", "S2"] and date_created_ts < 150')) == ["cherry"]
+    with pytest.raises(ValueError):
+        store.similarity_search("q_apple", k=10, expr='content == "apple"')
+
+
+def test_partitions(tmp_path):
+    store = make_store(tmp_path)
+    store.add_documents(DOCS)
+
+    assert contents(store.similarity_search("q_apple", k=10, partitions="csv")) == ["cherry", "banana"]
+    assert contents(store.similarity_search("q_apple", k=10, partitions=["notes/fruit.md"])) == ["apple", "apple pie"]
+    batch = store.similarity_search_batch(["q_apple"], k=10, partitions=["md"])
+    assert contents(batch[0]) == ["apple", "apple pie"]
+
+
+def test_mmr_skips_near_duplicate(tmp_path):
+    store = make_store(tmp_path)
+    store.add_documents(DOCS)
+
+    assert contents(store.similarity_search("q_apple", k=2)) == ["apple", "apple pie"]
+    docs = store.max_marginal_relevance_search("q_apple", k=2, fetch_k=4, lambda_mult=0.3)
+    assert docs[0].page_content == "apple" and "apple pie" not in contents(docs)
+
+
+@pytest.mark.parametrize("metric_type, expected", [
+    ("IP", ["long", "short"]),
+    ("COSINE", ["long", "short"]),
+    ("L2", ["short", "long"]),
+])
+def test_metric_ordering(tmp_path, metric_type, expected):
+    store = make_store(tmp_path, metric_type=metric_type)
+    store.add_texts(["long", "short"], [{"source": "a.md"}, {"source": "b.md"}])
+
+    docs = store.similarity_search("q_apple", k=2)
+    assert contents(docs) == expected
+    scores = [doc.metadata["score"] for doc in docs]
+    if metric_type == "L2":
+        # 제곱 거리 (작을수록 유사)
+        assert scores == pytest.approx([0.4, 81.0], rel=1e-4)
+    elif metric_type == "COSINE":
+        assert scores == pytest.approx([1.0, 0.8], rel=1e-4)
+    else:
+        assert scores == pytest.approx([10.0, 0.8], rel=1e-4)
@@ -0,0 +1,38 @@
+"""
+maximal_marginal_relevance: 관련도/다양성 균형
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from vector_db.mmr import maximal_marginal_relevance
+
+
+def test_lambda_one_is_top_k_by_similarity():
+    rng = np.random.default_rng(0)
+    query = rng.normal(size=16)
+    candidates = rng.normal(size=(20, 16))
+
+    normalized = candidates / np.linalg.norm(candidates, axis=1, keepdims=True)
+    expected = list(np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5])
+    assert maximal_marginal_relevance(query, candidates, k=5, lambda_mult=1.0) == expected
+
+
+def test_low_lambda_skips_duplicates():
+    query = [1.0, 0.0, 0.0]
+    candidates = [
+        [1.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0],  # 0번과 같은 문서
+        [0.99, 0.01, 0.0],  # 거의 같은 문서
+        [0.6, 0.8, 0.0],
+        [0.5, 0.0, 0.866],
+    ]
+    selected = maximal_marginal_relevance(query, candidates, k=3, lambda_mult=0.3)
+    assert selected[0] == 0
+    assert not {1, 2} & set(selected)
+    assert sorted(selected[1:]) == [3, 4]
+
+
+def test_k_larger_than_candidates_and_empty():
+    assert sorted(maximal_marginal_relevance([1.0, 0.0], [[1.0, 0.0], [0.0, 1.0]], k=5)) == [0, 1]
+    assert maximal_marginal_relevance([1.0, 0.0], [], k=3) == []
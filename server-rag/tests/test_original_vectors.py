@@ -0,0 +1,70 @@
+"""
+OriginalVectorStore: 교체 없는 pk 키 float32 저장소
+"""
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from vector_db.originals import OriginalVectorStore, drop_original_vectors
+
+
+def vector_of(i):
+    return [float(i), 0.1 * i, -float(i), 1.0 / (i + 1)]
+
+
+def test_keeps_every_pk_without_eviction(tmp_path):
+    store = OriginalVectorStore(str(tmp_path / "c_v1"), dim=4)
+    pks = [f"pk{i}" for i in range(OriginalVectorStore.GROW_ROWS + 5)]
+    store.put_many(pks, [vector_of(i) for i in range(len(pks))])
+
+    assert len(store) == len(pks)
+    vectors = store.get_many([pks[0], "missing", pks[-1]])
+    assert vectors[1] is None
+    np.testing.assert_array_equal(vectors[0], np.float32(vector_of(0)))
+    np.testing.assert_array_equal(vectors[2], np.float32(vector_of(len(pks) - 1)))
+    # float16 캐시와 달리 정밀도 그대로
+    assert vectors[2].dtype == np.float32 and vectors[2][1] == np.float32(0.1 * (len(pks) - 1))
+
+
+def test_reads_do_not_write(tmp_path):
+    store = OriginalVectorStore(str(tmp_path / "c_v1"), dim=4)
+    store.put_many(["a"], [vector_of(1)])
+    changes = store._db.total_changes
+    store.get_many(["a", "b"])
+    assert store._db.total_changes == changes
+
+
+def test_deleted_rows_are_reused(tmp_path):
+    store = OriginalVectorStore(str(tmp_path / "c_v1"), dim=4)
+    store.put_many(["a", "b", "c"], [vector_of(1), vector_of(2), vector_of(3)])
+    store.delete_many(["b"])
+    store.put_many(["d", "e"], [vector_of(4), vector_of(5)])
+
+    rows = dict(store._db.execute("SELECT pk, row FROM entries"))
+    assert sorted(rows.values()) == [0, 1, 2, 3] and rows["d"] == 1
+    vectors = store.get_many(["a", "b", "d", "e"])
+    assert vectors[1] is None
+    np.testing.assert_array_equal(vectors[2], np.float32(vector_of(4)))
+    np.testing.assert_array_equal(vectors[3], np.float32(vector_of(5)))
+
+
+def test_existing_pk_is_not_rewritten(tmp_path):
+    store = OriginalVectorStore(str(tmp_path / "c_v1"), dim=4)
+    store.put_many(["a"], [vector_of(1)])
+    store.put_many(["a"], [vector_of(9)])
+    np.testing.assert_array_equal(store.get_many(["a"])[0], np.float32(vector_of(1)))
+
+
+def test_other_instance_and_drop(tmp_path):
+    writer = OriginalVectorStore(str(tmp_path / "c_v1"), dim=4)
+    reader = OriginalVectorStore(str(tmp_path / "c_v1"), dim=4)
+    assert reader.get_many(["a"]) == [None]
+    writer.put_many(["a"], [vector_of(1)])
+    np.testing.assert_array_equal(reader.get_many(["a"])[0], np.float32(vector_of(1)))
+
+    writer.close()
+    reader.close()
+    drop_original_vectors(str(tmp_path), "c_v1")
+    assert not os.path.exists(tmp_path / "c_v1")
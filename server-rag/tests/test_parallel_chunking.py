@@ -0,0 +1,55 @@
+"""
+병렬 CSV 청킹(행 구간 분할)이 순차 청킹과 같은 청크를 만드는지 확인
+따옴표 안의 줄바꿈/따옴표가 구간 경계에 걸치는 경우가 핵심
+"""
+import csv
+
+import pytest
+
+pytest.importorskip("langchain_text_splitters")
+
+from chunking.chunking_csv import load_csv_from_docs, chunk_csv_files
+from chunking.parallel import chunk_docs_parallel, find_csv_row_boundaries, read_csv_header
+from vector_db.utils import make_chunk_id
+
+FIELDNAMES = ["Task ID", "Task Name", "Space Name", "List Name", "Task Content", "Comments", "Date Created Text"]
+
+
+def write_tasks_csv(path, rows: int = 40):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(FIELDNAMES)
+        for i in range(rows):
+            writer.writerow([
+                f"T{i:03d}",
+                f'작업 "{i}"',
+                "이사회" if i % 7 == 3 else "제품",  # 스킵되는 행도 섞어서 chunk 번호 보정 확인
+                "리스트",
+                f"첫 줄 {i}\n둘째 줄, \"인용\" 포함\n\n셋째 줄",
+                "[]" if i % 2 else f'댓글 "{i}"\n여러 줄',
+                "2026-09-01",
+            ])
+
+
+def chunk_keys(chunks):
+    return [(make_chunk_id(chunk.page_content, chunk.metadata),
+             chunk.metadata['row_number'], chunk.metadata['chunk_id']) for chunk in chunks]
+
+
+def test_parallel_csv_chunks_match_sequential(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    csv_path = docs / "tasks.csv"
+    write_tasks_csv(csv_path)
+
+    # 작은 구간 크기로 여러 행 구간이 생기고 경계가 따옴표 안 줄바꿈 근처에 오도록
+    fieldnames, header_end = read_csv_header(str(csv_path))
+    assert fieldnames == FIELDNAMES
+    assert len(find_csv_row_boundaries(str(csv_path), header_end, 64)) > 5
+
+    monkeypatch.chdir(tmp_path)
+    sequential = chunk_csv_files(load_csv_from_docs())
+    _, parallel = chunk_docs_parallel(str(docs), max_workers=2, csv_split_bytes=64, save_chunks=False)
+
+    assert len(sequential) == 40 - len([i for i in range(40) if i % 7 == 3])
+    assert chunk_keys(parallel) == chunk_keys(sequential)
@@ -0,0 +1,23 @@
+"""
+cut_at_score_gap: 점수 차 기준 적응형 k
+"""
+from vector_db.utils import cut_at_score_gap
+
+
+def test_cuts_at_first_large_gap():
+    assert cut_at_score_gap([0.9, 0.88, 0.5, 0.49], max_gap=0.1) == 2
+
+
+def test_keeps_all_without_gap():
+    assert cut_at_score_gap([0.9, 0.85, 0.8, 0.75], max_gap=0.1) == 4
+    assert cut_at_score_gap([], max_gap=0.1) == 0
+
+
+def test_cut_respects_min_k():
+    scores = [0.9, 0.5, 0.49, 0.1]
+    assert cut_at_score_gap(scores, max_gap=0.1) == 1
+    # min_k개 이전의 차는 무시하고 그 뒤의 첫 큰 차에서 자름
+    assert cut_at_score_gap(scores, max_gap=0.1, min_k=2) == 3
+    assert cut_at_score_gap(scores, max_gap=0.1, min_k=4) == 4
+    # min_k가 후보 수보다 많으면 전부
+    assert cut_at_score_gap(scores, max_gap=0.1, min_k=10) == 4
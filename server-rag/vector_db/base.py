@@ -0,0 +1,107 @@
+"""
+벡터 스토어 공통 임베딩 (MilvusVectorStore / LocalVectorStore)
+- 문서: 임베딩 캐시 우선, 캐시에 없는 텍스트만 길이 버킷 적응형 배치로 계산
+- 쿼리: 쿼리 캐시 → 마이크로배처 → 임베딩 스레드 순서
+하이브리드 검색이면 임베딩은 (dense, sparse) 튜플이다.
+"""
+import asyncio
+from typing import List
+
+
+class EmbeddingMixin:
+    """
+    문서/쿼리 임베딩 메서드 모음
+    사용하는 속성: embedding_model, embedding_cache, query_cache, query_batcher, hybrid, hybrid_encoder,
+    batch_embedder, _embed_executor, _change_listeners
+    """
+
+    def add_change_listener(self, callback):
+        """색인 변경 리스너 등록 - callback(변경된 source 목록 또는 None(전체))"""
+        self._change_listeners.append(callback)
+
+    def _embed_batches(self, texts: List[str], progress_callback=None, done_offset: int = 0, total: int = None) -> list:
+        """길이 버킷 적응형 배치로 임베딩 (progress_callback(완료 수, 전체 수))"""
+        total = total or len(texts)
+        callback = None
+        if progress_callback:
+            callback = lambda done, _: progress_callback(done_offset + done, total)
+        return self.batch_embedder.embed_documents(texts, callback)
+
+    def _embed_texts(self, texts: List[str], progress_callback=None) -> list:
+        """
+        문서 텍스트 임베딩 (임베딩 캐시 우선, 캐시에 없는 텍스트만 모델로 계산)
+        하이브리드 검색이면 [(dense, sparse), ...]를 반환한다.
+        """
+        if self.embedding_cache is None:
+            return self._embed_batches(texts, progress_callback)
+
+        vectors = self.embedding_cache.get_many(texts)
+        if self.hybrid:
+            # dense와 sparse가 모두 캐시에 있어야 적중 (하나라도 없으면 한 번의 forward로 둘 다 계산)
+            sparse_vectors = self.embedding_cache.get_sparse_many(texts)
+            vectors = [(dense, sparse) if dense is not None and sparse is not None else None
+                       for dense, sparse in zip(vectors, sparse_vectors)]
+        miss_indices = [i for i, vector in enumerate(vectors) if vector is None]
+        hit_count = len(texts) - len(miss_indices)
+        print(f"🗃️ 임베딩 캐시: 적중 {hit_count}개, 미스 {len(miss_indices)}개")
+        if progress_callback:
+            progress_callback(hit_count, len(texts))
+
+        if miss_indices:
+            miss_texts = [texts[i] for i in miss_indices]
+            miss_vectors = self._embed_batches(miss_texts, progress_callback, hit_count, len(texts))
+            if self.hybrid:
+                self.embedding_cache.put_many(miss_texts, [dense for dense, _ in miss_vectors])
+                self.embedding_cache.put_sparse_many(miss_texts, [sparse for _, sparse in miss_vectors])
+            else:
+                self.embedding_cache.put_many(miss_texts, miss_vectors)
+            for i, vector in zip(miss_indices, miss_vectors):
+                vectors[i] = vector
+
+        return vectors
+
+    def _embed_query(self, query: str):
+        """
+        쿼리 임베딩 (반복 질문은 캐시에서 바로 반환, 동시 요청은 마이크로배칭)
+        하이브리드 검색이면 (dense, sparse)를 반환한다.
+        """
+        if self.query_batcher:
+            embed = self.query_batcher.embed_query
+        elif self.hybrid:
+            embed = self.hybrid_encoder.encode_query
+        else:
+            embed = self.embedding_model.embed_query
+        if self.query_cache is None:
+            return embed(query)
+        return self.query_cache.get_or_compute(query, embed)
+
+    async def _aembed_query(self, query: str):
+        """쿼리 임베딩 (비동기) - 캐시 적중이면 바로 반환, 아니면 워커 스레드에서 계산"""
+        if self.query_cache is not None:
+            cached = self.query_cache.get(query)
+            if cached is not None:
+                return cached
+
+        if self.query_batcher:
+            embedding = await self.query_batcher.aembed_query(query)
+        else:
+            embed = self.hybrid_encoder.encode_query if self.hybrid else self.embedding_model.embed_query
+            embedding = await asyncio.get_running_loop().run_in_executor(self._embed_executor, embed, query)
+
+        if self.query_cache is not None:
+            self.query_cache.put(query, embedding)
+        return embedding
+
+    def _embed_queries(self, queries: List[str]) -> list:
+        """여러 쿼리 임베딩 (캐시 적중은 재사용, 나머지는 배치 임베딩)"""
+        embeddings = [self.query_cache.get(query) if self.query_cache else None for query in queries]
+        miss = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if miss:
+            miss_queries = [queries[i] for i in miss]
+            # 길이 버킷 적응형 배치 (하이브리드면 (dense, sparse)를 반환)
+            computed = self.batch_embedder.embed_documents(miss_queries)
+            for i, query, embedding in zip(miss, miss_queries, computed):
+                embeddings[i] = embedding
+                if self.query_cache:
+                    self.query_cache.put(query, embedding)
+        return embeddings
@@ -0,0 +1,152 @@
+"""
+벡터 필드 정밀도 비교 (float32 HNSW / float16 HNSW / binary BIN_IVF_FLAT + 원본 정밀도 재채점)
+- 메모리: 1M 청크 기준 벡터 필드 + 인덱스 추정 크기
+- 지연 시간: 쿼리 임베딩을 제외한 검색(+재채점) p50/p95
+- recall@k: 원본 float32 벡터 전수 검색(정답) 대비
+
+사용법:
+    python -m vector_db.benchmark_precision --docs ./docs --samples 5000 --k 8
+"""
+import os
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+from pymilvus import utility
+
+from embedding.cache import EmbeddingCache, get_model_identity, get_normalize_flag
+from embedding.benchmark_onnx import load_sample_texts
+from .milvus import MilvusVectorStore, DEFAULT_BUILD_PARAMS
+from .utils import make_chunk_id
+
+MODES = ["float32", "float16", "binary"]
+HNSW_M = DEFAULT_BUILD_PARAMS["M"]  # _create_index의 기본 HNSW M
+
+
+def estimate_memory_mb(precision: str, dim: int, rows: int = 1_000_000) -> dict:
+    """벡터 필드 + 인덱스 추정 메모리 (MB)"""
+    bytes_per_vector = {"float32": dim * 4, "float16": dim * 2, "binary": dim // 8}[precision]
+    # HNSW 0층 이웃 목록(2M개 int32), BIN_IVF_FLAT은 버킷 ID(int64)만 추가
+    index_overhead = 8 if precision == "binary" else HNSW_M * 2 * 4
+    return {
+        "vector_mb": round(bytes_per_vector * rows / 2**20, 1),
+        "index_overhead_mb": round(index_overhead * rows / 2**20, 1),
+        "total_mb": round((bytes_per_vector + index_overhead) * rows / 2**20, 1),
+    }
+
+
+def measure(store: MilvusVectorStore, queries: np.ndarray, truth: list, k: int) -> dict:
+    """검색(+재채점) 지연 시간과 recall@k"""
+    search_params = store._search_params()
+    output_fields = ["content"]
+    store._vector_search(queries[0].tolist(), k, search_params, output_fields)  # warmup
+
+    latencies = []
+    recalls = []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        docs = store._vector_search(query.tolist(), k, search_params, output_fields)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len({doc.metadata["id"] for doc in docs} & expected) / k)
+
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        f"recall@{k}": round(float(np.mean(recalls)), 4),
+    }
+
+
+def drop_store(store: MilvusVectorStore):
+    """벤치마크용 별칭/버전 컬렉션 삭제"""
+    try:
+        utility.drop_alias(store.collection_name)
+    except Exception:
+        pass
+    for name in store._list_versions():
+        utility.drop_collection(name)
+        store._drop_original_vectors(name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="벡터 필드 정밀도 비교")
+    parser.add_argument("--docs", default="./docs", help="샘플 문서 폴더")
+    parser.add_argument("--samples", type=int, default=5000, help="색인할 청크 수")
+    parser.add_argument("--queries", type=int, default=200, help="쿼리 수")
+    parser.add_argument("--k", type=int, default=8, help="recall@k의 k")
+    parser.add_argument("--rescore-factor", type=int, default=4, help="재채점 후보 배수")
+    parser.add_argument("--report", default="./logs/precision_benchmark.json", help="결과 저장 경로")
+    args = parser.parse_args(argv)
+
+    from embedding.bge_m3 import get_bge_m3_model
+
+    texts = list(dict.fromkeys(load_sample_texts(args.docs, args.samples)))
+    embedding_model = get_bge_m3_model()
+
+    # 모든 모드가 같은 벡터를 쓰도록 float32 임시 캐시를 공유
+    cache_dir = tempfile.mkdtemp(prefix="precision_bench_")
+    cache = EmbeddingCache(cache_dir, get_model_identity(embedding_model),
+                           get_normalize_flag(embedding_model), dtype="float32",
+                           max_entries=len(texts) + 1)
+
+    print(f"📊 벡터 정밀도 비교 (청크 {len(texts)}개, 쿼리 {args.queries}개, k={args.k})")
+    vectors = np.asarray(embedding_model.embed_documents(texts), dtype=np.float32)
+    cache.put_many(texts, vectors.tolist())
+
+    # 쿼리: 청크 앞부분을 잘라 만든 질문 (정답은 float32 전수 검색 상위 k개)
+    rng = random.Random(42)
+    query_texts = [text[:80] for text in rng.sample(texts, min(args.queries, len(texts)))]
+    queries = np.asarray(embedding_model.embed_documents(query_texts), dtype=np.float32)
+    ids = np.asarray([make_chunk_id(text, {}) for text in texts])
+    top = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+    truth = [set(ids[row].tolist()) for row in top]
+
+    results = []
+    for mode in MODES:
+        store = MilvusVectorStore(
+            collection_name=f"bench_precision_{mode}",
+            embedding_model=embedding_model,
+            metric_type="IP",
+            index_type="HNSW",
+            milvus_host=os.getenv("MILVUS_SERVER_IP", "localhost"),
+            milvus_port=os.getenv("MILVUS_PORT", "19530"),
+            always_new=True,
+            keep_versions=1,
+            embedding_cache=cache,
+            vector_precision=mode,
+            rescore_factor=args.rescore_factor,
+            original_vector_dir=os.path.join(cache_dir, "originals"),
+        )
+        try:
+            store.add_texts(texts, [{} for _ in texts])
+            store.wait_until_ready()
+
+            variants = [(mode, args.rescore_factor)]
+            if mode != "float32":
+                variants.insert(0, (f"{mode}-raw", 1))
+            for name, factor in variants:
+                store.rescore_factor = factor
+                result = {"mode": name, **measure(store, queries, truth, args.k),
+                          "memory_per_1m": estimate_memory_mb(mode, store.embedding_dim)}
+                results.append(result)
+                print(f"   {name:<14} p50 {result['p50_ms']:>7}ms  p95 {result['p95_ms']:>7}ms  "
+                      f"recall@{args.k} {result[f'recall@{args.k}']:.4f}  "
+                      f"1M 청크 {result['memory_per_1m']['total_mb']}MB")
+        finally:
+            drop_store(store)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump({"chunks": len(texts), "queries": len(queries), "k": args.k,
+                   "rescore_factor": args.rescore_factor, "results": results}, f,
+                  ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
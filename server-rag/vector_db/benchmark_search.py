@@ -0,0 +1,92 @@
+"""
+검색 경로 지연 시간 비교 (쿼리 임베딩 제외)
+- before: 검색마다 load() + num_entities + indexes 조회 후 search (RPC 4번)
+- after: 캐시된 검색 상태로 search만 (RPC 1번)
+
+사용법:
+    python -m vector_db.benchmark_search --queries 200 --k 8
+"""
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+
+from embedding.benchmark_onnx import SAMPLE_QUERIES
+
+
+def percentiles(latencies: list) -> dict:
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "mean_ms": round(float(np.mean(latencies)), 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="검색 경로 지연 시간 비교")
+    parser.add_argument("--queries", type=int, default=200, help="측정할 검색 횟수")
+    parser.add_argument("--k", type=int, default=8, help="검색 결과 수")
+    parser.add_argument("--report", default="./logs/search_latency.json", help="결과 저장 경로")
+    args = parser.parse_args(argv)
+
+    from embedding.bge_m3 import get_bge_m3_model
+    from indexing.build import create_vector_store
+
+    embedding_model = get_bge_m3_model()
+    store = create_vector_store(embedding_model, attach_only=True)
+    collection = store.collection
+    output_fields = ["header1", "header2", "source", "content"]
+
+    query_vectors = embedding_model.embed_documents(SAMPLE_QUERIES)
+    queries = [query_vectors[i % len(query_vectors)] for i in range(args.queries)]
+
+    def search(vector, search_params):
+        collection.search(
+            data=store._to_field_vectors([vector]),
+            anns_field="vector",
+            param=search_params,
+            limit=args.k,
+            output_fields=output_fields
+        )
+
+    search(queries[0], store._search_params())  # warmup
+
+    before = []
+    for vector in queries:
+        started = time.perf_counter()
+        collection.load()
+        total_docs = collection.num_entities
+        search_params = store._search_params()
+        search(vector, search_params)
+        before.append((time.perf_counter() - started) * 1000)
+
+    after = []
+    for vector in queries:
+        started = time.perf_counter()
+        state = store._get_search_state()
+        search(vector, state["search_params"])
+        after.append((time.perf_counter() - started) * 1000)
+
+    result = {
+        "collection": collection.name,
+        "num_entities": total_docs,
+        "queries": args.queries,
+        "k": args.k,
+        "before": percentiles(before),
+        "after": percentiles(after),
+    }
+    print(f"📊 검색 지연 시간 (쿼리 {args.queries}회, k={args.k}, 문서 {total_docs}개)")
+    for name in ["before", "after"]:
+        print(f"   {name:<7} p50 {result[name]['p50_ms']:>7}ms  p95 {result[name]['p95_ms']:>7}ms  "
+              f"평균 {result[name]['mean_ms']:>7}ms")
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
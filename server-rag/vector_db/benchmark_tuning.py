@@ -0,0 +1,237 @@
+"""
+검색 튜닝: 인덱스 빌드/검색 파라미터 스윕 → recall@k vs p99 지연 파레토 표
+- 청크: 서빙 컬렉션에 현재 색인된 청크 전체 (임시 컬렉션에 빌드 설정별로 다시 색인, 임베딩 캐시 재사용)
+- 정답: 원본 정밀도 벡터 전수 검색 상위 k개
+- 쿼리: 골든 쿼리 파일 (JSONL의 "query" 또는 한 줄에 질문 하나), 없으면 청크 앞부분으로 만든 질문
+- --write: 목표 recall을 만족하는 설정 중 p99가 가장 낮은 값을 튜닝 설정 파일에 저장
+
+사용법:
+    python -m vector_db.benchmark_tuning --golden ./logs/golden_queries.jsonl --k 4 --write
+    python -m vector_db.benchmark_tuning --m 8,16 --ef-construction 64,200 --ef 16,32,64,128
+"""
+import os
+import json
+import time
+import random
+import argparse
+import itertools
+
+import numpy as np
+
+from .milvus import MilvusVectorStore
+from .utils import make_chunk_id
+from .tuning import save_tuning, get_tuning_path
+from .benchmark_precision import drop_store
+
+
+def int_list(value: str) -> list:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def load_golden_queries(path: str) -> list:
+    """골든 쿼리 파일 (JSONL {"query": ...} 또는 한 줄에 질문 하나)"""
+    queries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                queries.append(json.loads(line)["query"])
+            else:
+                queries.append(line)
+    return queries
+
+
+def load_current_chunks(store: MilvusVectorStore) -> tuple:
+    """서빙 컬렉션의 청크 (텍스트, 메타데이터) 목록"""
+    texts, metadatas = [], []
+    iterator = store.collection.query_iterator(
+        batch_size=1000,
+        expr='pk != ""',
+        output_fields=["header1", "header2", "source", "content"]
+    )
+    while True:
+        rows = iterator.next()
+        if not rows:
+            iterator.close()
+            break
+        for row in rows:
+            texts.append(row["content"])
+            metadatas.append({"Header 1": row["header1"], "Header 2": row["header2"], "source": row["source"]})
+    return texts, metadatas
+
+
+def exact_top_k(metric_type: str, queries: np.ndarray, vectors: np.ndarray, k: int) -> np.ndarray:
+    """원본 정밀도 전수 검색 상위 k개 인덱스"""
+    if metric_type == 'L2':
+        distances = (np.sum(queries ** 2, axis=1, keepdims=True) - 2 * queries @ vectors.T
+                     + np.sum(vectors ** 2, axis=1))
+        return np.argsort(distances, axis=1)[:, :k]
+    if metric_type == 'COSINE':
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return np.argsort(-(queries @ vectors.T), axis=1)[:, :k]
+
+
+def build_grid(index_type: str, args) -> list:
+    """(빌드 파라미터, [검색 파라미터, ...]) 목록"""
+    if index_type == 'HNSW':
+        return [({"M": m, "efConstruction": ef_construction}, [{"ef": ef} for ef in args.ef])
+                for m, ef_construction in itertools.product(args.m, args.ef_construction)]
+    if index_type in ["IVF_FLAT", "IVF_SQ8", "IVF_PQ", "BIN_IVF_FLAT"]:
+        return [({"nlist": nlist}, [{"nprobe": nprobe} for nprobe in args.nprobe if nprobe <= nlist])
+                for nlist in args.nlist]
+    return [({}, [{}])]
+
+
+def measure(store: MilvusVectorStore, queries: np.ndarray, truth: list, k: int, search_params: dict) -> dict:
+    """검색 파라미터 하나의 recall@k와 지연 시간 (쿼리 임베딩 제외, 재채점 포함)"""
+    params = store._request_search_params(store._search_params(), search_params)
+    output_fields = ["content"]
+    store._vector_search(queries[0].tolist(), k, params, output_fields)  # warmup
+
+    latencies = []
+    recalls = []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        docs = store._vector_search(query.tolist(), k, params, output_fields)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len({doc.metadata["id"] for doc in docs} & expected) / k)
+
+    return {
+        "recall": round(float(np.mean(recalls)), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+    }
+
+
+def mark_pareto(results: list):
+    """recall은 높고 p99는 낮은 쪽이 우세 - 다른 결과에 지배되지 않으면 pareto=True"""
+    for result in results:
+        result["pareto"] = not any(
+            other["recall"] >= result["recall"] and other["p99_ms"] <= result["p99_ms"]
+            and (other["recall"] > result["recall"] or other["p99_ms"] < result["p99_ms"])
+            for other in results
+        )
+
+
+def choose(results: list, target_recall: float) -> dict:
+    """목표 recall을 만족하는 설정 중 p99 최소 (없으면 recall 최대)"""
+    passing = [result for result in results if result["recall"] >= target_recall]
+    if passing:
+        return min(passing, key=lambda result: (result["p99_ms"], -result["recall"]))
+    return max(results, key=lambda result: (result["recall"], -result["p99_ms"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="인덱스 빌드/검색 파라미터 튜닝 (recall@k vs p99)")
+    parser.add_argument("--golden", default=None, help="골든 쿼리 파일 (없으면 청크 앞부분으로 질문 생성)")
+    parser.add_argument("--queries", type=int, default=200, help="골든 쿼리가 없을 때 생성할 쿼리 수")
+    parser.add_argument("--k", type=int, default=int(os.getenv("RETRIEVAL_TOP_K", "8")), help="recall@k의 k")
+    parser.add_argument("--m", type=int_list, default=[8, 16, 32], help="HNSW M 후보")
+    parser.add_argument("--ef-construction", type=int_list, default=[64, 128, 256], help="HNSW efConstruction 후보")
+    parser.add_argument("--ef", type=int_list, default=[16, 32, 64, 128, 256], help="HNSW ef 후보")
+    parser.add_argument("--nlist", type=int_list, default=[64, 128, 256], help="IVF nlist 후보")
+    parser.add_argument("--nprobe", type=int_list, default=[4, 8, 16, 32, 64], help="IVF nprobe 후보")
+    parser.add_argument("--target-recall", type=float, default=0.95, help="--write 시 만족해야 할 recall@k")
+    parser.add_argument("--write", action="store_true", help="고른 설정을 튜닝 설정 파일에 저장")
+    parser.add_argument("--report", default="./logs/tuning_report.json", help="결과 저장 경로")
+    args = parser.parse_args(argv)
+
+    from embedding.bge_m3 import get_bge_m3_model
+    from embedding.cache import get_embedding_cache
+    from indexing.build import create_vector_store, get_collection_name
+
+    embedding_model = get_bge_m3_model()
+    cache = get_embedding_cache(embedding_model)
+    serving = create_vector_store(embedding_model, embedding_cache=cache, attach_only=True)
+    collection_name = get_collection_name()
+
+    texts, metadatas = load_current_chunks(serving)
+    if not texts:
+        raise SystemExit(f"❌ '{collection_name}'에 청크가 없습니다. 먼저 'python -m indexing'으로 색인을 빌드하세요.")
+    # 정답 계산용 문서 벡터 (오프라인이므로 임베딩 캐시에 없는 청크는 임베딩)
+    vectors = serving._embed_texts(texts)
+    vectors = np.asarray([vector[0] if serving.hybrid else vector for vector in vectors], dtype=np.float32)
+
+    if args.golden:
+        query_texts = load_golden_queries(args.golden)
+    else:
+        rng = random.Random(42)
+        query_texts = [text[:80] for text in rng.sample(texts, min(args.queries, len(texts)))]
+    queries = np.asarray(embedding_model.embed_documents(query_texts), dtype=np.float32)
+
+    ids = np.asarray([make_chunk_id(text, metadata) for text, metadata in zip(texts, metadatas)])
+    truth = [set(ids[row].tolist()) for row in exact_top_k(serving.metric_type, queries, vectors, args.k)]
+
+    index_type = 'BIN_IVF_FLAT' if serving.vector_precision == 'binary' else serving.index_type
+    grid = build_grid(index_type, args)
+    print(f"📊 검색 튜닝 '{collection_name}' (청크 {len(texts)}개, 쿼리 {len(queries)}개, "
+          f"k={args.k}, {index_type}, 빌드 설정 {len(grid)}개)")
+
+    results = []
+    for build_params, search_grid in grid:
+        store = MilvusVectorStore(
+            collection_name=f"tune_{collection_name}",
+            embedding_model=embedding_model,
+            metric_type=serving.metric_type,
+            index_type=serving.index_type,
+            milvus_host=os.environ["MILVUS_SERVER_IP"],
+            milvus_port=os.environ["MILVUS_PORT"],
+            always_new=True,
+            keep_versions=1,
+            embedding_cache=cache,
+            vector_precision=serving.vector_precision,
+            rescore_factor=serving.rescore_factor,
+            original_vector_dir=serving.original_vector_dir,
+            build_params=build_params,
+        )
+        try:
+            started = time.time()
+            store.add_texts(texts, metadatas)
+            store.wait_until_ready()
+            build_sec = round(time.time() - started, 2)
+
+            for search_params in search_grid:
+                result = {"build_params": build_params, "search_params": search_params, "build_sec": build_sec,
+                          **measure(store, queries, truth, args.k, search_params)}
+                results.append(result)
+                print(f"   {json.dumps(build_params):<34} {json.dumps(search_params):<16} "
+                      f"recall@{args.k} {result['recall']:.4f}  p50 {result['p50_ms']:>7}ms  "
+                      f"p99 {result['p99_ms']:>7}ms")
+        finally:
+            drop_store(store)
+
+    mark_pareto(results)
+    print(f"\n📈 파레토 (recall@{args.k} vs p99)")
+    for result in sorted((r for r in results if r["pareto"]), key=lambda r: r["recall"]):
+        print(f"   recall@{args.k} {result['recall']:.4f}  p99 {result['p99_ms']:>7}ms  "
+              f"{result['build_params']} {result['search_params']}")
+
+    chosen = choose(results, args.target_recall)
+    print(f"\n🎯 선택: {chosen['build_params']} {chosen['search_params']} "
+          f"(recall@{args.k} {chosen['recall']:.4f}, p99 {chosen['p99_ms']}ms, 목표 recall {args.target_recall})")
+
+    if args.write:
+        save_tuning(collection_name, {
+            "build_params": chosen["build_params"],
+            "search_params": chosen["search_params"],
+            "k": args.k,
+            "recall": chosen["recall"],
+            "p99_ms": chosen["p99_ms"],
+            "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        print(f"   검색 파라미터는 다음 기동부터, 빌드 파라미터는 다음 재구축(python -m indexing --rebuild)부터 적용됩니다.")
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump({"collection": collection_name, "chunks": len(texts), "queries": len(queries), "k": args.k,
+                   "index_type": index_type, "target_recall": args.target_recall, "chosen": chosen,
+                   "tuning_file": get_tuning_path() if args.write else None, "results": results}, f,
+                  ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
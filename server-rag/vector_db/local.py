@@ -0,0 +1,764 @@
+"""
+프로세스 내장 벡터 스토어 (소규모 코퍼스/CI용 - etcd/MinIO/Milvus 없이 서빙)
+- 벡터: 메모리 맵(np.memmap) float32 행렬 파일, 검색은 NumPy 전수(FLAT) 내적 한 번 (ANN 근사 없음)
+- 청크/메타데이터/sparse 가중치: SQLite 파일 (행 번호 = 행렬의 행, 삭제된 행은 재사용)
+- 필터: build_filter_expr가 만드는 표현식(==, !=, in, >=, <, and)을 메모리의 메타데이터 컬럼에 적용
+VECTOR_BACKEND=local이면 create_vector_store가 MilvusVectorStore 대신 이 스토어를 만든다.
+"""
+import json
+import time
+import shutil
+import sqlite3
+import asyncio
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from embedding.cache import EmbeddingCache
+from embedding.query_cache import QueryEmbeddingCache
+from embedding.micro_batcher import EmbeddingMicroBatcher
+from embedding.bge_m3_hybrid import BGEM3HybridEncoder
+from embedding.batching import AdaptiveBatchEmbedder
+from .utils import (make_chunk_id, cut_at_score_gap, build_filter_expr, parse_filter_expr, validate_filter_expr,
+                    DOC_TYPES, doc_type_of, partition_name_for, METADATA_FIELDS, metadata_value)
+from .mmr import maximal_marginal_relevance
+from .pipeline import run_ingestion_pipeline, PipelineStats
+from .base import EmbeddingMixin
+
+DEFAULT_LOCAL_DIR = "./vector_db/local"
+# 필터/출력 스칼라 필드 (Milvus 스키마와 같은 이름)
+SCALAR_FIELDS = ["header1", "header2", "source"] + [name for name, _, _ in METADATA_FIELDS]
+
+
+class LocalVectorStore(EmbeddingMixin, VectorStore):
+    """NumPy 전수 검색 + 메모리 맵 벡터 파일 기반 벡터 스토어 (MilvusVectorStore와 같은 검색/색인 인터페이스)"""
+
+    GROW_ROWS = 4096  # 행렬 파일을 늘리는 단위
+
+    def __init__(self,
+                 collection_name: str,
+                 embedding_model,
+                 metric_type: str = 'IP',
+                 data_dir: str = DEFAULT_LOCAL_DIR,
+                 always_new: bool = False,
+                 attach_only: bool = False,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 query_cache: Optional[QueryEmbeddingCache] = None,
+                 query_batcher: Optional[EmbeddingMicroBatcher] = None,
+                 hybrid_encoder: Optional[BGEM3HybridEncoder] = None,
+                 hybrid_ranker: str = 'rrf',
+                 hybrid_rrf_k: int = 60,
+                 hybrid_weights: tuple = (0.7, 0.3),
+                 search_workers: int = 4,
+                 embed_workers: int = 1,
+                 embed_window_size: int = 256,
+                 embed_batch_size: int = 32,
+                 embed_token_budget: int = 16384,
+                 insert_segment_size: int = 1000,
+                 ingest_queue_size: int = 4):
+        """
+        Local Vector Store for LangChain
+
+        Args:
+            collection_name: 저장 디렉토리 이름 ('{data_dir}/{이름}')
+            embedding_model: 임베딩 생성용 모델
+            metric_type: 'IP', 'COSINE', 'L2' (점수 의미는 Milvus와 같음 - L2는 제곱 거리, 작을수록 유사)
+            data_dir: 벡터/청크 파일을 저장할 상위 디렉토리
+            always_new: True면 기존 파일을 지우고 전체 재구축 (버전/별칭 없음 - 재구축 중에는 서빙 불가)
+            attach_only: True면 이미 색인된 파일에 연결만 함 (없으면 오류)
+            embedding_cache: 문서 임베딩 영구 캐시 (None이면 캐시 사용 안 함)
+            query_cache: 검색 쿼리 임베딩 메모리 캐시 (None이면 매번 임베딩)
+            query_batcher: 동시 쿼리 임베딩 마이크로배처 (None이면 요청마다 단건 임베딩)
+            hybrid_encoder: dense + sparse 동시 인코더 (None이면 dense 검색만)
+            hybrid_ranker: 하이브리드 결과 결합 방식 ('rrf' 또는 'weighted')
+            hybrid_rrf_k: RRF 상수 k
+            hybrid_weights: weighted 결합 시 (dense, sparse) 가중치
+            search_workers: 비동기 검색 스레드 수
+            embed_workers: 마이크로배처가 없을 때 비동기 쿼리 임베딩 스레드 수
+            embed_window_size: 색인 파이프라인에서 임베딩 단계로 넘기는 청크 수
+            embed_batch_size: 한 번의 임베딩 forward에 넣는 최대 행 수
+            embed_token_budget: 한 번의 임베딩 forward에 넣는 최대 토큰 수 (패딩 포함)
+            insert_segment_size: 한 번의 삽입(SQLite 트랜잭션)에 담는 행 수
+            ingest_queue_size: 파이프라인 단계 사이 큐 크기 (배치 수)
+        """
+        if metric_type not in ('IP', 'COSINE', 'L2'):
+            raise ValueError(f"지원하지 않는 metric_type: {metric_type} (IP, COSINE, L2)")
+        self.collection_name = collection_name
+        self.embedding_model = embedding_model
+        self.embedding_dim = 1024  # BAAI/bge-m3 모델의 임베딩 차원
+        self.metric_type = metric_type
+        self.index_type = 'FLAT'
+        self.vector_precision = 'float32'
+        self.embedding_cache = embedding_cache
+        self.query_cache = query_cache
+        self.query_batcher = query_batcher
+        self.hybrid_encoder = hybrid_encoder
+        self.hybrid = hybrid_encoder is not None
+        self.hybrid_ranker = hybrid_ranker
+        self.hybrid_rrf_k = hybrid_rrf_k
+        self.hybrid_weights = hybrid_weights
+        self.embed_window_size = embed_window_size
+        self.batch_embedder = AdaptiveBatchEmbedder(
+            embedding_model,
+            token_budget=embed_token_budget,
+            max_batch_size=embed_batch_size,
+            encode_fn=hybrid_encoder.encode_documents if hybrid_encoder else None
+        )
+        self.insert_segment_size = insert_segment_size
+        self.ingest_queue_size = ingest_queue_size
+        self.output_fields: List[str] = SCALAR_FIELDS + ["content"]
+
+        # 색인 변경 시 호출할 콜백 (의존 캐시 무효화 등)
+        self._change_listeners = []
+        # 삽입/삭제와 검색이 같은 배열을 보지 않도록 (검색은 1ms 미만이라 하나의 잠금으로 직렬화)
+        self._lock = threading.RLock()
+        self._search_executor = ThreadPoolExecutor(max_workers=search_workers, thread_name_prefix="local-search")
+        self._embed_executor = ThreadPoolExecutor(max_workers=embed_workers, thread_name_prefix="query-embed")
+
+        self.path = Path(data_dir) / collection_name
+        db_path = self.path / "chunks.sqlite3"
+        if attach_only and not db_path.exists():
+            raise RuntimeError(
+                f"로컬 벡터 스토어 '{self.path}'가 없습니다. 먼저 'python -m indexing'으로 색인을 빌드하세요."
+            )
+        if always_new and self.path.exists():
+            print(f"🗑️ 기존 로컬 벡터 스토어 '{self.path}'를 지우고 전체 재구축합니다.")
+            shutil.rmtree(self.path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._check_meta(attach_only)
+
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "row INTEGER PRIMARY KEY, pk TEXT UNIQUE NOT NULL, content TEXT NOT NULL, "
+            "fields TEXT NOT NULL, sparse TEXT)"
+        )
+        self._db.commit()
+
+        self._vectors_path = self.path / "vectors.f32"
+        self._vectors = None
+        self._capacity = 0
+        self._open_vectors()
+        self._load_rows()
+
+        print(f"\n✅ 로컬 벡터 스토어 '{self.path}' (문서 수: {self.num_entities}, {metric_type}, "
+              f"{'하이브리드' if self.hybrid else 'dense'})\n")
+
+    def _check_meta(self, attach_only: bool):
+        """저장된 설정(하이브리드 여부)이 현재 설정과 다르면 재구축 (연결만 할 때는 dense 검색으로 낮춤)"""
+        meta_path = self.path / "meta.json"
+        if meta_path.exists():
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored.get("hybrid") == self.hybrid or (attach_only and stored.get("hybrid")):
+                return
+            if attach_only:
+                print(f"⚠️ 로컬 벡터 스토어 '{self.path}'에 sparse 가중치가 없어 dense 검색만 사용합니다. (재색인 필요)")
+                self.hybrid = False
+                if self.query_batcher is not None:
+                    self.query_batcher.embed_fn = self.embedding_model.embed_documents
+                self.batch_embedder.encode_fn = self.embedding_model.embed_documents
+                return
+            print(f"⚠️ 로컬 벡터 스토어 '{self.path}'의 하이브리드 설정이 달라 전체 재구축합니다.")
+            shutil.rmtree(self.path)
+            self.path.mkdir(parents=True, exist_ok=True)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({"dim": self.embedding_dim, "hybrid": self.hybrid, "metric_type": self.metric_type},
+                      f, ensure_ascii=False, indent=2)
+
+    def _open_vectors(self):
+        """행렬 파일을 메모리 맵으로 열기"""
+        row_bytes = self.embedding_dim * 4
+        file_size = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+        self._capacity = file_size // row_bytes
+        if self._capacity == 0:
+            self._vectors = None
+            return
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r+',
+                                  shape=(self._capacity, self.embedding_dim))
+
+    def _ensure_capacity(self, rows: int):
+        """행렬 파일 크기를 최소 rows 행까지 확장"""
+        if rows <= self._capacity:
+            return
+        new_capacity = max(rows, self._capacity + self.GROW_ROWS)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, 'ab') as f:
+            f.truncate(new_capacity * self.embedding_dim * 4)
+        self._open_vectors()
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:len(self._alive)] = self._alive
+        self._alive = alive
+
+    def _load_rows(self):
+        """SQLite의 청크를 메모리 컬럼으로 로드"""
+        self._pks: Dict[int, str] = {}
+        self._pk_rows: Dict[str, int] = {}
+        self._contents: Dict[int, str] = {}
+        self._fields: Dict[int, Dict[str, Any]] = {}
+        self._sparse: Dict[int, Dict[int, float]] = {}
+        self._alive = np.zeros(self._capacity, dtype=bool)
+        for row, pk, content, fields, sparse in self._db.execute(
+                "SELECT row, pk, content, fields, sparse FROM chunks"):
+            self._set_row(row, pk, content, json.loads(fields),
+                          {int(token_id): weight for token_id, weight in json.loads(sparse).items()} if sparse else None)
+        self._size = max(self._pks, default=-1) + 1
+        self._free_rows = [row for row in range(self._size) if row not in self._pks]
+        self._invalidate()
+
+    def _set_row(self, row: int, pk: str, content: str, fields: Dict[str, Any], sparse: Optional[Dict[int, float]]):
+        self._pks[row] = pk
+        self._pk_rows[pk] = row
+        self._contents[row] = content
+        self._fields[row] = fields
+        if sparse is not None:
+            self._sparse[row] = sparse
+        self._alive[row] = True
+
+    def _invalidate(self):
+        """삽입/삭제 후 파생 배열(필터 컬럼, 제곱 노름, sparse 역색인) 캐시 비움"""
+        self._columns: Dict[str, np.ndarray] = {}
+        self._sq_norms = None
+        self._postings = None
+
+    @property
+    def num_entities(self) -> int:
+        return len(self._pks)
+
+    def _notify_change(self, sources: Optional[List[str]] = None):
+        """색인 변경을 리스너에게 알림"""
+        for callback in self._change_listeners:
+            try:
+                callback(sources)
+            except Exception as e:
+                print(f"⚠️ 색인 변경 리스너 오류: {e}")
+
+    def wait_until_ready(self) -> int:
+        """행렬 파일을 디스크에 반영하고 문서 수 반환 (빌드할 인덱스 없음)"""
+        self.flush()
+        return self.num_entities
+
+    def flush(self):
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._db.commit()
+
+    def rollback(self) -> str:
+        raise RuntimeError(f"로컬 벡터 스토어 '{self.path}'는 버전 컬렉션이 없어 롤백할 수 없습니다.")
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """쿼리/문서 임베딩 캐시 및 쿼리 마이크로배칭 통계"""
+        return {
+            "query_embedding_cache": self.query_cache.stats() if self.query_cache else None,
+            "document_embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None,
+            "query_micro_batcher": self.query_batcher.stats() if self.query_batcher else None,
+            "local_vector_store": {"path": str(self.path), "entities": self.num_entities,
+                                   "rows": self._size, "capacity": self._capacity}
+        }
+
+    # ------------------------------------------------------------------
+    # 색인
+    # ------------------------------------------------------------------
+
+    def _row_fields(self, metadata: dict) -> Dict[str, Any]:
+        """청크 메타데이터 → 스칼라 필드 값 (Milvus 스키마와 같은 이름/기본값)"""
+        fields = {
+            "header1": metadata.get('Header 1', ''),
+            "header2": metadata.get('Header 2', ''),
+            "source": metadata.get('source', ''),
+        }
+        for name, _, _ in METADATA_FIELDS:
+            value = doc_type_of(metadata.get('source', '')) if name == "doc_type" else metadata.get(name)
+            fields[name] = metadata_value(name, value)
+        return fields
+
+    def _insert_rows(self, rows: List[tuple]):
+        """[(pk, text, metadata, vector), ...] 세그먼트 삽입 (빈 행 재사용, 같은 pk는 덮어씀)"""
+        with self._lock:
+            records = []
+            for pk, text, metadata, vector in rows:
+                sparse = None
+                if self.hybrid:
+                    vector, sparse = vector
+                row = self._pk_rows.get(pk)
+                if row is None:
+                    row = self._free_rows.pop() if self._free_rows else self._size
+                    self._size = max(self._size, row + 1)
+                self._ensure_capacity(self._size)
+
+                vector = np.asarray(vector, dtype=np.float32)
+                if self.metric_type == 'COSINE':
+                    # 코사인은 저장 시 정규화하여 검색은 내적 한 번
+                    vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+                self._vectors[row] = vector
+                fields = self._row_fields(metadata)
+                self._set_row(row, pk, text, fields, sparse)
+                records.append((row, pk, text, json.dumps(fields, ensure_ascii=False),
+                                json.dumps(sparse) if sparse is not None else None))
+
+            self._db.executemany(
+                "INSERT OR REPLACE INTO chunks (row, pk, content, fields, sparse) VALUES (?, ?, ?, ?, ?)", records
+            )
+            self._db.commit()
+            self._invalidate()
+
+    def _ingest(self, records: Iterable[tuple], total: Optional[int] = None, progress_callback=None) -> PipelineStats:
+        """(pk, text, metadata) 스트림을 임베딩 → 삽입 파이프라인으로 처리"""
+        return run_ingestion_pipeline(
+            records,
+            embed_fn=self._embed_texts,
+            insert_fn=self._insert_rows,
+            embed_batch_size=self.embed_window_size,
+            segment_size=self.insert_segment_size,
+            queue_size=self.ingest_queue_size,
+            total=total,
+            progress_callback=progress_callback
+        )
+
+    def add_texts(self, texts: List[str], metadatas: Optional[List[dict]] = None, **kwargs) -> List[str]:
+        """텍스트 리스트를 벡터 스토어에 추가 (임베딩과 삽입을 파이프라인으로 겹쳐 실행)"""
+        if metadatas is None:
+            metadatas = [{}] * len(texts)
+
+        ids = kwargs.get('ids')
+        if ids is None:
+            ids = [make_chunk_id(text, metadata) for text, metadata in zip(texts, metadatas)]
+
+        seen = set()
+        unique = [i for i, pk in enumerate(ids) if not (pk in seen or seen.add(pk))]
+        if len(unique) != len(texts):
+            print(f"⚠️ 중복 청크 {len(texts) - len(unique)}개 제외")
+        if len(unique) == 0:
+            return []
+
+        print(f"\n📤 {len(unique)}개 문서를 파이프라인으로 처리합니다...")
+        records = ((ids[i], texts[i], metadatas[i]) for i in unique)
+        self._ingest(records, total=len(unique), progress_callback=kwargs.get('progress_callback'))
+        self.flush()
+        self._notify_change()
+        return [ids[i] for i in unique]
+
+    def add_documents(self, documents: List[Document], **kwargs) -> List[str]:
+        """Document 객체 리스트를 벡터 스토어에 추가"""
+        return self.add_texts([doc.page_content for doc in documents], [doc.metadata for doc in documents], **kwargs)
+
+    def get_manifest(self, sources: Optional[List[str]] = None) -> Dict[str, str]:
+        """현재 색인된 청크 목록 {pk: source} (sources를 지정하면 해당 source의 청크만)"""
+        with self._lock:
+            wanted = set(sources) if sources else None
+            return {pk: self._fields[row]["source"] for row, pk in self._pks.items()
+                    if wanted is None or self._fields[row]["source"] in wanted}
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs) -> Optional[bool]:
+        """pk 목록으로 청크 삭제 (행은 다음 삽입에서 재사용)"""
+        if not ids:
+            return False
+        with self._lock:
+            rows = [self._pk_rows.pop(pk) for pk in ids if pk in self._pk_rows]
+            for row in rows:
+                del self._pks[row]
+                del self._contents[row]
+                del self._fields[row]
+                self._sparse.pop(row, None)
+                self._alive[row] = False
+            self._free_rows.extend(rows)
+            self._db.executemany("DELETE FROM chunks WHERE row = ?", [(row,) for row in rows])
+            self._db.commit()
+            self._invalidate()
+        print(f"🗑️ {len(rows)}개 청크 삭제 완료")
+        return True
+
+    def sync_documents(self, documents: Iterable[Document], sources: Optional[List[str]] = None,
+                       progress_callback=None) -> Dict[str, Any]:
+        """
+        증분 동기화: 새로 생긴/변경된 청크만 임베딩하여 추가하고 사라진 청크는 삭제
+
+        Returns:
+            {"added": 추가 수, "deleted": 삭제 수, "unchanged": 유지 수, "chunks_per_sec": 처리 속도}
+        """
+        manifest = self.get_manifest(sources)
+        print(f"\n📋 기존 색인 청크: {len(manifest)}개")
+
+        seen_ids = set()
+
+        def new_records():
+            """색인되지 않은 청크만 스트리밍"""
+            for doc in documents:
+                pk = make_chunk_id(doc.page_content, doc.metadata)
+                if pk in seen_ids:
+                    continue
+                seen_ids.add(pk)
+                if pk not in manifest:
+                    yield (pk, doc.page_content, doc.metadata)
+
+        stats = self._ingest(new_records(), progress_callback=progress_callback)
+        added = stats.inserted
+
+        removed_ids = [pk for pk in manifest if pk not in seen_ids]
+        unchanged = len(seen_ids) - added
+        print(f"📋 동기화 결과: 추가 {added}개, 삭제 {len(removed_ids)}개, 유지 {unchanged}개")
+
+        if removed_ids:
+            self.delete(removed_ids)
+
+        if added or removed_ids:
+            self.flush()
+            self._notify_change(sources)
+        else:
+            print("✅ 변경된 청크가 없습니다. 임베딩을 건너뛰었습니다.")
+
+        return {"added": added, "deleted": len(removed_ids), "unchanged": unchanged,
+                "chunks_per_sec": stats.as_dict()["chunks_per_sec"]}
+
+    # ------------------------------------------------------------------
+    # 필터 / 파티션
+    # ------------------------------------------------------------------
+
+    def filter_expr(self, options: Optional[Dict[str, Any]]) -> Optional[str]:
+        """
+        요청 옵션의 expr → 필터 표현식 (MilvusVectorStore.filter_expr와 같은 형식)
+        문자열은 지원하는 형식인지 확인만 하고, dict는 조건 표현식으로 변환
+        """
+        expr = (options or {}).get("expr")
+        if not expr:
+            return None
+        if isinstance(expr, dict):
+            return build_filter_expr(expr, SCALAR_FIELDS) or None
+        return validate_filter_expr(expr, SCALAR_FIELDS)
+
+    def _column(self, name: str) -> np.ndarray:
+        """스칼라 필드 컬럼 (행 번호 순, 빈 행은 None/0) - 색인이 바뀔 때까지 캐시"""
+        column = self._columns.get(name)
+        if column is None:
+            if name == "partition":
+                values = [partition_name_for(self._fields[row]["source"]) if row in self._fields else None
+                          for row in range(self._size)]
+            else:
+                empty = 0 if name == "date_created_ts" else None
+                values = [self._fields[row][name] if row in self._fields else empty for row in range(self._size)]
+            column = np.asarray(values, dtype=np.int64 if name == "date_created_ts" else object)
+            self._columns[name] = column
+        return column
+
+    def _candidate_mask(self, options: Optional[Dict[str, Any]]) -> np.ndarray:
+        """살아 있는 행 중 필터(expr)와 파티션(partitions) 조건을 만족하는 행"""
+        mask = self._alive[:self._size].copy()
+        expr = self.filter_expr(options)
+        if expr:
+            for field, operator, value in parse_filter_expr(expr):
+                column = self._column(field)
+                if operator == "in":
+                    matched = np.zeros(self._size, dtype=bool)
+                    for item in value:
+                        matched |= column == item
+                elif operator == "==":
+                    matched = column == value
+                elif operator == "!=":
+                    matched = column != value
+                elif operator == ">=":
+                    matched = column >= value
+                elif operator == "<=":
+                    matched = column <= value
+                elif operator == ">":
+                    matched = column > value
+                else:
+                    matched = column < value
+                mask &= np.asarray(matched, dtype=bool)
+
+        requested = (options or {}).get("partitions")
+        if requested:
+            if isinstance(requested, str):
+                requested = [requested]
+            matched = np.zeros(self._size, dtype=bool)
+            for item in requested:
+                if item in DOC_TYPES:
+                    matched |= self._column("doc_type") == item
+                else:
+                    matched |= (self._column("partition") == item) | (self._column("source") == item)
+            mask &= matched
+        return mask
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+
+    def _dense_scores(self, query_vectors: np.ndarray) -> np.ndarray:
+        """(q, dim) 쿼리 → (q, n) 점수 (IP/COSINE은 유사도, L2는 제곱 거리)"""
+        matrix = self._vectors[:self._size]
+        if self.metric_type == 'COSINE':
+            query_vectors = query_vectors / np.maximum(np.linalg.norm(query_vectors, axis=1, keepdims=True), 1e-12)
+        scores = query_vectors @ matrix.T
+        if self.metric_type == 'L2':
+            if self._sq_norms is None:
+                self._sq_norms = np.einsum('ij,ij->i', matrix, matrix)
+            scores = self._sq_norms - 2 * scores + np.sum(query_vectors ** 2, axis=1, keepdims=True)
+        return scores
+
+    def _sparse_scores(self, query_sparse: Dict[int, float]) -> np.ndarray:
+        """sparse 내적 점수 (n,) - 토큰 → (행, 가중치) 역색인으로 쿼리 토큰만 누적"""
+        if self._postings is None:
+            postings: Dict[int, tuple] = {}
+            for row, weights in self._sparse.items():
+                for token_id, weight in weights.items():
+                    postings.setdefault(token_id, ([], []))
+                    postings[token_id][0].append(row)
+                    postings[token_id][1].append(weight)
+            self._postings = {token_id: (np.asarray(rows, dtype=np.int64), np.asarray(weights, dtype=np.float32))
+                              for token_id, (rows, weights) in postings.items()}
+        scores = np.zeros(self._size, dtype=np.float32)
+        for token_id, weight in query_sparse.items():
+            posting = self._postings.get(int(token_id))
+            if posting is not None:
+                scores[posting[0]] += posting[1] * weight
+        return scores
+
+    def _top_rows(self, scores: np.ndarray, mask: np.ndarray, k: int, ascending: bool = False) -> np.ndarray:
+        """mask 안에서 점수 상위 k개 행 (ascending이면 작은 순)"""
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0 or k <= 0:
+            return rows[:0]
+        candidate_scores = scores[rows] if ascending else -scores[rows]
+        if len(rows) > k:
+            top = np.argpartition(candidate_scores, k - 1)[:k]
+            rows, candidate_scores = rows[top], candidate_scores[top]
+        return rows[np.argsort(candidate_scores, kind='stable')]
+
+    def _to_documents(self, rows: Iterable[int], scores) -> List[Document]:
+        """행 → LangChain Document (metadata 형식은 MilvusVectorStore와 같음)"""
+        docs = []
+        for row, score in zip(rows, scores):
+            row = int(row)
+            fields = self._fields[row]
+            docs.append(Document(
+                page_content=self._contents[row],
+                metadata={
+                    "Header 1": fields["header1"],
+                    "Header 2": fields["header2"],
+                    "source": fields["source"],
+                    **{name: fields[name] for name, _, _ in METADATA_FIELDS if fields.get(name) not in (None, "", 0)},
+                    "score": float(score),
+                    "id": self._pks[row]
+                }
+            ))
+        return docs
+
+    def _search_rows(self, embedding, k: int, mask: np.ndarray) -> tuple:
+        """dense(+sparse) 검색 → (행 목록, 점수 목록) - 하이브리드는 dense/sparse 상위 k개를 RRF/가중합으로 결합"""
+        ascending = self.metric_type == 'L2'
+        if not self.hybrid:
+            scores = self._dense_scores(np.asarray([embedding], dtype=np.float32))[0]
+            rows = self._top_rows(scores, mask, k, ascending)
+            return rows, scores[rows]
+
+        query_vector, query_sparse = embedding
+        dense_scores = self._dense_scores(np.asarray([query_vector], dtype=np.float32))[0]
+        sparse_scores = self._sparse_scores(query_sparse)
+        dense_rows = self._top_rows(dense_scores, mask, k, ascending)
+        sparse_rows = self._top_rows(sparse_scores, mask & (sparse_scores > 0), k)
+
+        fused: Dict[int, float] = {}
+        if self.hybrid_ranker == 'weighted':
+            dense_weight, sparse_weight = self.hybrid_weights
+            for row in dense_rows.tolist():
+                fused[row] = fused.get(row, 0.0) + dense_weight * float(dense_scores[row])
+            for row in sparse_rows.tolist():
+                fused[row] = fused.get(row, 0.0) + sparse_weight * float(sparse_scores[row])
+        else:
+            for ranked in (dense_rows, sparse_rows):
+                for rank, row in enumerate(ranked.tolist()):
+                    fused[row] = fused.get(row, 0.0) + 1.0 / (self.hybrid_rrf_k + rank + 1)
+        ordered = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [row for row, _ in ordered], [score for _, score in ordered]
+
+    def _search_with_embedding(self, embedding, k: int, options: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """임베딩된 쿼리로 전수 검색 (options의 expr/partitions로 후보 행을 먼저 거름)"""
+        started = time.perf_counter()
+        with self._lock:
+            if self.num_entities == 0:
+                print("⚠️ 벡터 스토어에 문서가 없습니다!")
+                return []
+            rows, scores = self._search_rows(embedding, k, self._candidate_mask(options))
+            docs = self._to_documents(rows, scores)
+        print(f"🔍 로컬 {'하이브리드' if self.hybrid else '벡터'} 검색: {len(docs)}개 "
+              f"(전체 {self.num_entities}개, {(time.perf_counter() - started) * 1000:.2f}ms)")
+        return docs
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        """유사한 문서 검색 (LangChain 인터페이스)"""
+        print(f"\n🔍 쿼리 임베딩 생성: '{query}'")
+        return self._search_with_embedding(self._embed_query(query), k, kwargs)
+
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        """유사한 문서 검색 (비동기) - 쿼리 임베딩은 마이크로배처/임베딩 스레드, 검색은 검색 전용 스레드 풀에서"""
+        print(f"\n🔍 쿼리 임베딩 생성 (비동기): '{query}'")
+        embedding = await self._aembed_query(query)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._search_executor, self._search_with_embedding, embedding, k, kwargs)
+
+    def similarity_search_batch(self, queries: List[str], k: int = 4, batch_size: int = 256,
+                                expr=None, partitions=None) -> List[List[Document]]:
+        """여러 쿼리를 한 번에 검색 (dense면 batch_size개씩 행렬 곱 한 번, expr/partitions는 모든 쿼리에 적용)"""
+        if not queries:
+            return []
+        if self.num_entities == 0:
+            return [[] for _ in queries]
+
+        started = time.perf_counter()
+        embeddings = self._embed_queries(queries)
+        embed_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        results = []
+        with self._lock:
+            mask = self._candidate_mask({"expr": expr, "partitions": partitions})
+            if self.hybrid:
+                for embedding in embeddings:
+                    results.append(self._to_documents(*self._search_rows(embedding, k, mask)))
+            else:
+                ascending = self.metric_type == 'L2'
+                for i in range(0, len(embeddings), batch_size):
+                    batch_scores = self._dense_scores(np.asarray(embeddings[i:i + batch_size], dtype=np.float32))
+                    for scores in batch_scores:
+                        rows = self._top_rows(scores, mask, k, ascending)
+                        results.append(self._to_documents(rows, scores[rows]))
+        search_ms = (time.perf_counter() - started) * 1000
+
+        print(f"📦 배치 검색: 쿼리 {len(queries)}개, k={k} (임베딩 {embed_ms:.1f}ms, 검색 {search_ms:.1f}ms)")
+        return results
+
+    async def asimilarity_search_batch(self, queries: List[str], k: int = 4, batch_size: int = 256,
+                                       expr=None, partitions=None) -> List[List[Document]]:
+        """similarity_search_batch (비동기) - 검색 전용 스레드 풀에서 실행"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._search_executor, self.similarity_search_batch,
+                                          queries, k, batch_size, expr, partitions)
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs) -> List[tuple]:
+        """유사도 점수와 함께 검색"""
+        return [(doc, doc.metadata.get('score', 0.0)) for doc in self.similarity_search(query, k, **kwargs)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs) -> List[Document]:
+        """dense 쿼리 벡터로 검색 (LangChain 인터페이스, 하이브리드여도 dense 점수만 사용)"""
+        with self._lock:
+            if self.num_entities == 0:
+                return []
+            scores = self._dense_scores(np.asarray([embedding], dtype=np.float32))[0]
+            rows = self._top_rows(scores, self._candidate_mask(kwargs), k, self.metric_type == 'L2')
+            return self._to_documents(rows, scores[rows])
+
+    def _select_relevance_score_fn(self):
+        """검색 점수 → 관련도 (L2 제곱 거리 d = 2 - 2cos)"""
+        if self.metric_type == 'L2':
+            return lambda score: 1.0 - score / 2.0
+        return lambda score: float(score)
+
+    def similarity_search_with_relevance_scores(self, query: str, k: int = 4,
+                                                score_threshold: Optional[float] = None,
+                                                score_gap: Optional[float] = None, **kwargs) -> List[tuple]:
+        """
+        관련도 점수(0~1, 정규화 벡터 기준 코사인 유사도)와 함께 검색 (LangChain similarity_score_threshold)
+        전수 검색이라 점수가 정확하므로 threshold/gap을 바로 적용한다. 하이브리드여도 dense 점수만 사용.
+        """
+        print(f"\n🔍 쿼리 임베딩 생성 (threshold): '{query}'")
+        embedding = self._embed_query(query)
+        return self._threshold_with_embedding(embedding[0] if self.hybrid else embedding, k,
+                                              score_threshold, score_gap, kwargs)
+
+    async def asimilarity_search_with_relevance_scores(self, query: str, k: int = 4,
+                                                       score_threshold: Optional[float] = None,
+                                                       score_gap: Optional[float] = None, **kwargs) -> List[tuple]:
+        """similarity_search_with_relevance_scores (비동기) - 검색은 검색 전용 스레드 풀에서"""
+        print(f"\n🔍 쿼리 임베딩 생성 (threshold, 비동기): '{query}'")
+        embedding = await self._aembed_query(query)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._search_executor, self._threshold_with_embedding,
+                                          embedding[0] if self.hybrid else embedding, k,
+                                          score_threshold, score_gap, kwargs)
+
+    def _threshold_with_embedding(self, query_vector: List[float], k: int, score_threshold: Optional[float],
+                                  score_gap: Optional[float],
+                                  options: Optional[Dict[str, Any]] = None) -> List[tuple]:
+        """상위 k개 → 관련도 하한 → 점수 차 기준 적응형 k (options: min_k, expr, partitions)"""
+        started = time.perf_counter()
+        relevance_fn = self._select_relevance_score_fn()
+        with self._lock:
+            if self.num_entities == 0:
+                print("⚠️ 벡터 스토어에 문서가 없습니다!")
+                return []
+            scores = self._dense_scores(np.asarray([query_vector], dtype=np.float32))[0]
+            rows = self._top_rows(scores, self._candidate_mask(options), k, self.metric_type == 'L2')
+            docs = self._to_documents(rows, scores[rows])
+        fetched = len(docs)
+
+        scored = [(doc, relevance_fn(doc.metadata["score"])) for doc in docs]
+        if score_threshold is not None:
+            scored = [(doc, relevance) for doc, relevance in scored if relevance >= score_threshold]
+        if score_gap is not None and scored:
+            min_k = int((options or {}).get("min_k", 1))
+            scored = scored[:cut_at_score_gap([relevance for _, relevance in scored], score_gap, min_k)]
+
+        for doc, relevance in scored:
+            doc.metadata["relevance_score"] = relevance
+        print(f"🎚️ threshold 검색: 후보 {fetched}개 → {len(scored)}개 (threshold={score_threshold}, "
+              f"gap={score_gap}, {(time.perf_counter() - started) * 1000:.2f}ms)")
+        return scored
+
+    def max_marginal_relevance_search(self, query: str, k: int = 4, fetch_k: int = 20,
+                                      lambda_mult: float = 0.5, **kwargs) -> List[Document]:
+        """MMR 검색 (LangChain 인터페이스) - fetch_k개 후보를 저장된 벡터로 다양화"""
+        print(f"\n🔍 쿼리 임베딩 생성 (MMR): '{query}'")
+        embedding = self._embed_query(query)
+        return self._mmr_with_embedding(embedding[0] if self.hybrid else embedding, k, fetch_k, lambda_mult, kwargs)
+
+    async def amax_marginal_relevance_search(self, query: str, k: int = 4, fetch_k: int = 20,
+                                             lambda_mult: float = 0.5, **kwargs) -> List[Document]:
+        """MMR 검색 (비동기) - 검색/다양화는 검색 전용 스레드 풀에서"""
+        print(f"\n🔍 쿼리 임베딩 생성 (MMR, 비동기): '{query}'")
+        embedding = await self._aembed_query(query)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._search_executor, self._mmr_with_embedding,
+                                          embedding[0] if self.hybrid else embedding, k, fetch_k, lambda_mult, kwargs)
+
+    def max_marginal_relevance_search_by_vector(self, embedding: List[float], k: int = 4, fetch_k: int = 20,
+                                                lambda_mult: float = 0.5, **kwargs) -> List[Document]:
+        """dense 쿼리 벡터로 MMR 검색 (LangChain 인터페이스)"""
+        return self._mmr_with_embedding(embedding, k, fetch_k, lambda_mult, kwargs)
+
+    def _mmr_with_embedding(self, query_vector: List[float], k: int, fetch_k: int, lambda_mult: float,
+                            options: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """fetch_k개 후보를 검색한 뒤 MMR로 k개 선택 (metadata['score']는 검색 점수 유지)"""
+        started = time.perf_counter()
+        with self._lock:
+            if self.num_entities == 0:
+                print("⚠️ 벡터 스토어에 문서가 없습니다!")
+                return []
+            scores = self._dense_scores(np.asarray([query_vector], dtype=np.float32))[0]
+            rows = self._top_rows(scores, self._candidate_mask(options), max(fetch_k, k), self.metric_type == 'L2')
+            docs = self._to_documents(rows, scores[rows])
+            vectors = np.array(self._vectors[rows], dtype=np.float32)
+        selected = maximal_marginal_relevance(query_vector, vectors, k, lambda_mult)
+        print(f"🧩 MMR: 후보 {len(docs)}개 → {len(selected)}개 (lambda={lambda_mult}, "
+              f"{(time.perf_counter() - started) * 1000:.2f}ms)")
+        return [docs[i] for i in selected]
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding_model, metadatas: Optional[List[dict]] = None, **kwargs):
+        """텍스트 리스트로부터 벡터 스토어 생성"""
+        vector_store = cls(embedding_model=embedding_model, **kwargs)
+        vector_store.add_texts(texts, metadatas)
+        return vector_store
+
+    @classmethod
+    def from_documents(cls, documents: List[Document], embedding_model, **kwargs):
+        """Document 리스트로부터 벡터 스토어 생성"""
+        vector_store = cls(embedding_model=embedding_model, **kwargs)
+        vector_store.add_documents(documents)
+        return vector_store
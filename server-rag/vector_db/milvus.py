@@ -1,14 +1,56 @@
-from typing import List, Dict, Any, Optional
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable
+import numpy as np
 from langchain_milvus import Milvus
 from langchain_core.vectorstores import VectorStoreRetriever
 from langchain_core.documents import Document
 from langchain.vectorstores.base import VectorStore
 from langchain_huggingface import HuggingFaceEmbeddings
 from sentence_transformers import SentenceTransformer
-from pymilvus import connections, utility, FieldSchema, CollectionSchema, DataType, Collection
+from pymilvus import (
+    connections, utility, FieldSchema, CollectionSchema, DataType, Collection,
+    AnnSearchRequest, RRFRanker, WeightedRanker
+)
 
+from embedding.cache import EmbeddingCache
+from embedding.query_cache import QueryEmbeddingCache
+from embedding.micro_batcher import EmbeddingMicroBatcher
+from embedding.bge_m3_hybrid import BGEM3HybridEncoder
+from embedding.batching import AdaptiveBatchEmbedder
+from .utils import (make_chunk_id, cut_at_score_gap, build_filter_expr, validate_filter_expr,
+                    DOC_TYPES, doc_type_of, partition_name_for, METADATA_FIELDS, metadata_value)
+from .mmr import maximal_marginal_relevance
+from .pipeline import run_ingestion_pipeline, PipelineStats
+from .originals import OriginalVectorStore, drop_original_vectors
+from .base import EmbeddingMixin
 
-class MilvusVectorStore(VectorStore):
+# pk는 청크 내용의 sha256 hex (64자)
+PK_MAX_LENGTH = 64
+# 하이브리드 검색용 sparse(lexical weight) 벡터 필드
+SPARSE_FIELD = "sparse_vector"
+# ANN 벡터 필드 저장 정밀도 (float16/binary는 후보를 넉넉히 찾은 뒤 원본 정밀도 벡터로 재채점)
+VECTOR_PRECISIONS = {
+    'float32': DataType.FLOAT_VECTOR,
+    'float16': DataType.FLOAT16_VECTOR,
+    'binary': DataType.BINARY_VECTOR,
+}
+# source 파일별 파티션 상한 (Milvus 기본 최대 1024개, 넘으면 _default 파티션에 삽입)
+MAX_PARTITIONS = 1000
+DEFAULT_PARTITION = "_default"
+# 인덱스 빌드/검색 파라미터 기본값 (컬렉션별 튜닝 값은 vector_db/tuning.py의 설정 파일에서 덮어씀)
+DEFAULT_BUILD_PARAMS = {"M": 8, "efConstruction": 64, "nlist": 128}
+DEFAULT_SEARCH_PARAMS = {"ef": 64, "nprobe": 10}
+# 요청별로 덮어쓸 수 있는 검색 파라미터
+SEARCH_PARAM_KEYS = ("ef", "nprobe")
+
+
+class MilvusVectorStore(EmbeddingMixin, VectorStore):
     def __init__(self, 
                  collection_name: str,
                  embedding_model: HuggingFaceEmbeddings,
@@ -16,22 +58,124 @@ class MilvusVectorStore(VectorStore):
                  index_type: str = 'HNSW',
                  milvus_host: str = 'localhost',
                  milvus_port: str = '19530',
-                 always_new: bool = True):
+                 always_new: bool = True,
+                 attach_only: bool = False,
+                 keep_versions: int = 2,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 query_cache: Optional[QueryEmbeddingCache] = None,
+                 query_batcher: Optional[EmbeddingMicroBatcher] = None,
+                 hybrid_encoder: Optional[BGEM3HybridEncoder] = None,
+                 hybrid_ranker: str = 'rrf',
+                 hybrid_rrf_k: int = 60,
+                 hybrid_weights: tuple = (0.7, 0.3),
+                 vector_precision: str = 'float32',
+                 rescore_factor: int = 4,
+                 original_vector_dir: Optional[str] = None,
+                 build_params: Optional[Dict[str, int]] = None,
+                 search_params: Optional[Dict[str, int]] = None,
+                 state_refresh_sec: float = 300,
+                 partition_idle_sec: float = 0,
+                 search_workers: int = 4,
+                 embed_workers: int = 1,
+                 embed_window_size: int = 256,
+                 embed_batch_size: int = 32,
+                 embed_token_budget: int = 16384,
+                 insert_segment_size: int = 1000,
+                 ingest_queue_size: int = 4):
         """
         Milvus Vector Store for LangChain
         
         Args:
-            collection_name: Milvus 컬렉션 이름
+            collection_name: 검색에 사용하는 별칭 이름 (실제 데이터는 '{이름}_v{시각}' 버전 컬렉션에 저장)
             embedding_model: 임베딩 생성용 모델
             milvus_host: Milvus 서버 호스트
             milvus_port: Milvus 서버 포트
+            always_new: True면 새 버전 컬렉션에 전체 재구축 후 별칭을 전환 (재구축 중에도 기존 버전으로 서빙)
+                        False면 현재 버전을 유지하고 sync_documents로 변경분만 반영
+            attach_only: True면 오프라인 CLI(python -m indexing)로 만든 기존 컬렉션에 연결만 함
+                         (스키마/인덱스 생성, 삭제 없이 로드 - 컬렉션이 없으면 오류)
+            keep_versions: 별칭 전환 후 보존할 버전 컬렉션 수 (현재 버전 포함, 롤백용)
+            embedding_cache: 문서 임베딩 영구 캐시 (None이면 캐시 사용 안 함)
+            query_cache: 검색 쿼리 임베딩 메모리 캐시 (None이면 매번 임베딩)
+            query_batcher: 동시 쿼리 임베딩 마이크로배처 (None이면 요청마다 단건 임베딩)
+            hybrid_encoder: dense + sparse 동시 인코더 (None이면 dense 검색만)
+            hybrid_ranker: 하이브리드 결과 결합 방식 ('rrf' 또는 'weighted')
+            hybrid_rrf_k: RRF 상수 k
+            hybrid_weights: weighted 결합 시 (dense, sparse) 가중치
+            vector_precision: ANN 벡터 필드 정밀도 ('float32', 'float16', 'binary' - 부호 양자화 + HAMMING)
+            rescore_factor: float16/binary 검색 시 k의 몇 배를 후보로 가져와 원본 정밀도로 재채점할지 (1 이하면 재채점 안 함)
+            original_vector_dir: 재채점용 float32 원본 벡터 디렉토리 (버전 컬렉션별 pk 키 저장소, 삽입할 때 기록 -
+                                 None이면 재채점 안 함, 하이브리드 검색과 함께 쓸 수 없음)
+            build_params: 인덱스 빌드 파라미터 (HNSW M/efConstruction, IVF nlist - 새 버전 컬렉션부터 적용)
+            search_params: 기본 검색 파라미터 (HNSW ef, IVF nprobe - 요청별로 ef/nprobe 덮어쓰기 가능)
+            state_refresh_sec: 검색 상태(로드 여부/문서 수/검색 파라미터) 캐시 갱신 주기 (색인 변경 시에는 즉시 갱신)
+            partition_idle_sec: 이 시간(초) 동안 검색되지 않은 source 파티션을 메모리에서 내림 (0이면 사용 안 함)
+            search_workers: asimilarity_search의 Milvus 검색 스레드 수 (동시 검색 상한)
+            embed_workers: 마이크로배처가 없을 때 asimilarity_search의 쿼리 임베딩 스레드 수
+            embed_window_size: 색인 파이프라인에서 임베딩 단계로 넘기는 청크 수 (이 안에서 길이별로 정렬)
+            embed_batch_size: 한 번의 임베딩 forward에 넣는 최대 행 수
+            embed_token_budget: 한 번의 임베딩 forward에 넣는 최대 토큰 수 (패딩 포함)
+            insert_segment_size: 한 번의 insert에 담는 행 수
+            ingest_queue_size: 파이프라인 단계 사이 큐 크기 (배치 수)
         """
         self.collection_name = collection_name
         self.embedding_model = embedding_model 
         self.embedding_dim = 1024  # BAAI/bge-m3 모델의 임베딩 차원
         self.always_new = always_new
+        self.attach_only = attach_only
+        self.keep_versions = max(1, keep_versions)
+        # 재구축 중인 버전 컬렉션 이름 (wait_until_ready에서 별칭 전환)
+        self._pending_version = None
         self.metric_type = metric_type
         self.index_type = index_type
+        self.embedding_cache = embedding_cache
+        self.query_cache = query_cache
+        self.query_batcher = query_batcher
+        self.hybrid_encoder = hybrid_encoder
+        self.hybrid = hybrid_encoder is not None
+        self.hybrid_ranker = hybrid_ranker
+        self.hybrid_rrf_k = hybrid_rrf_k
+        self.hybrid_weights = hybrid_weights
+        if vector_precision not in VECTOR_PRECISIONS:
+            raise ValueError(f"지원하지 않는 vector_precision: {vector_precision} ({', '.join(VECTOR_PRECISIONS)})")
+        self.vector_precision = vector_precision
+        self.rescore_factor = rescore_factor
+        if hybrid_encoder is not None and vector_precision != 'float32':
+            # 하이브리드 결합은 서버에서 끝나므로 dense 후보만 원본 정밀도로 재채점할 수 없음
+            raise ValueError(f"하이브리드 검색은 vector_precision=float32에서만 지원합니다 (현재 {vector_precision})")
+        self.original_vector_dir = original_vector_dir
+        self._original_stores: Dict[str, OriginalVectorStore] = {}
+        self._original_lock = threading.Lock()
+        self.build_params = {**DEFAULT_BUILD_PARAMS, **(build_params or {})}
+        self.default_search_params = {**DEFAULT_SEARCH_PARAMS, **(search_params or {})}
+        self.embed_window_size = embed_window_size
+        self.batch_embedder = AdaptiveBatchEmbedder(
+            embedding_model,
+            token_budget=embed_token_budget,
+            max_batch_size=embed_batch_size,
+            encode_fn=hybrid_encoder.encode_documents if hybrid_encoder else None
+        )
+        self.insert_segment_size = insert_segment_size
+        self.ingest_queue_size = ingest_queue_size
+        
+        # 색인 변경 시 호출할 콜백 (의존 캐시 무효화 등)
+        self._change_listeners = []
+        # 검색 때마다 load()/num_entities/indexes RPC를 보내지 않도록 캐시한 검색 상태
+        self.state_refresh_sec = state_refresh_sec
+        self._search_state: Optional[Dict[str, Any]] = None
+        # 현재 컬렉션 스키마에 있는 메타데이터 스칼라 필드 (예전 스키마에 연결하면 없는 필드는 제외)
+        self.metadata_fields: List[str] = []
+        self.output_fields: List[str] = ["header1", "header2", "source", "content"]
+        # source 파일별 파티션 ('{문서 종류}_{source 해시}') - 요청의 partitions로 검색 범위를 좁히고 안 쓰는 파티션은 내림
+        self.partition_idle_sec = partition_idle_sec
+        self._partitions: set = set()
+        self._released_partitions: set = set()
+        self._partition_last_used: Dict[str, float] = {}
+        self._partition_tracking_since = time.time()
+        self._partition_lock = threading.Lock()
+        # 비동기 검색용 전용 스레드 풀 (기본 executor를 다른 작업과 공유하지 않도록 분리)
+        self._search_executor = ThreadPoolExecutor(max_workers=search_workers, thread_name_prefix="milvus-search")
+        self._embed_executor = ThreadPoolExecutor(max_workers=embed_workers, thread_name_prefix="query-embed")
 
         
         # Milvus 연결
@@ -43,17 +187,44 @@ class MilvusVectorStore(VectorStore):
         print(f"\n✅ Milvus 연결 성공! (서버 버전: {server_version})\n")
         
         # 컬렉션 생성 또는 로드
-        self._setup_collection()
+        if attach_only:
+            self._attach_collection()
+        else:
+            self._setup_collection()
+
+    def _attach_collection(self):
+        """이미 색인된 컬렉션에 연결만 하고 로드 (서빙 전용)"""
+        if self._alias_target() is None and not utility.has_collection(self.collection_name):
+            raise RuntimeError(
+                f"컬렉션 '{self.collection_name}'이 없습니다. 먼저 'python -m indexing'으로 색인을 빌드하세요."
+            )
+        self.collection = Collection(self.collection_name)
+        if not self.collection.indexes:
+            raise RuntimeError(f"컬렉션 '{self.collection_name}'에 벡터 인덱스가 없습니다. 색인 빌드가 끝났는지 확인하세요.")
+        vector_field = next(field for field in self.collection.schema.fields if field.name == "vector")
+        self.vector_precision = next(name for name, dtype in VECTOR_PRECISIONS.items() if dtype == vector_field.dtype)
+        has_sparse = any(field.name == SPARSE_FIELD for field in self.collection.schema.fields)
+        if self.hybrid and (not has_sparse or self.vector_precision != 'float32'):
+            reason = ("sparse 필드가 없어" if not has_sparse
+                      else f"벡터 정밀도가 {self.vector_precision}라 (하이브리드는 float32 전용)")
+            print(f"⚠️ 컬렉션 '{self.collection_name}'에 {reason} dense 검색만 사용합니다. (재색인 필요)")
+            self.hybrid = False
+            if self.query_batcher is not None:
+                self.query_batcher.embed_fn = self.embedding_model.embed_documents
+            self.batch_embedder.encode_fn = self.embedding_model.embed_documents
+        state = self._refresh_search_state()
+        print(f"\n✅기존 컬렉션 '{self.collection_name}'에 연결했습니다. "
+              f"(문서 수: {state['num_entities']}, 벡터 정밀도: {self.vector_precision})\n")
 
     def _setup_collection(self):
         """Milvus 컬렉션 설정"""
         # 스키마 정의
         print("\n스키마를 정의합니다\n")
         fields = [
-            # id 필드 (자동 ID 생성)
-            FieldSchema(name="pk", dtype=DataType.VARCHAR, is_primary=True, auto_id=True, max_length=100),
-            # 벡터를 저장할 필드
-            FieldSchema(name="vector", dtype=DataType.FLOAT_VECTOR, dim=self.embedding_dim),
+            # id 필드 (청크 내용 해시 - make_chunk_id)
+            FieldSchema(name="pk", dtype=DataType.VARCHAR, is_primary=True, auto_id=False, max_length=PK_MAX_LENGTH),
+            # 벡터를 저장할 필드 (float32 / float16 / 부호 양자화 binary)
+            FieldSchema(name="vector", dtype=VECTOR_PRECISIONS[self.vector_precision], dim=self.embedding_dim),
             # Header 1을 저장할 필드
             FieldSchema(name="header1", dtype=DataType.VARCHAR, max_length=200),
             # Header 2을 저장할 필드
@@ -63,132 +234,465 @@ class MilvusVectorStore(VectorStore):
             # 원본 텍스트를 저장할 필드
             FieldSchema(name="content", dtype=DataType.VARCHAR, max_length=65535)
         ]
+        # CSV 작업 메타데이터 (마크다운 청크는 빈 값) - 검색 전에 스칼라 필터로 후보를 좁힘
+        for name, field_type, max_length in METADATA_FIELDS:
+            if field_type is str:
+                fields.append(FieldSchema(name=name, dtype=DataType.VARCHAR, max_length=max_length))
+            else:
+                fields.append(FieldSchema(name=name, dtype=DataType.INT64))
+        if self.hybrid:
+            # BGE-M3 lexical weight (토큰 ID → 가중치) - 제품 코드/모델 번호 정확 일치 검색
+            fields.append(FieldSchema(name=SPARSE_FIELD, dtype=DataType.SPARSE_FLOAT_VECTOR))
         
         schema = CollectionSchema(fields, f"'{self.collection_name}' Feature Document")
         
-        if self.always_new == True:
-            # 기존 컬렉션이 있으면 삭제
-            if utility.has_collection(self.collection_name):
-                print(f"기존 컬렉션 '{self.collection_name}'을 삭제합니다.")
-                utility.drop_collection(self.collection_name)
+        # 별칭이 가리키는 현재 버전 (별칭 도입 전의 단일 컬렉션이면 그 이름)
+        current = self._alias_target()
+        if current is None and utility.has_collection(self.collection_name):
+            current = self.collection_name
 
+        # 별칭 전환 전에 중단된 재구축 버전이 있으면 이어서 진행
+        versions = self._list_versions()
+        unfinished = [name for name in versions if current not in versions or name > current]
+        if not self.always_new and unfinished:
+            self.collection = Collection(unfinished[-1])
+            self._pending_version = unfinished[-1]
+            print(f"\n✅중단된 재구축 버전 '{unfinished[-1]}'을 이어서 진행합니다. (문서 수: {self.collection.num_entities})\n")
+            self._sync_schema_fields()
+            self._create_index()
+            return
 
-        # 컬렉션 생성
-        try:
-            self.collection = Collection(self.collection_name, schema)
-            print(f"\n✅새 컬렉션 '{self.collection_name}'을 생성했습니다.\n")
-        except Exception:
-            self.collection = Collection(self.collection_name)
-            print(f"\n✅기존 컬렉션 '{self.collection_name}'을 로드했습니다.\n")
+        build_new = self.always_new or current is None
+        if not build_new and not self._is_schema_compatible(Collection(current)):
+            # auto_id 기반의 예전 컬렉션은 증분 동기화를 할 수 없으므로 새 버전으로 재구축
+            print(f"⚠️ 기존 컬렉션 '{current}'의 스키마가 호환되지 않아 새 버전으로 재구축합니다.")
+            build_new = True
+
+        if build_new:
+            # 기존 버전은 그대로 서빙하고, 새 버전이 준비되면 별칭만 전환
+            version = f"{self.collection_name}_v{time.strftime('%Y%m%d%H%M%S')}"
+            self.collection = Collection(version, schema)
+            self._pending_version = version
+            print(f"\n✅새 버전 컬렉션 '{version}'을 생성했습니다. (준비 완료 후 별칭 '{self.collection_name}' 전환)\n")
+        else:
+            self.collection = Collection(current)
+            print(f"\n✅기존 컬렉션 '{current}'을 로드했습니다. (문서 수: {self.collection.num_entities})\n")
         
         # 인덱스 생성
+        self._sync_schema_fields()
         self._create_index()
 
+    def _sync_schema_fields(self):
+        """현재 컬렉션 스키마에 있는 메타데이터 필드로 삽입 컬럼/검색 출력 필드를 맞춤"""
+        present = {field.name for field in self.collection.schema.fields}
+        self.metadata_fields = [name for name, _, _ in METADATA_FIELDS if name in present]
+        self.output_fields = ["header1", "header2", "source", "content"] + self.metadata_fields
+        self._partitions = {partition.name for partition in self.collection.partitions
+                            if partition.name != DEFAULT_PARTITION}
+
+    def _is_schema_compatible(self, collection: Collection) -> bool:
+        """기존 컬렉션이 내용 해시 pk 스키마이고 sparse 필드 유무/벡터 정밀도/메타데이터 필드가 현재 설정과 같은지 확인"""
+        has_sparse = any(field.name == SPARSE_FIELD for field in collection.schema.fields)
+        if has_sparse != self.hybrid:
+            return False
+        present = {field.name for field in collection.schema.fields}
+        if any(name not in present for name, _, _ in METADATA_FIELDS):
+            return False
+        vector_field = next((field for field in collection.schema.fields if field.name == "vector"), None)
+        if vector_field is None or vector_field.dtype != VECTOR_PRECISIONS[self.vector_precision]:
+            return False
+        for field in collection.schema.fields:
+            if field.is_primary:
+                return (not field.auto_id
+                        and field.dtype == DataType.VARCHAR
+                        and field.params.get('max_length', 0) >= PK_MAX_LENGTH)
+        return False
+
+    def _list_versions(self) -> List[str]:
+        """이 별칭의 버전 컬렉션 목록 (오래된 순)"""
+        pattern = re.compile(rf"^{re.escape(self.collection_name)}_v\d{{14}}$")
+        return sorted(name for name in utility.list_collections() if pattern.match(name))
+
+    def _alias_target(self) -> Optional[str]:
+        """별칭이 현재 가리키는 버전 컬렉션 이름 (별칭이 없으면 None)"""
+        for name in self._list_versions():
+            if self.collection_name in utility.list_aliases(name):
+                return name
+        return None
+
+    def _warm_up(self, collection: Collection):
+        """프로브 검색으로 로드된 세그먼트/인덱스를 예열"""
+        probe = [1.0 / self.embedding_dim ** 0.5] * self.embedding_dim
+        started = time.time()
+        collection.search(
+            data=self._to_field_vectors([probe]),
+            anns_field="vector",
+            param={"metric_type": self._field_metric_type(), "params": {}},
+            limit=1,
+            output_fields=["pk"]
+        )
+        print(f"🔥 '{collection.name}' 프로브 검색 완료 ({(time.time() - started) * 1000:.1f}ms)")
+
+    def _switch_alias(self, version: str):
+        """별칭을 version으로 원자적으로 전환하고 오래된 버전 정리"""
+        previous = self._alias_target()
+        if previous is None:
+            if utility.has_collection(self.collection_name):
+                # 별칭 도입 전의 단일 컬렉션은 별칭과 이름이 겹치므로 이번 한 번만 삭제
+                print(f"⚠️ 예전 단일 컬렉션 '{self.collection_name}'을 삭제하고 별칭으로 전환합니다.")
+                utility.drop_collection(self.collection_name)
+                self._drop_original_vectors(self.collection_name)
+            utility.create_alias(version, self.collection_name)
+        else:
+            utility.alter_alias(version, self.collection_name)
+            # 이전 버전은 롤백용으로 보존하되 메모리에서는 내림
+            Collection(previous).release()
+        print(f"🔀 별칭 '{self.collection_name}' → '{version}' 전환 완료 (이전: {previous})")
+
+        # 이후 검색/갱신은 별칭으로 (다른 프로세스의 전환도 따라감)
+        self.collection = Collection(self.collection_name)
+        self._pending_version = None
+        self._reset_partition_usage()
+        self._prune_versions(version)
+        self._notify_change()
+
+    def _prune_versions(self, active: str):
+        """보존 개수를 넘는 오래된 버전 컬렉션 삭제 (현재 버전은 제외)"""
+        versions = [name for name in self._list_versions() if name != active]
+        stale = versions[:max(0, len(versions) - (self.keep_versions - 1))]
+        for name in stale:
+            utility.drop_collection(name)
+            self._drop_original_vectors(name)
+            print(f"🗑️ 오래된 버전 컬렉션 '{name}' 삭제")
+
+    def _current_version(self) -> str:
+        """지금 읽고 쓰는 버전 컬렉션 이름 (재구축 중이면 새 버전, 별칭으로 연결했으면 별칭이 가리키는 버전)"""
+        if self._pending_version is not None:
+            return self._pending_version
+        if self.collection.name != self.collection_name:
+            return self.collection.name
+        return self._alias_target() or self.collection_name
+
+    def _original_store(self, version: str) -> Optional[OriginalVectorStore]:
+        """버전 컬렉션의 float32 원본 벡터 저장소 (float32 컬렉션이거나 디렉토리 설정이 없으면 None)"""
+        if self.original_vector_dir is None or self.vector_precision == 'float32':
+            return None
+        store = self._original_stores.get(version)
+        if store is None:
+            with self._original_lock:
+                store = self._original_stores.get(version)
+                if store is None:
+                    store = OriginalVectorStore(os.path.join(self.original_vector_dir, version), self.embedding_dim)
+                    self._original_stores[version] = store
+        return store
+
+    def _drop_original_vectors(self, version: str):
+        """삭제한 버전 컬렉션의 원본 벡터도 삭제"""
+        if self.original_vector_dir is None:
+            return
+        with self._original_lock:
+            store = self._original_stores.pop(version, None)
+        if store is not None:
+            store.close()
+        drop_original_vectors(self.original_vector_dir, version)
+
+    def rollback(self) -> str:
+        """
+        별칭을 직전 버전으로 되돌림, 전환된 버전 이름 반환
+        되돌린 버전은 삭제한다 (남겨두면 다음 증분 실행이 중단된 재구축으로 보고 이어서 진행함)
+        """
+        current = self._alias_target()
+        versions = self._list_versions()
+        if current is None or versions.index(current) == 0:
+            raise RuntimeError(f"'{self.collection_name}'에 롤백할 이전 버전이 없습니다.")
+        previous = versions[versions.index(current) - 1]
+
+        collection = Collection(previous)
+        collection.load()
+        self._warm_up(collection)
+        utility.alter_alias(previous, self.collection_name)
+        utility.drop_collection(current)
+        self._drop_original_vectors(current)
+        print(f"⏪ 별칭 '{self.collection_name}' → '{previous}' 롤백 완료 ('{current}' 삭제)")
+
+        self.collection = Collection(self.collection_name)
+        self._reset_partition_usage()
+        self._notify_change()
+        return previous
+
+    def _field_metric_type(self) -> str:
+        """ANN 벡터 필드의 거리 (binary는 HAMMING)"""
+        return "HAMMING" if self.vector_precision == 'binary' else self.metric_type
+
+    def _to_field_vectors(self, vectors: List[List[float]]) -> list:
+        """float 벡터 → 벡터 필드 저장 형식 (float16 ndarray 또는 부호 비트 bytes)"""
+        if self.vector_precision == 'float16':
+            return [np.asarray(vector, dtype=np.float16) for vector in vectors]
+        if self.vector_precision == 'binary':
+            return [np.packbits(np.asarray(vector, dtype=np.float32) > 0).tobytes() for vector in vectors]
+        return vectors
+
     def _create_index(self):
         
-        if self.index_type == 'HNSW':
-            params = {"M": 8, "efConstruction": 64}
-        elif self.index_type in ["IVF_FLAT", "IVF_SQ8", "IVF_PQ"]:
-            params = {"nlist": 128}
+        index_type = self.index_type
+        if self.vector_precision == 'binary':
+            # binary 벡터는 HAMMING 거리의 BIN_* 인덱스만 지원
+            index_type = 'BIN_IVF_FLAT'
+
+        if index_type == 'HNSW':
+            params = {"M": self.build_params["M"], "efConstruction": self.build_params["efConstruction"]}
+        elif index_type in ["IVF_FLAT", "IVF_SQ8", "IVF_PQ", "BIN_IVF_FLAT"]:
+            params = {"nlist": self.build_params["nlist"]}
         else:
             params = {}
 
         """벡터 필드에 인덱스 생성"""
         index_params = {
-            "metric_type": self.metric_type,  
-            "index_type": self.index_type,
+            "metric_type": self._field_metric_type(),
+            "index_type": index_type,
             "params": params
         }
         
         try:
             print(f"\n'{self.collection_name}' 컬렉션에 벡터 인덱스를 생성합니다...\n")
             self.collection.create_index("vector", index_params)
-            print(f"\n✅ 인덱스 생성 및 완료.(metric_type: {self.metric_type}, index_type: {self.index_type}, params: {params})\n")
+            print(f"\n✅ 인덱스 생성 및 완료.(metric_type: {index_params['metric_type']}, index_type: {index_type}, "
+                  f"params: {params}, 정밀도: {self.vector_precision})\n")
         except Exception as e:
             print(f"\n❌인덱스 생성 중 오류 (이미 존재할 수 있음): {e}\n")
 
+        if self.hybrid:
+            sparse_index_params = {
+                "metric_type": "IP",
+                "index_type": "SPARSE_INVERTED_INDEX",
+                "params": {"drop_ratio_build": 0.2}
+            }
+            try:
+                self.collection.create_index(SPARSE_FIELD, sparse_index_params)
+                print(f"\n✅ sparse 인덱스 생성 완료.(SPARSE_INVERTED_INDEX, IP)\n")
+            except Exception as e:
+                print(f"\n❌sparse 인덱스 생성 중 오류 (이미 존재할 수 있음): {e}\n")
 
-
-    # vector_db/milvus.py의 add_texts 메서드 수정 (배치 처리)
-
-    def add_texts(self, texts: List[str], metadatas: Optional[List[dict]] = None, **kwargs) -> List[str]:
-        """
-        텍스트 리스트를 벡터 스토어에 추가 (배치 처리로 메모리 효율성 향상)
-        """
-        if metadatas is None:
-            metadatas = [{}] * len(texts)
-        
-        print(f"\n📤 {len(texts)}개 문서를 배치로 처리합니다...")
-        
-        # 배치 크기 설정 (GPU 메모리에 따라 조정)
-        BATCH_SIZE = 16  # 한 번에 16개씩 처리
-        
-        # 전체 데이터를 배치로 나누어 처리
-        all_vectors = []
-        for i in range(0, len(texts), BATCH_SIZE):
-            batch_texts = texts[i:i+BATCH_SIZE]
-            print(f"   배치 {i//BATCH_SIZE + 1}/{(len(texts)-1)//BATCH_SIZE + 1}: {len(batch_texts)}개 문서 임베딩 중...")
-            
+        # 필터 검색용 스칼라 인덱스 (문자열은 INVERTED, 날짜 epoch는 정렬 인덱스)
+        scalar_fields = ["source"] + self.metadata_fields
+        indexed = {index.field_name for index in self.collection.indexes}
+        for name in scalar_fields:
+            if name in indexed:
+                continue
+            index_type = "STL_SORT" if name == "date_created_ts" else "INVERTED"
             try:
-                # 배치별 임베딩 생성
-                batch_vectors = self.embedding_model.embed_documents(batch_texts)
-                all_vectors.extend(batch_vectors)
-                print(f"   ✅ 배치 완료 ({len(batch_vectors)}개 벡터 생성)")
-                
-            except RuntimeError as e:
-                if "CUDA" in str(e):
-                    print(f"   ❌ CUDA 메모리 오류 발생, 더 작은 배치로 재시도...")
-                    # 더 작은 배치로 재시도
-                    for j in range(i, min(i+BATCH_SIZE, len(texts))):
-                        single_vector = self.embedding_model.embed_documents([texts[j]])
-                        all_vectors.extend(single_vector)
-                        print(f"     단일 문서 처리: {j+1}/{len(texts)}")
-                else:
-                    raise e
-        
-        print(f"✅ 전체 {len(all_vectors)}개 벡터 생성 완료")
-        
-        # 데이터 준비
+                self.collection.create_index(name, {"index_type": index_type}, index_name=f"{name}_idx")
+            except Exception as e:
+                print(f"\n❌스칼라 인덱스 생성 중 오류 ({name}): {e}\n")
+        print(f"\n✅ 스칼라 인덱스 확인 완료: {', '.join(scalar_fields)}\n")
+
+    def _build_insert_data(self, rows: List[tuple]) -> List[list]:
+        """[(pk, text, metadata, vector), ...] → Milvus 컬럼 데이터 (하이브리드면 vector는 (dense, sparse))"""
+        ids = []
+        vectors = []
+        sparse_vectors = []
         header1s = []
         header2s = []
         sources = []
         contents = []
+        metadata_columns = {name: [] for name in self.metadata_fields}
         
-        for i, text in enumerate(texts):
-            metadata = metadatas[i]
+        for pk, text, metadata, vector in rows:
+            ids.append(pk)
+            if self.hybrid:
+                vector, sparse = vector
+                sparse_vectors.append(sparse)
+            vectors.append(vector)
             
             # 메타데이터 추출
-            header1 = metadata.get('Header 1', '')
-            header2 = metadata.get('Header 2', '')
-            source = metadata.get('source', '')
-
-            # 데이터 추가
-            header1s.append(header1)
-            header2s.append(header2)
-            sources.append(source)
+            header1s.append(metadata.get('Header 1', ''))
+            header2s.append(metadata.get('Header 2', ''))
+            sources.append(metadata.get('source', ''))
             contents.append(text)
+            for name in self.metadata_fields:
+                value = doc_type_of(metadata.get('source', '')) if name == "doc_type" else metadata.get(name)
+                metadata_columns[name].append(metadata_value(name, value))
         
-        # Milvus에 삽입할 데이터 구성
-        data = [
-            all_vectors,  # 배치로 생성된 전체 벡터
-            header1s,
-            header2s,
-            sources,
-            contents
-        ]
+        vectors = self._to_field_vectors(vectors)
+        # 컬럼 순서는 스키마 순서 (pk, vector, header1, header2, source, content, 메타데이터..., sparse)
+        data = [ids, vectors, header1s, header2s, sources, contents] + [metadata_columns[name] for name in self.metadata_fields]
+        if self.hybrid:
+            data.append(sparse_vectors)
+        return data
 
-        # 컬렉션 로드 (검색을 위해 필요)
-        self.collection.load()
+    def _insert_rows(self, rows: List[tuple]):
+        """
+        세그먼트 단위 삽입 - source 파티션별로 나눠 삽입 (flush는 색인 작업 마지막에 한 번만)
+        float16/binary 컬렉션이면 재채점용 float32 원본 벡터를 pk 키로 함께 저장한다.
+        """
+        groups: Dict[str, List[tuple]] = {}
+        for row in rows:
+            groups.setdefault(self._partition_for(row[2].get('source', '')), []).append(row)
+        for partition_name, group in groups.items():
+            self.collection.insert(self._build_insert_data(group), partition_name=partition_name)
+        originals = self._original_store(self._current_version())
+        if originals is not None:
+            originals.put_many([pk for pk, _, _, _ in rows], [vector for _, _, _, vector in rows])
+
+    def _partition_for(self, source: str) -> str:
+        """source의 파티션 이름 (없으면 생성, 상한을 넘으면 _default)"""
+        name = partition_name_for(source)
+        if name in self._partitions:
+            return name
+        with self._partition_lock:
+            if name not in self._partitions:
+                if len(self._partitions) >= MAX_PARTITIONS:
+                    print(f"⚠️ 파티션 수가 상한({MAX_PARTITIONS})에 도달해 '{source}'를 {DEFAULT_PARTITION}에 저장합니다.")
+                    return DEFAULT_PARTITION
+                if not self.collection.has_partition(name):
+                    self.collection.create_partition(name, description=source[:200])
+                self._partitions.add(name)
+        return name
+
+    def _drop_partition(self, name: str):
+        """삭제된 source 파일의 빈 파티션 제거 (드롭 전에 메모리에서 내려야 함)"""
+        if name not in self._partitions:
+            return
+        with self._partition_lock:
+            try:
+                self.collection.partition(name).release()
+                self.collection.drop_partition(name)
+            except Exception as e:
+                print(f"⚠️ 파티션 '{name}' 제거 실패: {e}")
+                return
+            self._partitions.discard(name)
+            self._released_partitions.discard(name)
+            self._partition_last_used.pop(name, None)
+        print(f"🗑️ 빈 파티션 '{name}' 제거")
+
+    def _source_partitions(self, sources: Iterable[str]) -> List[str]:
+        """source 목록의 기존 파티션 + _default (상한 초과로 _default에 들어간 청크 포함)"""
+        names = {partition_name_for(source) for source in sources} & self._partitions
+        return sorted(names) + [DEFAULT_PARTITION]
+
+    def _resolve_partitions(self, options: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+        """
+        요청 옵션의 partitions → 검색할 파티션 이름 목록 (None이면 전체)
+        각 항목은 문서 종류(md/csv/doc), 파티션 이름 또는 source 파일 이름. 일치하는 파티션이 없으면 빈 목록.
+        """
+        requested = (options or {}).get("partitions")
+        if not requested:
+            self._use_partitions(self._partitions)
+            return None
+        if isinstance(requested, str):
+            requested = [requested]
+        if not self._partitions:
+            print("⚠️ source 파티션이 없는 컬렉션입니다. 전체를 검색합니다. (재색인 필요)")
+            return None
+
+        names = []
+        for item in requested:
+            if item in DOC_TYPES:
+                names.extend(sorted(name for name in self._partitions if name.startswith(f"{item}_")))
+            elif item in self._partitions:
+                names.append(item)
+            elif partition_name_for(item) in self._partitions:
+                names.append(partition_name_for(item))
+        names = list(dict.fromkeys(names))
+        self._use_partitions(names)
+        return names
+
+    def _use_partitions(self, names: Iterable[str]):
+        """파티션 사용 시각 기록, 유휴로 내려간 파티션이면 다시 로드"""
+        now = time.time()
+        with self._partition_lock:
+            reload = []
+            for name in names:
+                self._partition_last_used[name] = now
+                if name in self._released_partitions:
+                    reload.append(name)
+            if reload:
+                started = time.perf_counter()
+                self.collection.load(partition_names=reload)
+                self._released_partitions.difference_update(reload)
+                print(f"📂 파티션 {len(reload)}개 다시 로드 ({(time.perf_counter() - started) * 1000:.1f}ms)")
+
+    def _release_idle_partitions(self):
+        """partition_idle_sec 동안 검색되지 않은 파티션을 메모리에서 내림"""
+        if not self.partition_idle_sec or self._pending_version is not None:
+            return
+        now = time.time()
+        with self._partition_lock:
+            idle = [name for name in self._partitions - self._released_partitions
+                    if now - self._partition_last_used.get(name, self._partition_tracking_since) > self.partition_idle_sec]
+            for name in idle:
+                self.collection.partition(name).release()
+            self._released_partitions.update(idle)
+        if idle:
+            print(f"💤 유휴 파티션 {len(idle)}개 해제 (로드 {len(self._partitions) - len(self._released_partitions)}개 유지)")
+
+    def _reset_partition_usage(self):
+        """컬렉션 전환 시 파티션 사용 기록 초기화 (전환된 컬렉션은 전체 로드)"""
+        with self._partition_lock:
+            self._released_partitions = set()
+            self._partition_last_used = {}
+            self._partition_tracking_since = time.time()
+
+    def _load(self):
+        """컬렉션 로드 - 유휴 해제된 파티션은 제외하고 로드"""
+        if self._released_partitions:
+            self.collection.load(partition_names=sorted(self._partitions - self._released_partitions) + [DEFAULT_PARTITION])
+        else:
+            self.collection.load()
+
+    def partition_stats(self) -> Dict[str, Any]:
+        """source 파티션 수와 유휴 해제 상태"""
+        return {
+            "partitions": len(self._partitions),
+            "released": len(self._released_partitions),
+            "idle_release_sec": self.partition_idle_sec
+        }
+
+    def _ingest(self, records: Iterable[tuple], total: Optional[int] = None, progress_callback=None) -> PipelineStats:
+        """(pk, text, metadata) 스트림을 임베딩 → 삽입 파이프라인으로 처리"""
+        return run_ingestion_pipeline(
+            records,
+            embed_fn=self._embed_texts,
+            insert_fn=self._insert_rows,
+            embed_batch_size=self.embed_window_size,
+            segment_size=self.insert_segment_size,
+            queue_size=self.ingest_queue_size,
+            total=total,
+            progress_callback=progress_callback
+        )
+
+    def add_texts(self, texts: List[str], metadatas: Optional[List[dict]] = None, **kwargs) -> List[str]:
+        """
+        텍스트 리스트를 벡터 스토어에 추가
+        임베딩과 삽입을 파이프라인으로 겹쳐 실행하고, 마지막에 한 번만 flush한다.
+        """
+        if metadatas is None:
+            metadatas = [{}] * len(texts)
         
-        # 데이터 삽입
-        mr = self.collection.insert(data)
-        print(f"\n✅ {len(texts)}개 문서가 성공적으로 삽입되었습니다.\n")
+        # 청크 ID: 지정되지 않으면 내용 해시로 생성
+        ids = kwargs.get('ids')
+        if ids is None:
+            ids = [make_chunk_id(text, metadata) for text, metadata in zip(texts, metadatas)]
+        
+        # 같은 ID가 중복되면 Milvus에 중복 저장되므로 첫 번째만 유지
+        seen = set()
+        unique = [i for i, pk in enumerate(ids) if not (pk in seen or seen.add(pk))]
+        if len(unique) != len(texts):
+            print(f"⚠️ 중복 청크 {len(texts) - len(unique)}개 제외")
+        
+        if len(unique) == 0:
+            return []
+        
+        print(f"\n📤 {len(unique)}개 문서를 파이프라인으로 처리합니다...")
+        records = ((ids[i], texts[i], metadatas[i]) for i in unique)
+        self._ingest(records, total=len(unique), progress_callback=kwargs.get('progress_callback'))
         
         # 데이터 플러시 (영구 저장)
         self.collection.flush()
         print("\n✅ 데이터가 영구 저장되었습니다.\n")
+        self._notify_change()
         
-        return mr.primary_keys  
+        return [ids[i] for i in unique]
 
 
     def add_documents(self, documents: List[Document], **kwargs) -> List[str]:
@@ -205,6 +709,183 @@ class MilvusVectorStore(VectorStore):
         metadatas = [doc.metadata for doc in documents]
         return self.add_texts(texts, metadatas, **kwargs)
 
+    def _hybrid_ranker(self):
+        """하이브리드 결과 결합기 (RRF 또는 dense/sparse 가중합)"""
+        if self.hybrid_ranker == 'weighted':
+            return WeightedRanker(*self.hybrid_weights)
+        return RRFRanker(self.hybrid_rrf_k)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """쿼리/문서 임베딩 캐시 및 쿼리 마이크로배칭 통계"""
+        return {
+            "query_embedding_cache": self.query_cache.stats() if self.query_cache else None,
+            "document_embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None,
+            "query_micro_batcher": self.query_batcher.stats() if self.query_batcher else None,
+            "partitions": self.partition_stats()
+        }
+
+    def _refresh_search_state(self) -> Dict[str, Any]:
+        """컬렉션 로드 후 문서 수와 검색 파라미터를 한 번 조회하여 캐시"""
+        self._load()
+        self._sync_schema_fields()
+        self._search_state = {
+            "collection": self.collection.name,
+            "version": self._current_version(),
+            "num_entities": self.collection.num_entities,
+            "search_params": self._search_params(),
+            "refreshed_at": time.time()
+        }
+        return self._search_state
+
+    def _get_search_state(self) -> Dict[str, Any]:
+        """캐시된 검색 상태 (없거나 갱신 주기가 지났으면 새로 조회)"""
+        state = self._search_state
+        if state is None or time.time() - state["refreshed_at"] > self.state_refresh_sec:
+            self._release_idle_partitions()
+            state = self._refresh_search_state()
+        return state
+
+    def _notify_change(self, sources: Optional[List[str]] = None):
+        """색인 변경을 리스너에게 알림 (검색 상태 캐시도 갱신)"""
+        try:
+            if self._pending_version is not None:
+                # 재구축 중인 버전은 아직 서빙 전 - 별칭 전환(wait_until_ready) 때 조회
+                self._search_state = None
+            else:
+                self._refresh_search_state()
+        except Exception as e:
+            # 인덱스가 아직 없으면(빌드 중) 다음 검색에서 다시 조회
+            self._search_state = None
+            print(f"⚠️ 검색 상태 갱신 실패: {e}")
+        for callback in self._change_listeners:
+            try:
+                callback(sources)
+            except Exception as e:
+                print(f"⚠️ 색인 변경 리스너 오류: {e}")
+
+    def wait_until_ready(self) -> int:
+        """
+        인덱스 빌드 완료까지 대기 후 컬렉션 로드, 문서 수 반환
+        재구축 중인 새 버전이면 프로브 검색으로 예열한 뒤 별칭을 전환한다.
+        """
+        utility.wait_for_index_building_complete(self.collection.name)
+        self.collection.load()
+        if self._pending_version is not None:
+            self._warm_up(self.collection)
+            self._switch_alias(self._pending_version)
+        elif self._alias_target() == self.collection.name:
+            self.collection = Collection(self.collection_name)
+        return self._refresh_search_state()["num_entities"]
+
+    def get_manifest(self, sources: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        현재 컬렉션에 색인된 청크 목록 {pk: source} 조회
+        
+        Args:
+            sources: 지정하면 해당 source의 청크만 조회
+        """
+        expr = f"source in {json.dumps(sources, ensure_ascii=False)}" if sources else 'pk != ""'
+        
+        self._load()
+        # source를 지정하면 그 source의 파티션만 조회
+        partition_names = self._source_partitions(sources) if sources else None
+        if partition_names:
+            self._use_partitions(partition_names)
+        manifest = {}
+        iterator = self.collection.query_iterator(
+            batch_size=1000,
+            expr=expr,
+            output_fields=["pk", "source"],
+            partition_names=partition_names,
+            # 중단 직전에 삽입된 청크도 보이도록 (재개 시 중복 임베딩 방지)
+            consistency_level="Strong"
+        )
+        while True:
+            rows = iterator.next()
+            if not rows:
+                iterator.close()
+                break
+            for row in rows:
+                manifest[row["pk"]] = row["source"]
+        
+        return manifest
+
+    def delete(self, ids: Optional[List[str]] = None, partition_name: Optional[str] = None, **kwargs) -> Optional[bool]:
+        """pk 목록으로 청크 삭제 (partition_name을 주면 그 파티션에서만)"""
+        if not ids:
+            return False
+        
+        DELETE_BATCH_SIZE = 1000
+        for i in range(0, len(ids), DELETE_BATCH_SIZE):
+            batch_ids = list(ids[i:i+DELETE_BATCH_SIZE])
+            self.collection.delete(f"pk in {json.dumps(batch_ids)}", partition_name=partition_name)
+        originals = self._original_store(self._current_version())
+        if originals is not None:
+            originals.delete_many(list(ids))
+        
+        print(f"🗑️ {len(ids)}개 청크 삭제 완료")
+        return True
+
+    def sync_documents(self, documents: Iterable[Document], sources: Optional[List[str]] = None,
+                       progress_callback=None) -> Dict[str, Any]:
+        """
+        증분 동기화: 새로 생긴/변경된 청크만 임베딩하여 추가하고 사라진 청크는 삭제
+        
+        Args:
+            documents: 현재 문서 청크 전체 (sources 지정 시 해당 source의 청크)
+            sources: 지정하면 이 source들의 기존 청크만 삭제 대상으로 비교
+            progress_callback: 임베딩 진행 상황 콜백 (완료 수, 전체 수)
+            
+        Returns:
+            {"added": 추가 수, "deleted": 삭제 수, "unchanged": 유지 수, "chunks_per_sec": 처리 속도}
+        """
+        manifest = self.get_manifest(sources)
+        print(f"\n📋 기존 색인 청크: {len(manifest)}개")
+        
+        seen_ids = set()
+        seen_sources = set()
+        
+        def new_records():
+            """색인되지 않은 청크만 스트리밍"""
+            for doc in documents:
+                pk = make_chunk_id(doc.page_content, doc.metadata)
+                if pk in seen_ids:
+                    continue
+                seen_ids.add(pk)
+                seen_sources.add(doc.metadata.get('source', ''))
+                
+                if pk not in manifest:
+                    yield (pk, doc.page_content, doc.metadata)
+        
+        stats = self._ingest(new_records(), progress_callback=progress_callback)
+        added = stats.inserted
+        
+        removed_ids = [pk for pk in manifest if pk not in seen_ids]
+        unchanged = len(seen_ids) - added
+        print(f"📋 동기화 결과: 추가 {added}개, 삭제 {len(removed_ids)}개, 유지 {unchanged}개")
+        
+        if removed_ids:
+            # 청크가 있는 source 파티션 단위로 삭제 (다른 파티션의 세그먼트는 건드리지 않음)
+            by_partition: Dict[Optional[str], List[str]] = {}
+            for pk in removed_ids:
+                partition_name = partition_name_for(manifest[pk])
+                by_partition.setdefault(partition_name if partition_name in self._partitions else None, []).append(pk)
+            for partition_name, ids in by_partition.items():
+                self.delete(ids, partition_name=partition_name)
+        
+        if added or removed_ids:
+            self.collection.flush()
+            # 지정한 source 중 청크가 하나도 남지 않은 파일(삭제된 파일)은 파티션도 제거
+            for source in sources or []:
+                if source not in seen_sources:
+                    self._drop_partition(partition_name_for(source))
+            self._notify_change(sources)
+        else:
+            print("✅ 변경된 청크가 없습니다. 임베딩을 건너뛰었습니다.")
+        
+        return {"added": added, "deleted": len(removed_ids), "unchanged": unchanged,
+                "chunks_per_sec": stats.as_dict()["chunks_per_sec"]}
+
     
     # vector_db/milvus.py의 similarity_search 메서드를 다음과 같이 수정
 
@@ -217,9 +898,80 @@ class MilvusVectorStore(VectorStore):
         """
         유사한 문서 검색 (LangChain 인터페이스)
         """
-        # 먼저 컬렉션의 총 문서 수 확인
-        self.collection.load()
-        total_docs = self.collection.num_entities
+        print(f"\n🔍 쿼리 임베딩 생성: '{query}'")
+        return self._search_with_embedding(self._embed_query(query), k, kwargs)
+
+    async def asimilarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        **kwargs
+        ) -> List[Document]:
+        """
+        유사한 문서 검색 (비동기) - 이벤트 루프를 막지 않도록
+        쿼리 임베딩은 마이크로배처/임베딩 전용 스레드에서, Milvus 검색은 검색 전용 스레드 풀에서 실행한다.
+        """
+        print(f"\n🔍 쿼리 임베딩 생성 (비동기): '{query}'")
+        embedding = await self._aembed_query(query)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._search_executor, self._search_with_embedding, embedding, k, kwargs)
+
+    def similarity_search_batch(self, queries: List[str], k: int = 4, batch_size: int = 256,
+                                expr=None, partitions=None) -> List[List[Document]]:
+        """
+        여러 쿼리를 한 번에 검색 (평가/사전 예열 작업용, LLM 호출 없음)
+        쿼리를 배치로 임베딩한 뒤 batch_size개씩 한 번의 search 호출로 보내고 쿼리별 결과를 반환한다.
+        expr(문자열 또는 조건 dict)을 주면 모든 쿼리에 같은 스칼라 필터를, partitions를 주면 그 파티션만 검색한다.
+        """
+        if not queries:
+            return []
+        partitions = self._resolve_partitions({"partitions": partitions})
+        if partitions == []:
+            return [[] for _ in queries]
+
+        state = self._get_search_state()
+        actual_k = min(k, state["num_entities"])
+        if actual_k == 0:
+            return [[] for _ in queries]
+
+        started = time.perf_counter()
+        embeddings = self._embed_queries(queries)
+        embed_ms = (time.perf_counter() - started) * 1000
+
+        search_params = state["search_params"]
+        output_fields = self.output_fields
+        expr = self.filter_expr({"expr": expr})
+        results = []
+        started = time.perf_counter()
+        for i in range(0, len(embeddings), batch_size):
+            batch = embeddings[i:i + batch_size]
+            if self.hybrid:
+                results.extend(self._hybrid_search_many([dense for dense, _ in batch], [sparse for _, sparse in batch],
+                                                        actual_k, search_params, output_fields, expr, partitions))
+            else:
+                results.extend(self._vector_search_many(batch, actual_k, search_params, output_fields, expr,
+                                                        partitions))
+        search_ms = (time.perf_counter() - started) * 1000
+
+        print(f"📦 배치 검색: 쿼리 {len(queries)}개, k={actual_k} "
+              f"(임베딩 {embed_ms:.1f}ms, 검색 {search_ms:.1f}ms / {-(-len(queries) // batch_size)}회 호출)")
+        return results
+
+    async def asimilarity_search_batch(self, queries: List[str], k: int = 4, batch_size: int = 256,
+                                       expr=None, partitions=None) -> List[List[Document]]:
+        """similarity_search_batch (비동기) - 검색 전용 스레드 풀에서 실행"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._search_executor, self.similarity_search_batch,
+                                          queries, k, batch_size, expr, partitions)
+
+    def _search_with_embedding(self, embedding, k: int, options: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """
+        임베딩된 쿼리로 검색 (하이브리드면 embedding은 (dense, sparse))
+        options의 ef/nprobe로 이 요청의 검색 파라미터를 덮어쓰고, expr로 스칼라 필터를 걸 수 있다.
+        """
+        # 로드 여부/문서 수/검색 파라미터는 캐시된 상태 사용 (검색은 RPC 한 번)
+        state = self._get_search_state()
+        total_docs = state["num_entities"]
         print(f"\n📊 컬렉션 총 문서 수: {total_docs}")
         print(f"📊 요청된 k 값: {k}")
         
@@ -231,77 +983,221 @@ class MilvusVectorStore(VectorStore):
             print("⚠️ 컬렉션에 문서가 없습니다!")
             return []
         
-        # 쿼리 임베딩 생성
-        print(f"\n🔍 쿼리 임베딩 생성: '{query}'")
-        query_vector = self.embedding_model.embed_query(query)
+        query_vector = embedding
+        if self.hybrid:
+            query_vector, query_sparse = query_vector
+            print(f"📏 쿼리 sparse 토큰 수: {len(query_sparse)}")
         print(f"📏 쿼리 벡터 차원: {len(query_vector)}")
 
-        # 벡터 필드에 대한 인덱스 정보 가져오기
-        vector_index = self.collection.indexes[0]
-        index_type = vector_index.params.get("index_type")
-        metric_type = vector_index.params.get("metric_type")
-
-        if index_type == 'HNSW':
-            params = {"ef": 64}
-        elif index_type in ["IVF_FLAT", "IVF_SQ8", "IVF_PQ"]:
-            params = {"nprobe": 10}
-        else:
-            params = {}
+        search_params = self._request_search_params(state["search_params"], options)
+        output_fields = self.output_fields
+        expr = self.filter_expr(options)
+        partitions = self._resolve_partitions(options)
+        if partitions == []:
+            print("⚠️ 요청한 partitions와 일치하는 파티션이 없습니다!")
+            return []
 
         # 검색 파라미터
         print(f"\n🔧 검색 파라미터:")
-        print(f"   - metric_type: {metric_type}")
-        print(f"   - index_type: {index_type}")
-        print(f"   - params: {params}")
+        print(f"   - metric_type: {search_params['metric_type']}")
+        print(f"   - params: {search_params['params']}")
+        print(f"   - 벡터 정밀도: {self.vector_precision}")
         print(f"   - limit: {actual_k}")
-        
-        search_params = {"metric_type": metric_type, "params": params}
+        print(f"   - filter: {expr or '없음'}")
+        print(f"   - partitions: {len(partitions) if partitions else '전체'}")
         
         # 검색 실행
-        print(f"\n🔍 벡터 검색 실행 중...")
+        print(f"\n🔍 {'하이브리드(dense + sparse)' if self.hybrid else '벡터'} 검색 실행 중...")
         try:
-            results = self.collection.search(
-                data=[query_vector],
-                anns_field="vector",
-                param=search_params,
-                limit=actual_k,
-                output_fields=["header1", "header2", "source", "content"]
-            )
+            if self.hybrid:
+                docs = self._hybrid_search_many([query_vector], [query_sparse], actual_k,
+                                                search_params, output_fields, expr, partitions)[0]
+            else:
+                docs = self._vector_search(query_vector, actual_k, search_params, output_fields, expr, partitions)
             
             print(f"✅ 검색 완료!")
-            print(f"📊 검색 결과 개수: {len(results[0]) if results else 0}")
+            print(f"📊 검색 결과 개수: {len(docs)}")
             
             # 각 결과의 상세 정보 출력
-            if results and len(results[0]) > 0:
-                for i, hit in enumerate(results[0]):
-                    print(f"   결과 {i+1}: score={hit.score:.4f}, id={hit.id}")
-                    print(f"          header2: {hit.entity.get('header2', 'N/A')}")
-                    print(f"          content 길이: {len(hit.entity.get('content', ''))}")
+            for i, doc in enumerate(docs):
+                print(f"   결과 {i+1}: score={doc.metadata['score']:.4f}, id={doc.metadata['id']}")
+                print(f"          header2: {doc.metadata.get('Header 2') or 'N/A'}")
+                print(f"          content 길이: {len(doc.page_content or '')}")
             
         except Exception as e:
             print(f"❌ 검색 중 오류: {e}")
             return []
         
-        # LangChain Document 형식으로 변환
-        print(f"\n🔄 LangChain Document 형식으로 변환 중...")
+        return docs
+
+    def _search_params(self) -> Dict[str, Any]:
+        """벡터 필드 인덱스 종류에 맞는 검색 파라미터 (하이브리드면 sparse 인덱스도 있으므로 필드로 선택)"""
+        vector_index = next(index for index in self.collection.indexes if index.field_name == "vector")
+        index_type = vector_index.params.get("index_type")
+        metric_type = vector_index.params.get("metric_type")
+
+        if index_type == 'HNSW':
+            params = {"ef": self.default_search_params["ef"]}
+        elif index_type in ["IVF_FLAT", "IVF_SQ8", "IVF_PQ", "BIN_IVF_FLAT"]:
+            params = {"nprobe": self.default_search_params["nprobe"]}
+        else:
+            params = {}
+        return {"metric_type": metric_type, "params": params}
+
+    @staticmethod
+    def _request_search_params(search_params: Dict[str, Any], options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """요청별 검색 파라미터 덮어쓰기 (options의 ef/nprobe 중 현재 인덱스에 해당하는 키만)"""
+        overrides = {key: int(options[key]) for key in SEARCH_PARAM_KEYS
+                     if options and options.get(key) is not None and key in search_params["params"]}
+        if not overrides:
+            return search_params
+        return {**search_params, "params": {**search_params["params"], **overrides}}
+
+    @staticmethod
+    def _fit_search_params(search_params: Dict[str, Any], limit: int) -> Dict[str, Any]:
+        """HNSW는 ef가 limit보다 작으면 검색 오류 - ef를 limit 이상으로 올림"""
+        if "ef" not in search_params["params"]:
+            return search_params
+        return {**search_params, "params": {**search_params["params"],
+                                            "ef": max(search_params["params"]["ef"], limit)}}
+
+    def filter_expr(self, options: Optional[Dict[str, Any]]) -> Optional[str]:
+        """
+        요청 옵션의 expr → Milvus 필터 표현식 (Milvus가 ANN 전에 스칼라 인덱스로 후보를 거름)
+        문자열은 LocalVectorStore와 같은 형식(필드 연산자 JSON값, and로 연결)과 허용된 필드만 통과,
+        dict는 {"space_name": "X", "date_from": "2026-09-01"} 형식의 조건으로 변환
+        """
+        expr = (options or {}).get("expr")
+        if not expr:
+            return None
+        fields = ["header1", "header2", "source"] + self.metadata_fields
+        if isinstance(expr, dict):
+            return build_filter_expr(expr, fields) or None
+        return validate_filter_expr(expr, fields)
+
+    def _hits_to_documents(self, hits) -> List[Document]:
+        """Milvus 검색 결과 → LangChain Document"""
         docs = []
-        for hits in results:
-            for hit in hits:
-                doc = Document(
-                    page_content=hit.entity.get("content"),
-                    metadata={
-                        "Header 1": hit.entity.get("header1"),
-                        "Header 2": hit.entity.get("header2"),
-                        "source": hit.entity.get("source"),
-                        "score": hit.score,
-                        "id": hit.id
-                    }
-                )
-                docs.append(doc)
-        
-        print(f"✅ {len(docs)}개 문서를 LangChain Document로 변환 완료")
+        for hit in hits:
+            docs.append(Document(
+                page_content=hit.entity.get("content"),
+                metadata={
+                    "Header 1": hit.entity.get("header1"),
+                    "Header 2": hit.entity.get("header2"),
+                    "source": hit.entity.get("source"),
+                    **{name: hit.entity.get(name) for name in self.metadata_fields
+                       if hit.entity.get(name) not in (None, "", 0)},
+                    "score": hit.score,
+                    "id": hit.id
+                }
+            ))
         return docs
 
+    def _hybrid_search_many(self, query_vectors: List[List[float]], query_sparses: List[dict], k: int,
+                            search_params: Dict[str, Any], output_fields: List[str],
+                            expr: Optional[str] = None,
+                            partitions: Optional[List[str]] = None) -> List[List[Document]]:
+        """
+        dense/sparse ANN 요청을 한 번의 호출로 보내고 서버에서 결합 (쿼리별 결과 목록, expr은 두 요청 모두에 적용)
+        partitions를 주면 그 파티션만 검색한다.
+        """
+        requests = [
+            AnnSearchRequest(data=self._to_field_vectors(query_vectors), anns_field="vector",
+                             param=search_params, limit=k, expr=expr),
+            AnnSearchRequest(data=query_sparses, anns_field=SPARSE_FIELD,
+                             param={"metric_type": "IP", "params": {"drop_ratio_search": 0.2}},
+                             limit=k, expr=expr),
+        ]
+        results = self.collection.hybrid_search(
+            reqs=requests,
+            rerank=self._hybrid_ranker(),
+            limit=k,
+            partition_names=partitions,
+            output_fields=output_fields
+        )
+        return [self._hits_to_documents(hits) for hits in results]
+
+    def _vector_search(self, query_vector: List[float], k: int, search_params: Dict[str, Any],
+                       output_fields: List[str], expr: Optional[str] = None,
+                       partitions: Optional[List[str]] = None) -> List[Document]:
+        """
+        dense 벡터 검색
+        float16/binary 필드면 k × rescore_factor개 후보를 찾은 뒤 원본 정밀도 벡터로 재채점하여 상위 k개 반환
+        """
+        return self._vector_search_many([query_vector], k, search_params, output_fields, expr, partitions)[0]
+
+    def _vector_search_many(self, query_vectors: List[List[float]], k: int, search_params: Dict[str, Any],
+                            output_fields: List[str], expr: Optional[str] = None,
+                            partitions: Optional[List[str]] = None) -> List[List[Document]]:
+        """
+        여러 쿼리 벡터를 한 번의 search 호출로 검색 (쿼리별 결과 목록, expr은 ANN 전에 적용되는 스칼라 필터)
+        partitions를 주면 그 파티션의 세그먼트만 검색한다.
+        """
+        rescore = self.vector_precision != 'float32' and self.rescore_factor > 1
+        limit = k * self.rescore_factor if rescore else k
+        results = self.collection.search(
+            data=self._to_field_vectors(query_vectors),
+            anns_field="vector",
+            param=self._fit_search_params(search_params, limit),
+            limit=limit,
+            output_fields=output_fields,
+            expr=expr,
+            partition_names=partitions
+        )
+        batch_docs = [self._hits_to_documents(hits) for hits in results]
+        if rescore:
+            # 원본 벡터가 없어 재채점하지 못한 쿼리는 ANN 순위 그대로 상위 k개
+            batch_docs = [self._rescore(query_vector, docs, k) or docs[:k]
+                          for query_vector, docs in zip(query_vectors, batch_docs)]
+        return batch_docs
+
+    def _rescore(self, query_vector: List[float], docs: List[Document], k: int) -> Optional[List[Document]]:
+        """
+        후보를 원본 정밀도 벡터로 정확히 재채점 (metadata['score']를 재채점 점수로 교체)
+        벡터는 색인할 때 저장한 float32 원본 벡터 저장소(pk 키)에서 읽는다.
+        검색 경로에서는 재임베딩하지 않으므로 원본 벡터가 하나라도 없으면 재채점하지 않고 None 반환
+        """
+        if not docs:
+            return docs
+
+        started = time.perf_counter()
+        vectors, missing = self._original_vectors([doc.metadata["id"] for doc in docs])
+        if missing:
+            print(f"⚠️ 원본 벡터 없음 {missing}/{len(docs)}개 - 재채점 생략 "
+                  f"(python -m indexing으로 재구축하면 원본 벡터가 저장됨)")
+            return None
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        query = np.asarray(query_vector, dtype=np.float32)
+        if self.metric_type == 'L2':
+            scores = np.sum((matrix - query) ** 2, axis=1)
+            order = np.argsort(scores)[:k]
+        else:
+            if self.metric_type == 'COSINE':
+                matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+                query = query / max(float(np.linalg.norm(query)), 1e-12)
+            scores = matrix @ query
+            order = np.argsort(-scores)[:k]
+
+        reranked = []
+        for i in order.tolist():
+            docs[i].metadata["score"] = float(scores[i])
+            reranked.append(docs[i])
+        print(f"🎯 원본 정밀도 재채점: 후보 {len(docs)}개 → {len(reranked)}개 "
+              f"({(time.perf_counter() - started) * 1000:.1f}ms)")
+        return reranked
+
+    def _original_vectors(self, pks: List[str]) -> tuple:
+        """
+        현재 서빙 버전의 pk별 float32 원본 벡터 (없으면 None, 임베딩하지 않음) - (벡터 목록, 없는 수)
+        버전은 캐시된 검색 상태에서 읽으므로 검색마다 별칭 조회 RPC를 보내지 않는다.
+        """
+        originals = self._original_store(self._get_search_state()["version"])
+        if originals is None:
+            return [None] * len(pks), len(pks)
+        vectors = originals.get_many(pks)
+        return vectors, sum(1 for vector in vectors if vector is None)
+
     
     def similarity_search_with_score(
         self, 
@@ -314,6 +1210,232 @@ class MilvusVectorStore(VectorStore):
         print("\n✅ 유사도 점수 포함.\n")
         return [(doc, doc.metadata.get('score', 0.0)) for doc in docs]
 
+    def similarity_search_with_relevance_scores(
+        self,
+        query: str,
+        k: int = 4,
+        score_threshold: Optional[float] = None,
+        score_gap: Optional[float] = None,
+        **kwargs
+        ) -> List[tuple]:
+        """
+        관련도 점수(0~1, 정규화 벡터 기준 코사인 유사도)와 함께 검색 (LangChain similarity_score_threshold)
+        score_threshold는 Milvus range search(radius)로 서버에서 잘라내고,
+        score_gap을 주면 인접 점수 차가 그보다 큰 지점에서 결과를 끊는다 (적응형 k).
+        하이브리드 컬렉션이어도 점수 비교가 가능하도록 dense 필드만 사용한다.
+        """
+        print(f"\n🔍 쿼리 임베딩 생성 (threshold): '{query}'")
+        embedding = self._embed_query(query)
+        return self._range_search_with_embedding(embedding[0] if self.hybrid else embedding, k,
+                                                 score_threshold, score_gap, kwargs)
+
+    async def asimilarity_search_with_relevance_scores(
+        self,
+        query: str,
+        k: int = 4,
+        score_threshold: Optional[float] = None,
+        score_gap: Optional[float] = None,
+        **kwargs
+        ) -> List[tuple]:
+        """similarity_search_with_relevance_scores (비동기) - 검색은 검색 전용 스레드 풀에서"""
+        print(f"\n🔍 쿼리 임베딩 생성 (threshold, 비동기): '{query}'")
+        embedding = await self._aembed_query(query)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._search_executor, self._range_search_with_embedding,
+                                          embedding[0] if self.hybrid else embedding, k,
+                                          score_threshold, score_gap, kwargs)
+
+    def _select_relevance_score_fn(self):
+        """검색 점수 → 관련도 (LangChain 기본 relevance 경로용)"""
+        return lambda score: self._relevance_score(score, self._field_metric_type())
+
+    def _relevance_score(self, score: float, metric_type: str) -> float:
+        """
+        메트릭별 점수 → 관련도 (정규화된 BGE-M3 벡터에서는 모두 코사인 유사도와 같아짐)
+        L2는 제곱 거리 d = 2 - 2cos, HAMMING은 부호 비트가 다른 비율로 근사
+        """
+        if metric_type == 'L2':
+            return 1.0 - score / 2.0
+        if metric_type == 'HAMMING':
+            return 1.0 - 2.0 * score / self.embedding_dim
+        return float(score)
+
+    def _range_params(self, score_threshold: float) -> Dict[str, Any]:
+        """관련도 하한 → Milvus range search radius (IP/COSINE은 score > radius, L2는 distance < radius)"""
+        if self._field_metric_type() == 'L2':
+            return {"radius": 2.0 * (1.0 - score_threshold)}
+        return {"radius": score_threshold}
+
+    def _range_search_with_embedding(self, query_vector: List[float], k: int, score_threshold: Optional[float],
+                                     score_gap: Optional[float],
+                                     options: Optional[Dict[str, Any]] = None) -> List[tuple]:
+        """dense range search → (float16/binary면 재채점) → 관련도 필터 → 점수 차 기준 적응형 k (options: min_k, ef/nprobe)"""
+        state = self._get_search_state()
+        actual_k = min(k, state["num_entities"])
+        if actual_k == 0:
+            print("⚠️ 컬렉션에 문서가 없습니다!")
+            return []
+
+        partitions = self._resolve_partitions(options)
+        if partitions == []:
+            return []
+
+        started = time.perf_counter()
+        rescore = self.vector_precision != 'float32' and self.rescore_factor > 1
+        limit = actual_k * self.rescore_factor if rescore else actual_k
+        search_params = self._fit_search_params(self._request_search_params(state["search_params"], options), limit)
+        if score_threshold is not None and self.vector_precision != 'binary':
+            # binary(HAMMING) 점수는 근사치라 서버에서 자르지 않고 재채점 후 정확한 점수로 거름
+            search_params = {**search_params, "params": {**search_params["params"],
+                                                         **self._range_params(score_threshold)}}
+        hits = self.collection.search(
+            data=self._to_field_vectors([query_vector]),
+            anns_field="vector",
+            param=search_params,
+            limit=limit,
+            output_fields=self.output_fields,
+            expr=self.filter_expr(options),
+            partition_names=partitions
+        )[0]
+        docs = self._hits_to_documents(hits)
+        fetched = len(docs)
+        if rescore:
+            rescored = self._rescore(query_vector, docs, actual_k)
+            rescore = rescored is not None
+            docs = rescored if rescore else docs[:actual_k]
+
+        metric_type = self.metric_type if rescore else self._field_metric_type()
+        scored = [(doc, self._relevance_score(doc.metadata["score"], metric_type)) for doc in docs]
+        if score_threshold is not None:
+            scored = [(doc, relevance) for doc, relevance in scored if relevance >= score_threshold]
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        if score_gap is not None and scored:
+            min_k = int((options or {}).get("min_k", 1))
+            scored = scored[:cut_at_score_gap([relevance for _, relevance in scored], score_gap, min_k)]
+
+        for doc, relevance in scored:
+            doc.metadata["relevance_score"] = relevance
+        print(f"🎚️ range search: 후보 {fetched}개 → {len(scored)}개 (threshold={score_threshold}, "
+              f"gap={score_gap}, {(time.perf_counter() - started) * 1000:.1f}ms)")
+        return scored
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs) -> List[Document]:
+        """dense 쿼리 벡터로 검색 (LangChain 인터페이스, 하이브리드 컬렉션이어도 dense 필드만 사용)"""
+        state = self._get_search_state()
+        actual_k = min(k, state["num_entities"])
+        partitions = self._resolve_partitions(kwargs)
+        if actual_k == 0 or partitions == []:
+            return []
+        return self._vector_search(embedding, actual_k, self._request_search_params(state["search_params"], kwargs),
+                                   self.output_fields, self.filter_expr(kwargs), partitions)
+
+    def max_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs
+        ) -> List[Document]:
+        """
+        MMR 검색 (LangChain 인터페이스)
+        dense 검색 한 번으로 fetch_k개 후보와 벡터를 가져와 NumPy 행렬 연산으로 k개를 다양화한다.
+        """
+        print(f"\n🔍 쿼리 임베딩 생성 (MMR): '{query}'")
+        embedding = self._embed_query(query)
+        return self._mmr_with_embedding(embedding[0] if self.hybrid else embedding, k, fetch_k, lambda_mult, kwargs)
+
+    async def amax_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs
+        ) -> List[Document]:
+        """MMR 검색 (비동기) - 쿼리 임베딩은 asimilarity_search와 같은 경로, 검색/다양화는 검색 전용 스레드 풀에서"""
+        print(f"\n🔍 쿼리 임베딩 생성 (MMR, 비동기): '{query}'")
+        embedding = await self._aembed_query(query)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._search_executor, self._mmr_with_embedding,
+                                          embedding[0] if self.hybrid else embedding, k, fetch_k, lambda_mult, kwargs)
+
+    def max_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs
+        ) -> List[Document]:
+        """dense 쿼리 벡터로 MMR 검색 (LangChain 인터페이스)"""
+        return self._mmr_with_embedding(embedding, k, fetch_k, lambda_mult, kwargs)
+
+    def _mmr_with_embedding(self, query_vector: List[float], k: int, fetch_k: int, lambda_mult: float,
+                            options: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """fetch_k개 후보를 한 번에 검색한 뒤 MMR로 k개 선택 (metadata['score']는 검색 점수 유지)"""
+        state = self._get_search_state()
+        fetch_k = min(max(fetch_k, k), state["num_entities"])
+        if fetch_k == 0:
+            print("⚠️ 컬렉션에 문서가 없습니다!")
+            return []
+
+        partitions = self._resolve_partitions(options)
+        if partitions == []:
+            return []
+
+        started = time.perf_counter()
+        docs, vectors = self._search_candidates(query_vector, fetch_k,
+                                                self._request_search_params(state["search_params"], options),
+                                                self.filter_expr(options), partitions)
+        search_ms = (time.perf_counter() - started) * 1000
+        if vectors is None:
+            print(f"⚠️ 원본 벡터가 없어 MMR 생략 - 검색 순위 상위 {k}개 반환 ({search_ms:.1f}ms)")
+            return docs[:k]
+
+        started = time.perf_counter()
+        selected = maximal_marginal_relevance(query_vector, vectors, k, lambda_mult)
+        mmr_ms = (time.perf_counter() - started) * 1000
+
+        print(f"🧩 MMR: 후보 {len(docs)}개 → {len(selected)}개 (lambda={lambda_mult}, "
+              f"검색 {search_ms:.1f}ms, 다양화 {mmr_ms:.2f}ms)")
+        return [docs[i] for i in selected]
+
+    def _search_candidates(self, query_vector: List[float], limit: int, search_params: Dict[str, Any],
+                           expr: Optional[str] = None, partitions: Optional[List[str]] = None) -> tuple:
+        """
+        dense 검색 한 번으로 후보 문서와 벡터를 함께 가져옴 - (문서 목록, (n, dim) 행렬)
+        binary 필드는 부호 비트만 저장하므로 float32 원본 벡터 저장소를 사용한다 (없으면 행렬 대신 None).
+        """
+        with_vector = self.vector_precision != 'binary'
+        output_fields = self.output_fields + (["vector"] if with_vector else [])
+        hits = self.collection.search(
+            data=self._to_field_vectors([query_vector]),
+            anns_field="vector",
+            param=self._fit_search_params(search_params, limit),
+            limit=limit,
+            output_fields=output_fields,
+            expr=expr,
+            partition_names=partitions
+        )[0]
+        docs = self._hits_to_documents(hits)
+        if not docs:
+            return docs, np.empty((0, self.embedding_dim), dtype=np.float32)
+
+        if with_vector:
+            vectors = [self._from_field_vector(hit.entity.get("vector")) for hit in hits]
+        else:
+            vectors, missing = self._original_vectors([doc.metadata["id"] for doc in docs])
+            if missing:
+                return docs, None
+        return docs, np.asarray(vectors, dtype=np.float32)
+
+    def _from_field_vector(self, value) -> np.ndarray:
+        """벡터 필드 출력값 → float32 배열 (float16 필드는 bytes로 반환될 수 있음)"""
+        if isinstance(value, (bytes, bytearray)):
+            return np.frombuffer(value, dtype=np.float16).astype(np.float32)
+        return np.asarray(value, dtype=np.float32)
+
 
 
 
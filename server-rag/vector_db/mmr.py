@@ -0,0 +1,52 @@
+"""
+MMR(Maximal Marginal Relevance) 다양화
+후보 집합의 유사도 행렬을 한 번에 계산하고, 선택 단계마다 "이미 고른 문서와의 최대 유사도"
+벡터만 갱신하여 쌍마다 도는 Python 루프 없이 상위 k개를 고른다.
+"""
+from typing import List
+
+import numpy as np
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=-1, keepdims=True), 1e-12)
+
+
+def maximal_marginal_relevance(query_vector, candidate_vectors, k: int = 4,
+                               lambda_mult: float = 0.5) -> List[int]:
+    """
+    MMR로 고른 후보 인덱스 목록 (선택 순서)
+
+    Args:
+        query_vector: 쿼리 벡터 (dim,)
+        candidate_vectors: 후보 벡터 (n, dim)
+        k: 고를 문서 수
+        lambda_mult: 1이면 관련도만, 0이면 다양성만 고려
+    """
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    if candidates.ndim != 2 or len(candidates) == 0 or k <= 0:
+        return []
+    k = min(k, len(candidates))
+
+    candidates = _normalize(candidates)
+    query = _normalize(np.asarray(query_vector, dtype=np.float32).reshape(-1))
+
+    # 쿼리 관련도 (n,)와 후보 간 코사인 유사도 (n, n)
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+
+    selected = [int(np.argmax(relevance))]
+    # 각 후보가 이미 고른 문서들과 갖는 최대 유사도
+    redundancy = similarity[selected[0]].copy()
+    available = np.ones(len(candidates), dtype=bool)
+    available[selected[0]] = False
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+
+    return selected
@@ -0,0 +1,155 @@
+"""
+float16/binary 컬렉션 재채점용 float32 원본 벡터 저장소
+- 버전 컬렉션마다 디렉토리 하나 ('{ORIGINAL_VECTOR_DIR}/{버전 컬렉션 이름}'), 버전 컬렉션을 삭제할 때 함께 삭제
+- 벡터: 메모리 맵(np.memmap) float32 행렬 파일 / 인덱스: SQLite (pk → 행 번호)
+- 교체(LRU) 없음: 색인된 청크의 원본 벡터는 삭제될 때까지 유지하고, 삭제된 행은 다음 삽입에 재사용
+- 쓰기(색인)는 배타 파일 잠금, 읽기(검색)는 공유 파일 잠금 안에서 - 읽기는 SQLite에 쓰지 않음
+"""
+import os
+import shutil
+import fcntl
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+
+class OriginalVectorStore:
+    """pk 키 float32 벡터 저장소 (버전 컬렉션 하나 단위)"""
+
+    GROW_ROWS = 4096  # 행렬 파일을 늘리는 단위
+
+    def __init__(self, path: str, dim: int = 1024):
+        self.dim = dim
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path / "index.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (pk TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+        # 삭제된 청크의 행 (다음 삽입에 재사용)
+        self._db.execute("CREATE TABLE IF NOT EXISTS free_rows (row INTEGER PRIMARY KEY)")
+        self._db.commit()
+
+        self._vectors_path = self.path / "vectors.bin"
+        self._lock_path = self.path / "write.lock"
+        self._vectors = None
+        self._capacity = 0
+        self._open_vectors()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _open_vectors(self):
+        """행렬 파일을 메모리 맵으로 열기"""
+        row_bytes = self.dim * np.dtype(np.float32).itemsize
+        file_size = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+        self._capacity = file_size // row_bytes
+        if self._capacity == 0:
+            self._vectors = None
+            return
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r+',
+                                  shape=(self._capacity, self.dim))
+
+    @contextmanager
+    def _process_lock(self, shared: bool = False):
+        """프로세스 간 잠금 (색인 프로세스의 쓰기와 서빙 프로세스의 읽기 사이)"""
+        with open(self._lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _ensure_capacity(self, rows: int):
+        """행렬 파일 크기를 최소 rows 행까지 확장 (다른 프로세스가 이미 늘렸으면 다시 매핑만)"""
+        if rows <= self._capacity:
+            return
+        self._open_vectors()
+        if rows <= self._capacity:
+            return
+        new_capacity = max(rows, self._capacity + self.GROW_ROWS)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, 'ab') as f:
+            f.truncate(new_capacity * self.dim * np.dtype(np.float32).itemsize)
+        self._open_vectors()
+
+    def _rows_of(self, pks: List[str]) -> dict:
+        rows = {}
+        for i in range(0, len(pks), 500):
+            batch = pks[i:i+500]
+            placeholders = ",".join("?" * len(batch))
+            for pk, row in self._db.execute(f"SELECT pk, row FROM entries WHERE pk IN ({placeholders})", batch):
+                rows[pk] = row
+        return rows
+
+    def get_many(self, pks: List[str]) -> List[Optional[np.ndarray]]:
+        """pk 목록의 원본 벡터 (없으면 None)"""
+        results: List[Optional[np.ndarray]] = [None] * len(pks)
+        with self._lock, self._process_lock(shared=True):
+            rows = self._rows_of(pks)
+            if rows and max(rows.values()) >= self._capacity:
+                # 다른 프로세스가 행렬 파일을 늘린 뒤 쓴 행
+                self._open_vectors()
+            for i, pk in enumerate(pks):
+                row = rows.get(pk)
+                if row is not None and row < self._capacity:
+                    results[i] = np.array(self._vectors[row], dtype=np.float32)
+        return results
+
+    def put_many(self, pks: List[str], vectors: List[List[float]]):
+        """원본 벡터 저장 (이미 있는 pk는 건너뜀 - pk가 청크 내용 해시이므로 벡터도 같음)"""
+        entries = dict(zip(pks, vectors))
+        with self._lock, self._process_lock():
+            for pk in self._rows_of(list(entries)):
+                entries.pop(pk, None)
+            if not entries:
+                return
+
+            new_pks = list(entries)
+            free = [row for (row,) in self._db.execute(
+                "SELECT row FROM free_rows ORDER BY row LIMIT ?", (len(new_pks),))]
+            next_row = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM entries").fetchone()[0]
+            next_row = max([next_row] + [row + 1 for row in free])
+            rows = free + list(range(next_row, next_row + len(new_pks) - len(free)))
+            self._ensure_capacity(max(rows) + 1)
+
+            self._vectors[np.asarray(rows, dtype=np.int64)] = np.asarray([entries[pk] for pk in new_pks],
+                                                                        dtype=np.float32)
+            self._vectors.flush()
+
+            self._db.executemany("DELETE FROM free_rows WHERE row = ?", [(row,) for row in free])
+            self._db.executemany("INSERT INTO entries (pk, row) VALUES (?, ?)", list(zip(new_pks, rows)))
+            self._db.commit()
+
+    def delete_many(self, pks: List[str]):
+        """삭제된 청크의 원본 벡터 제거 (행은 재사용 목록으로)"""
+        with self._lock, self._process_lock():
+            rows = self._rows_of(list(pks))
+            if not rows:
+                return
+            self._db.executemany("DELETE FROM entries WHERE pk = ?", [(pk,) for pk in rows])
+            self._db.executemany("INSERT OR IGNORE INTO free_rows (row) VALUES (?)", [(row,) for row in rows.values()])
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._vectors = None
+            self._db.close()
+
+    def stats(self) -> dict:
+        return {"path": str(self.path), "entries": len(self), "capacity": self._capacity}
+
+
+def drop_original_vectors(root: str, version: str):
+    """버전 컬렉션의 원본 벡터 디렉토리 삭제"""
+    path = os.path.join(root, version)
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+        print(f"🗑️ 원본 벡터 '{path}' 삭제")
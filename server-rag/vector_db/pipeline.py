@@ -0,0 +1,166 @@
+"""
+스트리밍 색인 파이프라인
+청크 생성(producer) → 임베딩 → 벡터 DB 삽입 단계를 제한된 크기의 큐로 연결하여 동시에 실행한다.
+한 번에 메모리에 올라가는 청크는 (큐 크기 × 배치 크기 + 세그먼트 크기) 정도로 고정된다.
+"""
+import time
+import queue
+import threading
+from typing import Iterable, Callable, List, Tuple, Optional
+
+# (pk, text, metadata)
+Record = Tuple[str, str, dict]
+
+_DONE = object()
+
+
+class PipelineStats:
+    """파이프라인 처리 통계"""
+
+    def __init__(self, total: Optional[int] = None):
+        self.total = total
+        self.embedded = 0
+        self.inserted = 0
+        self.segments = 0
+        self.started_at = time.time()
+        self.finished_at = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.inserted / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "embedded": self.embedded,
+            "inserted": self.inserted,
+            "segments": self.segments,
+            "elapsed_sec": round(self.elapsed, 2),
+            "chunks_per_sec": round(self.chunks_per_sec, 1)
+        }
+
+
+def _put(q: queue.Queue, item, stop: threading.Event):
+    """stop 이벤트를 확인하면서 큐에 넣기 (하류 단계가 실패해도 멈추지 않도록)"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    """stop 이벤트를 확인하면서 큐에서 꺼내기"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.5)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def run_ingestion_pipeline(records: Iterable[Record],
+                           embed_fn: Callable[[List[str]], List[List[float]]],
+                           insert_fn: Callable[[List[tuple]], None],
+                           embed_batch_size: int = 32,
+                           segment_size: int = 1000,
+                           queue_size: int = 4,
+                           total: Optional[int] = None,
+                           progress_callback=None) -> PipelineStats:
+    """
+    청크 스트림을 임베딩하고 세그먼트 단위로 삽입
+
+    Args:
+        records: (pk, text, metadata) 이터러블 (제너레이터 가능)
+        embed_fn: 텍스트 배치 → 벡터 배치
+        insert_fn: [(pk, text, metadata, vector), ...] 세그먼트 삽입 (flush는 호출자가 마지막에 한 번)
+        embed_batch_size: 임베딩 단계로 넘기는 배치 크기
+        segment_size: 한 번의 insert 호출에 담을 행 수
+        queue_size: 단계 사이 큐의 최대 배치 수
+        total: 전체 청크 수 (알 수 있는 경우, 진행률 표시용)
+        progress_callback: 임베딩 진행 상황 콜백 (완료 수, 전체 수)
+    """
+    stats = PipelineStats(total)
+    stop = threading.Event()
+    errors = []
+
+    embed_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    insert_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+
+    def produce():
+        try:
+            batch = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= embed_batch_size:
+                    if not _put(embed_queue, batch, stop):
+                        return
+                    batch = []
+            if batch:
+                _put(embed_queue, batch, stop)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            _put(embed_queue, _DONE, stop)
+
+    def embed():
+        try:
+            while True:
+                batch = _get(embed_queue, stop)
+                if batch is _DONE:
+                    break
+                vectors = embed_fn([text for _, text, _ in batch])
+                stats.embedded += len(batch)
+                if progress_callback:
+                    progress_callback(stats.embedded, total or stats.embedded)
+                if not _put(insert_queue, [(*record, vector) for record, vector in zip(batch, vectors)], stop):
+                    return
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            _put(insert_queue, _DONE, stop)
+
+    producer = threading.Thread(target=produce, name="ingest-producer", daemon=True)
+    embedder = threading.Thread(target=embed, name="ingest-embedder", daemon=True)
+    producer.start()
+    embedder.start()
+
+    # 삽입 단계는 호출 스레드에서 실행
+    segment = []
+    try:
+        while True:
+            rows = _get(insert_queue, stop)
+            if rows is _DONE:
+                break
+            segment.extend(rows)
+            while len(segment) >= segment_size:
+                insert_fn(segment[:segment_size])
+                stats.inserted += segment_size
+                stats.segments += 1
+                segment = segment[segment_size:]
+                print(f"   📥 세그먼트 {stats.segments} 삽입: 누적 {stats.inserted}개 ({stats.chunks_per_sec:.1f} chunks/sec)")
+        if segment and not errors:
+            insert_fn(segment)
+            stats.inserted += len(segment)
+            stats.segments += 1
+    except Exception as e:
+        errors.append(e)
+        stop.set()
+
+    producer.join()
+    embedder.join()
+    stats.finished_at = time.time()
+
+    if errors:
+        raise errors[0]
+
+    print(f"✅ 파이프라인 완료: 임베딩 {stats.embedded}개, 삽입 {stats.inserted}개 "
+          f"({stats.segments}개 세그먼트, {stats.elapsed:.1f}초, {stats.chunks_per_sec:.1f} chunks/sec)")
+    return stats
@@ -0,0 +1,47 @@
+"""
+컬렉션별 검색 튜닝 설정 (인덱스 빌드 파라미터, 검색 파라미터, 기본 k)
+python -m vector_db.benchmark_tuning --write가 고른 값을 저장하고,
+create_vector_store/server.py가 읽어서 환경변수 기본값을 덮어쓴다.
+"""
+import os
+import json
+from typing import Dict, Any, Optional
+
+# 디렉토리째 볼륨으로 마운트 (파일만 마운트하면 os.replace로 교체할 수 없음)
+DEFAULT_TUNING_PATH = "./vector_db/tuning/tuning.json"
+
+
+def get_tuning_path() -> str:
+    return os.getenv("RETRIEVAL_TUNING_FILE", DEFAULT_TUNING_PATH)
+
+
+def _load_all(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 튜닝 설정 파일을 읽지 못했습니다 ({path}): {e}")
+        return {}
+
+
+def load_tuning(collection_name: str, path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    컬렉션의 튜닝 설정 {"build_params", "search_params", "k", ...} (없으면 빈 dict)
+    """
+    return _load_all(path or get_tuning_path()).get(collection_name, {})
+
+
+def save_tuning(collection_name: str, settings: Dict[str, Any], path: Optional[str] = None):
+    """컬렉션의 튜닝 설정 저장 (다른 컬렉션 설정은 유지, 임시 파일로 쓴 뒤 교체)"""
+    path = path or get_tuning_path()
+    data = _load_all(path)
+    data[collection_name] = settings
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    print(f"💾 튜닝 설정 저장: {path} ('{collection_name}')")
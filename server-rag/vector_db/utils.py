@@ -0,0 +1,179 @@
+"""
+벡터 스토어 공통 유틸리티
+"""
+import os
+import re
+import json
+import hashlib
+from datetime import datetime
+from typing import List, Iterable
+
+
+def make_chunk_id(text: str, metadata: dict = None) -> str:
+    """
+    청크 내용 기반의 결정적 ID(sha256) 생성
+    같은 source/헤더/본문이면 재시작해도 항상 같은 ID가 나온다.
+    """
+    metadata = metadata or {}
+    key = "\x1f".join([
+        str(metadata.get('source', '')),
+        str(metadata.get('Header 1', '')),
+        str(metadata.get('Header 2', '')),
+        text,
+    ])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def cut_at_score_gap(scores: List[float], max_gap: float, min_k: int = 1) -> int:
+    """
+    적응형 k: 내림차순 점수에서 인접한 두 점수의 차가 max_gap보다 커지는 첫 지점까지의 개수
+    (상위 몇 개만 뚜렷하게 관련 있는 단순한 질문은 컨텍스트를 적게 넘긴다)
+    """
+    for i in range(max(1, min_k), len(scores)):
+        if scores[i - 1] - scores[i] > max_gap:
+            return i
+    return len(scores)
+
+
+def _to_epoch(value) -> int:
+    """epoch 초 또는 ISO 날짜 문자열 → epoch 초"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(datetime.fromisoformat(str(value)).timestamp())
+
+
+def build_filter_expr(conditions: dict, fields: Iterable[str]) -> str:
+    """
+    필터 조건 dict → Milvus 불리언 표현식 (허용된 필드만, 값은 JSON으로 인용)
+    {"space_name": "X", "list_name": ["A", "B"], "date_from": "2026-09-01", "date_to": "2026-10-01"}
+    → space_name == "X" and list_name in ["A", "B"] and date_created_ts >= ... and date_created_ts < ...
+    """
+    fields = set(fields)
+    clauses = []
+    for key, value in conditions.items():
+        if key in ("date_from", "date_to"):
+            operator = ">=" if key == "date_from" else "<"
+            clauses.append(f"date_created_ts {operator} {_to_epoch(value)}")
+            continue
+        if key not in fields:
+            raise ValueError(f"필터할 수 없는 필드: {key}")
+        values = list(value) if isinstance(value, (list, tuple)) else [value]
+        if _field_type(key) is int:
+            # 날짜 문자열은 epoch 초로 변환
+            values = [_to_epoch(item) if isinstance(item, str) else item for item in values]
+        for item in values:
+            _check_filter_value(key, item)
+        if isinstance(value, (list, tuple)):
+            clauses.append(f"{key} in {json.dumps(values, ensure_ascii=False)}")
+        else:
+            clauses.append(f"{key} == {json.dumps(values[0], ensure_ascii=False)}")
+    return " and ".join(clauses)
+
+
+def _field_type(field: str) -> type:
+    """스칼라 필드의 값 타입 (METADATA_FIELDS에 없는 header1/header2/source는 문자열)"""
+    return next((field_type for name, field_type, _ in METADATA_FIELDS if name == field), str)
+
+
+def _check_filter_value(field: str, value):
+    """필터 값이 필드 타입과 맞는지 확인 (INT64 필드는 정수, VARCHAR 필드는 문자열)"""
+    field_type = _field_type(field)
+    if field_type is int:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"{field} 필터 값은 정수(epoch 초)여야 합니다: {value!r}")
+    elif not isinstance(value, str):
+        raise ValueError(f"{field} 필터 값은 문자열이어야 합니다: {value!r}")
+
+
+# 필터 표현식의 한 조건 ('필드 연산자 JSON값')
+_CLAUSE = re.compile(r"\s*(\w+)\s*(==|!=|>=|<=|>|<|in)\s*")
+_AND = re.compile(r"\s+and\s+|\s*$")
+
+
+def parse_filter_expr(expr: str) -> List[tuple]:
+    """
+    필터 표현식 → [(필드, 연산자, 값), ...] (조건은 and로만 연결)
+    'space_name == "X" and list_name in ["A", "B"] and date_created_ts >= 1756652400'
+    """
+    decoder = json.JSONDecoder()
+    clauses = []
+    position = 0
+    while position < len(expr):
+        match = _CLAUSE.match(expr, position)
+        if not match:
+            raise ValueError(f"지원하지 않는 필터 표현식: {expr}")
+        try:
+            value, position = decoder.raw_decode(expr, match.end())
+        except ValueError:
+            raise ValueError(f"지원하지 않는 필터 값: {expr[match.end():]}")
+        if match.group(2) == "in" and not isinstance(value, list):
+            raise ValueError(f"in 조건에는 목록이 필요합니다: {expr}")
+        clauses.append((match.group(1), match.group(2), value))
+        separator = _AND.match(expr, position)
+        if not separator:
+            raise ValueError(f"지원하지 않는 필터 표현식: {expr}")
+        position = separator.end()
+    return clauses
+
+
+def validate_filter_expr(expr: str, fields: Iterable[str]) -> str:
+    """
+    클라이언트가 보낸 필터 표현식 검증 (parse_filter_expr 형식 + 허용된 필드 + 필드 타입에 맞는 값만)
+    - 통과하면 그대로 반환
+    """
+    fields = set(fields)
+    for field, operator, value in parse_filter_expr(expr):
+        if field not in fields:
+            raise ValueError(f"필터할 수 없는 필드: {field}")
+        for item in (value if operator == "in" else [value]):
+            _check_filter_value(field, item)
+    return expr
+
+
+# CSV 청크 메타데이터 스칼라 필드 (metadata 키 = 필드 이름, 값 타입, VARCHAR 최대 길이(바이트))
+# Milvus 스키마(str → VARCHAR, int → INT64)와 LocalVectorStore 컬럼이 함께 사용 - 필터 검색용 스칼라 인덱스 생성
+METADATA_FIELDS = [
+    ("task_id", str, 64),
+    ("space_name", str, 200),
+    ("list_name", str, 200),
+    ("folder_name", str, 200),
+    ("date_created", str, 100),
+    ("date_created_ts", int, None),  # epoch 초 (날짜 범위 필터, 알 수 없으면 0)
+    ("doc_type", str, 16),  # source 확장자로 정하는 문서 종류 (md / csv / doc)
+]
+
+
+def metadata_value(name: str, value):
+    """메타데이터 값 → 스칼라 필드 값 (없으면 빈 값, VARCHAR는 최대 길이(바이트)로 자름)"""
+    field_type, max_length = next((field_type, max_length) for field, field_type, max_length in METADATA_FIELDS
+                                  if field == name)
+    if field_type is int:
+        try:
+            return int(value or 0)
+        except (TypeError, ValueError):
+            return 0
+    text = "" if value is None else str(value)
+    encoded = text.encode('utf-8')
+    if len(encoded) > max_length:
+        text = encoded[:max_length].decode('utf-8', errors='ignore')
+    return text
+
+
+# 파티션 이름 접두사가 되는 문서 종류 (파티션 이름은 영문/숫자/_만 허용되므로 source는 해시로)
+DOC_TYPES = ("md", "csv", "doc")
+
+
+def doc_type_of(source: str) -> str:
+    """source 파일 확장자 → 문서 종류"""
+    extension = os.path.splitext(source or "")[1].lower()
+    if extension in (".md", ".markdown"):
+        return "md"
+    if extension == ".csv":
+        return "csv"
+    return "doc"
+
+
+def partition_name_for(source: str) -> str:
+    """source 파일의 Milvus 파티션 이름 ('{문서 종류}_{source 해시 16자}')"""
+    digest = hashlib.sha1((source or "").encode('utf-8')).hexdigest()[:16]
+    return f"{doc_type_of(source)}_{digest}"